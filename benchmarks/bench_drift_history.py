@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark drift database history queries on a large synthetic database.
+
+Builds a throwaway baselines.db with --rows baselines (default 1,000,000)
+spread over --urls URLs plus half as many comparisons, using the schema as
+it was before the composite indexes (single-column url_hash indexes). It
+times the hot queries, applies the pending migrations, and times them again:
+
+  - latest:  load_baseline()'s newest-baseline-for-URL lookup
+  - history: drift_history.get_history()'s two paged queries
+  - fleet:   load_latest_baselines()'s newest-baseline-per-URL scan
+
+Nothing outside the temporary directory is touched.
+
+Usage:
+    python benchmarks/bench_drift_history.py
+    python benchmarks/bench_drift_history.py --rows 200000 --urls 2000 --runs 50
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(REPO_ROOT, "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import drift_db  # noqa: E402
+
+LATEST_SQL = "SELECT * FROM baselines WHERE url_hash = ? ORDER BY id DESC LIMIT 1"
+HISTORY_BASELINES_SQL = """
+    SELECT id, url, timestamp, title, canonical, robots, h1,
+           status_code, html_hash, schema_hash,
+           CASE WHEN cwv_json IS NOT NULL OR cwv_blob IS NOT NULL THEN 1 ELSE 0 END
+    FROM baselines WHERE url_hash = ? ORDER BY id DESC LIMIT 20
+"""
+HISTORY_COMPARISONS_SQL = """
+    SELECT id, baseline_id, timestamp, critical_count, warning_count, info_count
+    FROM comparisons WHERE url_hash = ? ORDER BY id DESC LIMIT 20
+"""
+FLEET_SQL = """
+    SELECT b.id FROM baselines b
+    JOIN (SELECT url_hash, MAX(id) AS id FROM baselines GROUP BY url_hash) latest
+      ON b.id = latest.id
+"""
+
+
+def build_legacy_db(conn, rows: int, urls: int, results_bytes: int) -> None:
+    """Populate a schema-version-3 database (pre composite indexes)."""
+    for number, _description, step in drift_db.MIGRATIONS[:3]:
+        step(conn)
+    conn.execute("CREATE INDEX idx_url_hash ON baselines(url_hash)")
+    conn.execute("CREATE INDEX idx_comp_url_hash ON comparisons(url_hash)")
+    conn.execute("PRAGMA user_version = 3")
+
+    hashes = [f"{i:016x}" for i in range(urls)]
+    h2_blob = drift_db.put_blob(conn, json.dumps(["Section"] * 8))
+
+    def _baselines():
+        for i in range(rows):
+            h = hashes[i % urls]
+            yield (
+                f"https://example.com/{h}", h, f"2025-01-01T00:00:{i % 60:02d}+00:00",
+                "Title", "https://example.com/", "index,follow", "Heading",
+                f"{i:064x}", 200, h2_blob,
+            )
+
+    # Real results_json rows are a few KB; their size is what makes reading
+    # the table (instead of a covering index) expensive.
+    results = json.dumps({"padding": "x" * max(0, results_bytes - 16)})
+
+    def _comparisons():
+        for i in range(0, rows, 2):
+            h = hashes[i % urls]
+            yield (f"https://example.com/{h}", h, i + 1, "2025-01-01T00:00:00+00:00", results, 0, 1, 2)
+
+    with conn:
+        conn.executemany(
+            "INSERT INTO baselines (url, url_hash, timestamp, title, canonical, robots, h1, "
+            "html_hash, status_code, h2_blob) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            _baselines(),
+        )
+        conn.executemany(
+            "INSERT INTO comparisons (url, url_hash, baseline_id, timestamp, results_json, "
+            "critical_count, warning_count, info_count) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            _comparisons(),
+        )
+
+
+def _median_ms(fn, runs: int) -> float:
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(durations), 3)
+
+
+def bench_queries(conn, urls: int, runs: int) -> dict:
+    """Median latency of each hot query, sampled over random URLs."""
+    rng = random.Random(42)
+    sample = [f"{rng.randrange(urls):016x}" for _ in range(runs)]
+    it = iter(sample * 3)
+
+    def _history():
+        h = next(it)
+        conn.execute(HISTORY_BASELINES_SQL, (h,)).fetchall()
+        conn.execute(HISTORY_COMPARISONS_SQL, (h,)).fetchall()
+
+    return {
+        "latest_ms": _median_ms(lambda: conn.execute(LATEST_SQL, (next(it),)).fetchone(), runs),
+        "history_ms": _median_ms(_history, runs),
+        "fleet_ms": _median_ms(lambda: conn.execute(FLEET_SQL).fetchall(), max(1, runs // 20)),
+        "plans": {
+            "latest": conn.execute("EXPLAIN QUERY PLAN " + LATEST_SQL, (sample[0],)).fetchall()[-1][3],
+            "history_comparisons": conn.execute(
+                "EXPLAIN QUERY PLAN " + HISTORY_COMPARISONS_SQL, (sample[0],)
+            ).fetchall()[-1][3],
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark drift history queries before/after the index migration"
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Baselines to generate (default: 1000000)")
+    parser.add_argument("--urls", type=int, default=10_000, help="Distinct URLs (default: 10000)")
+    parser.add_argument("--runs", "-n", type=int, default=200, help="Samples per query (default: 200)")
+    parser.add_argument(
+        "--results-bytes", type=int, default=1024,
+        help="Size of each comparison's results_json (default: 1024)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        drift_db.DB_DIR = tmp
+        drift_db.DB_PATH = os.path.join(tmp, "baselines.db")
+
+        conn = drift_db.sqlite3.connect(drift_db.DB_PATH)
+        conn.execute("PRAGMA journal_mode=WAL")
+        start = time.perf_counter()
+        build_legacy_db(conn, args.rows, args.urls, args.results_bytes)
+        build_s = time.perf_counter() - start
+
+        before = bench_queries(conn, args.urls, args.runs)
+        start = time.perf_counter()
+        applied = drift_db.migrate(conn)
+        migrate_s = time.perf_counter() - start
+        after = bench_queries(conn, args.urls, args.runs)
+        stats = drift_db.storage_stats(conn)
+        conn.close()
+
+    output = {
+        "python": sys.version.split()[0],
+        "sqlite": drift_db.sqlite3.sqlite_version,
+        "rows": args.rows,
+        "comparisons": stats["comparisons"],
+        "urls": args.urls,
+        "build_seconds": round(build_s, 2),
+        "migrations_applied": applied,
+        "migrate_seconds": round(migrate_s, 2),
+        "file_bytes": stats["file_bytes"],
+        "before": before,
+        "after": after,
+    }
+    print(json.dumps(output, indent=2))
+
+
+if __name__ == "__main__":
+    main()
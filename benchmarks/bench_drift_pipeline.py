@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-URL overhead of the drift fetch/parse/PSI pipeline.
+
+Compares drift_baseline's two execution modes:
+  - subprocess: one child interpreter each for fetch_page.py, parse_html.py
+    and pagespeed_check.py per URL (the original implementation)
+  - inprocess:  direct calls to fetch_page(), parse_html(), run_pagespeed()
+
+The offline section needs no network: it times interpreter start-up plus
+imports for the two network scripts, and the parse step in both modes on a
+synthetic page. Pass --url to also time the full fetch+parse path live.
+
+Usage:
+    python benchmarks/bench_drift_pipeline.py
+    python benchmarks/bench_drift_pipeline.py --runs 10 --url https://example.com
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(REPO_ROOT, "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+from drift_baseline import fetch_page_data  # noqa: E402
+from parse_html import parse_html  # noqa: E402
+
+
+def synthetic_page(sections: int = 200) -> str:
+    """Build a mid-sized HTML page (~50 KB) with typical SEO elements."""
+    parts = [
+        "<!DOCTYPE html><html><head><title>Benchmark page</title>",
+        '<meta name="description" content="Synthetic page for drift benchmarks">',
+        '<link rel="canonical" href="https://example.com/bench">',
+        '<meta property="og:title" content="Benchmark">',
+        '<script type="application/ld+json">{"@context":"https://schema.org",'
+        '"@type":"Article","headline":"Benchmark"}</script>',
+        "</head><body><h1>Benchmark page</h1>",
+    ]
+    for i in range(sections):
+        parts.append(
+            f"<h2>Section {i}</h2><p>Paragraph {i} with some body text and "
+            f'<a href="/page-{i}">an internal link</a> and '
+            f'<a href="https://other.example.org/{i}" rel="nofollow">an external one</a>.</p>'
+            f'<img src="/img/{i}.jpg" alt="Image {i}" loading="lazy" width="640" height="480">'
+        )
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def _time_runs(fn, runs: int) -> list:
+    """Call fn() `runs` times and return the wall-clock durations in ms."""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def _stats(durations: list) -> dict:
+    """Summarize a list of millisecond durations."""
+    return {
+        "runs": len(durations),
+        "median_ms": round(statistics.median(durations), 2),
+        "min_ms": round(min(durations), 2),
+        "max_ms": round(max(durations), 2),
+    }
+
+
+def bench_offline(runs: int) -> dict:
+    """Time interpreter start-up and the parse step without touching the network."""
+    html = synthetic_page()
+    fetch_script = os.path.join(SCRIPTS_DIR, "fetch_page.py")
+    psi_script = os.path.join(SCRIPTS_DIR, "pagespeed_check.py")
+    parse_script = os.path.join(SCRIPTS_DIR, "parse_html.py")
+
+    # --help exits right after argparse, so this is interpreter + import cost only
+    fetch_startup = _time_runs(
+        lambda: subprocess.run([sys.executable, fetch_script, "--help"],
+                               capture_output=True, check=True),
+        runs,
+    )
+    psi_startup = _time_runs(
+        lambda: subprocess.run([sys.executable, psi_script, "--help"],
+                               capture_output=True, check=True),
+        runs,
+    )
+    parse_subprocess = _time_runs(
+        lambda: subprocess.run(
+            [sys.executable, parse_script, "--url", "https://example.com/bench", "--json"],
+            input=html, capture_output=True, text=True, check=True,
+        ),
+        runs,
+    )
+    parse_inprocess = _time_runs(
+        lambda: parse_html(html, "https://example.com/bench"), runs
+    )
+
+    sub_total = (
+        statistics.median(fetch_startup)
+        + statistics.median(psi_startup)
+        + statistics.median(parse_subprocess)
+    )
+    inproc_total = statistics.median(parse_inprocess)
+
+    return {
+        "html_bytes": len(html.encode("utf-8")),
+        "fetch_page_startup": _stats(fetch_startup),
+        "pagespeed_check_startup": _stats(psi_startup),
+        "parse_subprocess": _stats(parse_subprocess),
+        "parse_inprocess": _stats(parse_inprocess),
+        "per_url_overhead_ms": {
+            "subprocess": round(sub_total, 2),
+            "inprocess": round(inproc_total, 2),
+            "saved": round(sub_total - inproc_total, 2),
+        },
+    }
+
+
+def bench_live(url: str, runs: int) -> dict:
+    """Time fetch_page_data() end to end in both execution modes."""
+    results = {}
+    for mode in ("subprocess", "inprocess"):
+        errors = []
+
+        def _run():
+            data = fetch_page_data(url, mode=mode)
+            if data["error"]:
+                errors.append(data["error"])
+
+        results[mode] = _stats(_time_runs(_run, runs))
+        if errors:
+            results[mode]["errors"] = errors[:3]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark drift pipeline overhead (subprocess vs in-process)"
+    )
+    parser.add_argument("--runs", "-n", type=int, default=5, help="Runs per measurement (default: 5)")
+    parser.add_argument("--url", help="Also time the live fetch+parse path against this URL")
+    args = parser.parse_args()
+
+    output = {"python": sys.version.split()[0], "offline": bench_offline(args.runs)}
+    if args.url:
+        output["live"] = {"url": args.url, **bench_live(args.url, args.runs)}
+
+    print(json.dumps(output, indent=2))
+
+
+if __name__ == "__main__":
+    main()
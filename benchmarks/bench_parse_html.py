@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Benchmark parse_html() on synthetic and recorded pages.
+
+Synthetic pages are generated at each --sizes (default 10 KB to 20 MB) with
+link, image, heading and JSON-LD counts set by --links-per-kb,
+--images-per-kb, --headings-per-kb and --schema-blocks, padded to size with
+paragraph text. Recorded pages are replayed from --recorded directories of
+saved .html files (default: the tests/fixtures/parse_html corpus).
+
+Every page is parsed in each --modes:
+
+  - bs4:       the BeautifulSoup backend, timed per phase (build the
+    tree, extract the fields, serialize the result to JSON)
+  - lxml:      the default backend (libxml2 parse events, no tree phase)
+  - compact:   the default backend with compact=True
+  - stream:    parse_html_stream() over 64K-character chunks, no caps
+
+Phase times are medians over --runs (stopping early once a case has taken
+--max-seconds). Peak memory is measured once per case in a fresh process:
+the rise in peak RSS (the libxml2 tree is not Python memory) and the
+tracemalloc peak.
+
+Results are printed as JSON (and written to --output). With --baseline, a
+previous --output file is compared case by case; the exit status is 1 when
+a total time or memory peak grew by more than --tolerance.
+
+Usage:
+    python benchmarks/bench_parse_html.py --output parse-bench.json
+    python benchmarks/bench_parse_html.py --baseline parse-bench.json
+    python benchmarks/bench_parse_html.py --sizes 100KB,1MB --modes lxml,stream --no-recorded
+    python benchmarks/bench_parse_html.py --sizes "" --recorded ~/saved-pages
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(REPO_ROOT, "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import parse_html  # noqa: E402
+from bs4 import BeautifulSoup  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_SIZES = "10KB,100KB,1MB,20MB"
+DEFAULT_RECORDED = os.path.join(REPO_ROOT, "tests", "fixtures", "parse_html")
+BASE_URL = "https://shop.example.com/catalogue/"
+MODES = ("lxml", "bs4", "compact", "stream")
+
+# Differences below these are noise, whatever the ratio
+MIN_TIME_DELTA_MS = 1.0
+MIN_MEMORY_DELTA_KB = 256
+
+_WORDS = (
+    "widget blue steel garden outdoor premium classic compact delivery "
+    "warranty review size colour price stock order return guide care"
+).split()
+
+
+def parse_size(text: str) -> int:
+    """'10KB', '1MB', '512' -> bytes."""
+    text = text.strip().upper()
+    for suffix, factor in (("KB", 1024), ("MB", 1024 * 1024), ("B", 1)):
+        if text.endswith(suffix):
+            return int(float(text[:-len(suffix)]) * factor)
+    return int(text)
+
+
+def _label(size: int) -> str:
+    if size >= 1024 * 1024 and size % (1024 * 1024) == 0:
+        return f"{size // (1024 * 1024)}MB"
+    return f"{size // 1024}KB" if size % 1024 == 0 else f"{size}B"
+
+
+def synthetic_page(size: int, links: int, images: int, headings: int, schema_blocks: int, seed: int = 0) -> str:
+    """
+    A page of roughly `size` bytes with exactly the given element counts.
+
+    Links are two thirds internal, the rest external and partly nofollow;
+    images mix native, class-based and data-src lazy loading; the first
+    heading is the h1, the others alternate h2/h3. Filler paragraphs
+    between the elements make up the size.
+    """
+    rng = random.Random(seed)
+    head = [
+        "<!DOCTYPE html><html><head><title>Synthetic benchmark page</title>",
+        '<meta name="description" content="Synthetic page for parser benchmarks">',
+        '<meta name="robots" content="index,follow">',
+        f'<link rel="canonical" href="{BASE_URL}">',
+        '<meta property="og:title" content="Benchmark"><meta name="twitter:card" content="summary">',
+    ]
+    for i in range(schema_blocks):
+        head.append(
+            '<script type="application/ld+json">{"@context":"https://schema.org","@graph":['
+            f'{{"@type":"Product","name":"Widget {i}","sku":"W{i:05d}"}},'
+            f'{{"@type":"BreadcrumbList","itemListElement":[{{"@type":"ListItem","position":{i}}}]}}]}}'
+            "</script>"
+        )
+    head.append("</head><body>")
+
+    items = []
+    for i in range(links):
+        if i % 3:
+            items.append(f'<a href="/p/{i}">Product {i}</a>')
+        else:
+            rel = ' rel="nofollow"' if i % 2 else ""
+            items.append(f'<a href="https://partner{i % 7}.example.org/r/{i}"{rel}>Partner {i}</a>')
+    lazy = ('loading="lazy"', 'class="lazyload" data-src="/img/l.jpg"', "")
+    for i in range(images):
+        items.append(f'<img src="/img/{i}.jpg" alt="Image {i}" width="640" height="480" {lazy[i % 3]}>')
+    for i in range(headings):
+        tag = "h1" if i == 0 else ("h2", "h3")[i % 2]
+        items.append(f"<{tag}>Heading {i}</{tag}>")
+    rng.shuffle(items)
+    tail = "</body></html>"
+
+    fixed = sum(map(len, head)) + sum(map(len, items)) + len(tail)
+    gap = max(0, size - fixed) // (len(items) + 1)
+    fillers = [_paragraph(gap, rng) for _ in range(16)] if gap else [""]
+    body = []
+    for i, item in enumerate(items):
+        body.append(fillers[i % len(fillers)])
+        body.append(item)
+    body.append(fillers[len(items) % len(fillers)])
+    return "".join(head) + "".join(body) + tail
+
+
+def _paragraph(size: int, rng) -> str:
+    """A <p> of random words, `size` characters long (at least the tags)."""
+    words = []
+    length = 7
+    while length < size:
+        word = rng.choice(_WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return ("<p>" + " ".join(words))[:max(3, size - 4)] + "</p>"
+
+
+def run_mode(mode: str, html: str, base_url: str) -> tuple:
+    """One parse of `html` in `mode`: (phase durations in seconds, result)."""
+    clock = time.perf_counter
+    if mode == "stream":
+        chunks = (html[i:i + parse_html.STREAM_CHUNK_CHARS] for i in range(0, len(html), parse_html.STREAM_CHUNK_CHARS))
+        t0 = clock()
+        result = parse_html.parse_html_stream(chunks, base_url, max_links=None, max_images=None)
+        t1 = clock()
+        json.dumps(result)
+        return {"total": t1 - t0, "serialize": clock() - t1}, result
+
+    backend = parse_html.DEFAULT_BACKEND if mode == "compact" else mode
+    compact = mode == "compact"
+    result = parse_html._empty_result(None)
+    if backend == "lxml":
+        # Parsing and extraction are one pass over libxml2's events
+        t0 = clock()
+        parse_html.BACKENDS["lxml"](html, result, base_url, compact)
+        t1 = clock()
+        json.dumps(result)
+        return {"total": t1 - t0, "serialize": clock() - t1}, result
+
+    t0 = clock()
+    # The same steps as parse_html(), split into phases
+    document = BeautifulSoup(html, parse_html._HTML_PARSER)
+    extractor = parse_html._SoupExtractor(result, base_url, compact)
+    t1 = clock()
+    extractor.run(document)
+    t2 = clock()
+    json.dumps(result)
+    t3 = clock()
+    return {"build": t1 - t0, "extract": t2 - t1, "total": t2 - t0, "serialize": t3 - t2}, result
+
+
+def _proc_status_kb(key: str):
+    with open("/proc/self/status", "r", encoding="ascii") as f:
+        for line in f:
+            if line.startswith(key):
+                return int(line.split()[1])
+    return None
+
+
+def _start_rss_peak():
+    """
+    Start tracking peak RSS: returns a function giving the rise since now.
+
+    On Linux the kernel's high-water mark is reset (/proc/self/clear_refs),
+    so memory used to receive the page does not hide the parse's peak.
+    Elsewhere the process-lifetime ru_maxrss is used, which under-reports
+    when receiving the page peaked higher.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+        before = _proc_status_kb("VmRSS")
+        return lambda: _proc_status_kb("VmHWM") - before
+    except OSError:
+        pass
+    if resource is None:
+        return lambda: None
+    scale = 1024 if sys.platform == "darwin" else 1  # bytes on macOS
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale
+    return lambda: resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale - before
+
+
+def _memory_child(mode: str, html: str, base_url: str) -> dict:
+    """Runs in a fresh process: peak RSS rise first, then the tracemalloc peak."""
+    rss_rise = _start_rss_peak()
+    run_mode(mode, html, base_url)
+    peak_rss = rss_rise()
+    tracemalloc.start()
+    run_mode(mode, html, base_url)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"peak_rss_kb": peak_rss, "peak_python_kb": peak // 1024}
+
+
+def measure_memory(mode: str, html: str, base_url: str) -> dict:
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(_memory_child, (mode, html, base_url))
+
+
+def _counts(result: dict) -> dict:
+    result = parse_html.expand_result(result)
+    return {
+        "links": len(result["links"]["internal"]) + len(result["links"]["external"]),
+        "images": len(result["images"]),
+        "headings": sum(len(result[tag]) for tag in ("h1", "h2", "h3")),
+        "schema": len(result["schema"]),
+        "words": result["word_count"],
+    }
+
+
+def bench_case(page: str, html: str, mode: str, args) -> dict:
+    """Median phase times over up to args.runs parses, plus the memory peaks."""
+    phases = {}
+    result = None
+    started = time.perf_counter()
+    runs = 0
+    while runs < args.runs and (runs == 0 or time.perf_counter() - started < args.max_seconds):
+        durations, result = run_mode(mode, html, args.base_url)
+        for phase, seconds in durations.items():
+            phases.setdefault(phase, []).append(seconds * 1000)
+        runs += 1
+    case = {
+        "page": page,
+        "mode": mode,
+        "bytes": len(html.encode("utf-8")),
+        "runs": runs,
+        "counts": _counts(result),
+        "phases_ms": {phase: round(statistics.median(values), 3) for phase, values in phases.items()},
+    }
+    if not args.no_memory:
+        case.update(measure_memory(mode, html, args.base_url))
+    return case
+
+
+def iter_pages(args):
+    """(name, html) for every synthetic size, then every recorded page."""
+    for size in (parse_size(s) for s in args.sizes.split(",") if s.strip()):
+        kb = size / 1024
+        yield f"synthetic-{_label(size)}", synthetic_page(
+            size,
+            links=round(kb * args.links_per_kb),
+            images=round(kb * args.images_per_kb),
+            headings=max(1, round(kb * args.headings_per_kb)),
+            schema_blocks=args.schema_blocks,
+            seed=args.seed,
+        )
+    if args.no_recorded:
+        return
+    for directory in args.recorded or [DEFAULT_RECORDED]:
+        for name in sorted(os.listdir(directory)):
+            if name.endswith((".html", ".htm")):
+                with open(os.path.join(directory, name), "r", encoding="utf-8", errors="replace") as f:
+                    yield f"recorded/{name}", f.read()
+
+
+def compare(cases: list, baseline: dict, tolerance: float) -> dict:
+    """Cases whose total time or memory peaks grew past the tolerance."""
+    previous = {(case["page"], case["mode"]): case for case in baseline.get("cases", [])}
+    regressions = []
+    missing = []
+    for case in cases:
+        old = previous.get((case["page"], case["mode"]))
+        if old is None:
+            missing.append(f"{case['page']}/{case['mode']}")
+            continue
+        checks = [("total_ms", old["phases_ms"].get("total"), case["phases_ms"].get("total"), MIN_TIME_DELTA_MS)]
+        for metric in ("peak_rss_kb", "peak_python_kb"):
+            checks.append((metric, old.get(metric), case.get(metric), MIN_MEMORY_DELTA_KB))
+        for metric, before, now, floor in checks:
+            if before is None or now is None:
+                continue
+            if now > before * (1 + tolerance) and now - before > floor:
+                regressions.append({
+                    "page": case["page"],
+                    "mode": case["mode"],
+                    "metric": metric,
+                    "baseline": before,
+                    "current": now,
+                    "ratio": round(now / before, 2) if before else None,
+                })
+    return {"tolerance": tolerance, "regressions": regressions, "not_in_baseline": missing}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parse_html() per phase and peak memory")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Synthetic page sizes (default: {DEFAULT_SIZES})")
+    parser.add_argument("--links-per-kb", type=float, default=2.0, help="Links per KB of page (default: 2)")
+    parser.add_argument("--images-per-kb", type=float, default=0.3, help="Images per KB of page (default: 0.3)")
+    parser.add_argument("--headings-per-kb", type=float, default=0.2, help="Headings per KB of page (default: 0.2)")
+    parser.add_argument("--schema-blocks", type=int, default=3, help="JSON-LD blocks per page (default: 3)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic pages (default: 0)")
+    parser.add_argument(
+        "--recorded", action="append", metavar="DIR",
+        help="Directory of saved .html pages to replay; repeatable (default: the test corpus)",
+    )
+    parser.add_argument("--no-recorded", action="store_true", help="Benchmark synthetic pages only")
+    parser.add_argument("--base-url", default=BASE_URL, help=f"Base URL for the pages (default: {BASE_URL})")
+    parser.add_argument(
+        "--modes", default=",".join(MODES),
+        help=f"Comma-separated modes (default: {','.join(MODES)}; lxml and stream need lxml)",
+    )
+    parser.add_argument("--runs", "-n", type=int, default=5, help="Parses per case (default: 5)")
+    parser.add_argument(
+        "--max-seconds", type=float, default=10.0,
+        help="Stop repeating a case after this long; it always runs once (default: 10)",
+    )
+    parser.add_argument("--no-memory", action="store_true", help="Skip the peak memory measurement")
+    parser.add_argument("--output", "-o", help="Also write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a previous --output file")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25,
+        help="Allowed growth over the baseline before a regression is reported (default: 0.25)",
+    )
+    args = parser.parse_args()
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = set(modes).difference(MODES)
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(sorted(unknown))}")
+    if parse_html.etree is None:
+        skipped = [mode for mode in modes if mode in ("lxml", "stream")]
+        if skipped:
+            print(f"lxml not installed, skipping: {', '.join(skipped)}", file=sys.stderr)
+        modes = [mode for mode in modes if mode not in skipped]
+
+    baseline = None
+    if args.baseline:
+        try:
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            parser.error(f"could not load baseline: {e}")
+
+    cases = []
+    for page, html in iter_pages(args):
+        for mode in modes:
+            case = bench_case(page, html, mode, args)
+            print(f"{page:<36} {mode:<8} {case['phases_ms']['total']:>10.2f} ms", file=sys.stderr)
+            cases.append(case)
+
+    output = {
+        "python": sys.version.split()[0],
+        "lxml": ".".join(map(str, parse_html.etree.LXML_VERSION)) if parse_html.etree is not None else None,
+        "parser_version": parse_html.PARSER_VERSION,
+        "base_url": args.base_url,
+        "cases": cases,
+    }
+    if baseline is not None:
+        output["comparison"] = compare(cases, baseline, args.tolerance)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+    print(json.dumps(output, indent=2))
+    if baseline is not None and output["comparison"]["regressions"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,7 @@ Usage:
 """
 
 import argparse
-import ipaddress
 import os
-import socket
 import sys
 from urllib.parse import ParseResult, urlparse
 
@@ -21,6 +19,9 @@ except ImportError:
     print("Error: playwright required. Install with: pip install playwright && playwright install chromium")
     sys.exit(1)
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from dns_cache import check_host, host_resolver_rule  # noqa: E402
+
 
 VIEWPORTS = {
     "desktop": {"width": 1920, "height": 1080},
@@ -84,21 +85,20 @@ def capture_screenshot(
         result["error"] = str(e)
         return result
 
-    # SSRF prevention: block private/internal IPs
-    try:
-        resolved_ip = socket.gethostbyname(parsed.hostname)
-        ip = ipaddress.ip_address(resolved_ip)
-        if ip.is_private or ip.is_loopback or ip.is_reserved:
-            result["error"] = f"Blocked: URL resolves to private/internal IP ({resolved_ip})"
-            return result
-    except socket.gaierror:
-        pass
+    # SSRF prevention: block private/internal IPs, then pin Chromium to the
+    # first checked address (a MAP rule takes one) so it cannot resolve the
+    # host differently.
+    addresses, blocked = check_host(parsed.hostname)
+    if blocked:
+        result["error"] = f"Blocked: URL resolves to private/internal IP ({blocked})"
+        return result
+    launch_args = [f"--host-resolver-rules={host_resolver_rule(parsed.hostname, addresses[0])}"] if addresses else []
 
     vp = VIEWPORTS[viewport]
 
     try:
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
+            browser = p.chromium.launch(headless=True, args=launch_args)
             context = browser.new_context(
                 viewport={"width": vp["width"], "height": vp["height"]},
                 device_scale_factor=2 if viewport == "mobile" else 1,
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Local, memory-mapped index of a Common Crawl domain rankings file.
+
+Without it, commoncrawl_graph.py streams the multi-GB
+<release>-domain-ranks.txt.gz over HTTP for every uncached domain and scans
+it line by line. build_index() converts the rankings once per release into
+a binary file sorted by reversed host (com.example), and RankIndex answers
+a lookup by binary search over a memory map of that file: a few dozen page
+reads, microseconds, no network.
+
+The build is an external merge sort. Up to `chunk_rows` records are sorted
+in memory and spilled to a temporary run file; the runs are then merged
+into the index, so memory stays bounded whatever the size of the release.
+
+File layout (little-endian):
+  header   magic "CCRANK01", record count (u64), offset table position
+           (u64), reserved (u64)
+  records  key length (u16), reversed host (UTF-8), harmonic centrality
+           rank (u32), harmonic centrality (f64), PageRank rank (u32),
+           PageRank (f64), host count (u32); sorted by key bytes
+  offsets  position of each record (u64), in key order
+
+Missing or unparsable numbers are stored as 0xFFFFFFFF / NaN and read back
+as None.
+
+Usage:
+    python cc_rank_index.py build cc-main-2026-jan-feb-mar-domain-ranks.txt.gz ranks.idx
+    python cc_rank_index.py lookup ranks.idx example.com competitor.org
+    python cc_rank_index.py info ranks.idx
+"""
+
+import argparse
+import gzip
+import heapq
+import json
+import math
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+from typing import Iterable, Iterator, Optional
+
+MAGIC = b"CCRANK01"
+_HEADER = struct.Struct("<8sQQQ")
+_KEY_LENGTH = struct.Struct("<H")
+_VALUES = struct.Struct("<IdIdI")
+_OFFSET = struct.Struct("<Q")
+_NO_INT = 0xFFFFFFFF
+
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+
+def reverse_host(domain: str) -> str:
+    """example.com -> com.example, the key order of the rankings file."""
+    return ".".join(reversed(domain.split(".")))
+
+
+def _int_field(value: str) -> int:
+    if value.isdigit():
+        number = int(value)
+        if number < _NO_INT:
+            return number
+    return _NO_INT
+
+
+def _float_field(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return math.nan
+
+
+def parse_rank_line(line: str) -> Optional[tuple]:
+    """
+    (reversed host bytes, packed values) for one rankings line, or None for
+    the header and malformed lines.
+
+    Format: harmonicc_pos, harmonicc_val, pr_pos, pr_val, host_rev, n_hosts
+    (tab-separated).
+    """
+    line = line.rstrip("\r\n")
+    if not line.strip() or line.startswith("#"):
+        return None
+    fields = line.split("\t")
+    if len(fields) < 6:
+        return None
+    key = fields[4].encode("utf-8")
+    if not key or len(key) > 0xFFFF:
+        return None
+    values = _VALUES.pack(
+        _int_field(fields[0]),
+        _float_field(fields[1]),
+        _int_field(fields[2]),
+        _float_field(fields[3]),
+        _int_field(fields[5]),
+    )
+    return key, values
+
+
+def iter_file_lines(path: str) -> Iterator[str]:
+    """Lines of a local rankings file, gzipped or not."""
+    if path.endswith(".gz"):
+        f = gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    else:
+        f = open(path, "r", encoding="utf-8", errors="replace")
+    with f:
+        yield from f
+
+
+def _write_run(records: list, directory: str) -> str:
+    """Sort one chunk of records and spill it to a run file."""
+    records.sort()
+    fd, path = tempfile.mkstemp(prefix="run-", dir=directory)
+    with os.fdopen(fd, "wb", buffering=1024 * 1024) as f:
+        for key, values in records:
+            f.write(_KEY_LENGTH.pack(len(key)))
+            f.write(key)
+            f.write(values)
+    return path
+
+
+def _read_run(path: str) -> Iterator[tuple]:
+    with open(path, "rb", buffering=1024 * 1024) as f:
+        while True:
+            head = f.read(_KEY_LENGTH.size)
+            if not head:
+                return
+            key = f.read(_KEY_LENGTH.unpack(head)[0])
+            yield key, f.read(_VALUES.size)
+
+
+def build_index(
+    lines: Iterable[str],
+    path: str,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    tmp_dir: Optional[str] = None,
+) -> dict:
+    """
+    Build a rank index at `path` from the lines of a rankings file.
+
+    The file is written under a temporary name and moved into place when
+    complete, so a concurrent reader never sees a partial index.
+
+    Args:
+        lines: Text lines of <release>-domain-ranks.txt(.gz), in any order.
+        path: Index file to create (replaced if it exists).
+        chunk_rows: Records sorted in memory per run file.
+        tmp_dir: Directory for the run files (default: next to `path`).
+
+    Returns:
+        Build stats: records, duplicates, skipped lines, runs, bytes, seconds.
+    """
+    started = time.time()
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    work = tempfile.mkdtemp(prefix="ccrank-", dir=tmp_dir or directory)
+    partial = f"{path}.partial"
+    stats = {"records": 0, "duplicates": 0, "skipped": 0, "runs": 0}
+    try:
+        runs = []
+        chunk = []
+        for line in lines:
+            record = parse_rank_line(line)
+            if record is None:
+                stats["skipped"] += 1
+                continue
+            chunk.append(record)
+            if len(chunk) >= max(1, chunk_rows):
+                runs.append(_write_run(chunk, work))
+                chunk = []
+        if runs:
+            if chunk:
+                runs.append(_write_run(chunk, work))
+            merged = heapq.merge(*(_read_run(run) for run in runs))
+        else:
+            chunk.sort()
+            merged = iter(chunk)
+        stats["runs"] = len(runs)
+
+        with open(partial, "wb", buffering=1024 * 1024) as out, \
+                open(os.path.join(work, "offsets"), "w+b", buffering=1024 * 1024) as offsets:
+            out.write(_HEADER.pack(MAGIC, 0, 0, 0))
+            position = _HEADER.size
+            previous = None
+            for key, values in merged:
+                if key == previous:
+                    stats["duplicates"] += 1
+                    continue
+                previous = key
+                offsets.write(_OFFSET.pack(position))
+                out.write(_KEY_LENGTH.pack(len(key)))
+                out.write(key)
+                out.write(values)
+                position += _KEY_LENGTH.size + len(key) + _VALUES.size
+                stats["records"] += 1
+            offsets.seek(0)
+            shutil.copyfileobj(offsets, out, 1024 * 1024)
+            out.seek(0)
+            out.write(_HEADER.pack(MAGIC, stats["records"], position, 0))
+        os.replace(partial, path)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+        if os.path.exists(partial):
+            os.remove(partial)
+
+    stats["bytes"] = os.path.getsize(path)
+    stats["seconds"] = round(time.time() - started, 2)
+    return stats
+
+
+class RankIndex:
+    """
+    Read-only lookups in a build_index() file through a memory map.
+
+    Thread-safe: lookups only read the map.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(f"Not a rank index: {path}")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self._offsets, _reserved = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or self._offsets + self.count * _OFFSET.size > size:
+            self._map.close()
+            raise ValueError(f"Not a rank index: {path}")
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, domain: str) -> Optional[dict]:
+        """Ranks of a domain (e.g. 'example.com'), or None if it is not in the file."""
+        return self.lookup_reversed(reverse_host(domain.lower().strip(".")))
+
+    def lookup_reversed(self, host_rev: str) -> Optional[dict]:
+        """Ranks for a reversed host as the file stores it (e.g. 'com.example')."""
+        key = host_rev.encode("utf-8")
+        data = self._map
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            position = _OFFSET.unpack_from(data, self._offsets + middle * _OFFSET.size)[0]
+            start = position + _KEY_LENGTH.size
+            end = start + _KEY_LENGTH.unpack_from(data, position)[0]
+            probe = data[start:end]
+            if probe < key:
+                low = middle + 1
+            elif probe > key:
+                high = middle
+            else:
+                return _ranks(_VALUES.unpack_from(data, end))
+        return None
+
+
+def _ranks(values: tuple) -> dict:
+    hc_rank, hc_value, pr_rank, pr_value, n_hosts = values
+    return {
+        "harmonic_centrality_rank": None if hc_rank == _NO_INT else hc_rank,
+        "harmonic_centrality": None if math.isnan(hc_value) else hc_value,
+        "pagerank_rank": None if pr_rank == _NO_INT else pr_rank,
+        "pagerank": None if math.isnan(pr_value) else pr_value,
+        "n_hosts": None if n_hosts == _NO_INT else n_hosts,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query a local Common Crawl rank index")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Build an index from a downloaded rankings file")
+    build.add_argument("ranks_file", help="<release>-domain-ranks.txt.gz (or uncompressed)")
+    build.add_argument("index", help="Index file to write")
+    build.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=DEFAULT_CHUNK_ROWS,
+        help=f"Records sorted in memory per run (default: {DEFAULT_CHUNK_ROWS})",
+    )
+
+    lookup = commands.add_parser("lookup", help="Look up one or more domains")
+    lookup.add_argument("index", help="Index file")
+    lookup.add_argument("domains", nargs="+", help="Domains (e.g. example.com)")
+
+    info = commands.add_parser("info", help="Show the record count and size of an index")
+    info.add_argument("index", help="Index file")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "build":
+            result = build_index(iter_file_lines(args.ranks_file), args.index, chunk_rows=args.chunk_rows)
+        else:
+            with RankIndex(args.index) as index:
+                if args.command == "lookup":
+                    result = {domain: index.lookup(domain) for domain in args.domains}
+                else:
+                    result = {"path": args.index, "records": len(index), "bytes": os.path.getsize(args.index)}
+    except (OSError, ValueError) as e:
+        result = {"error": str(e)}
+
+    print(json.dumps(result, indent=2))
+    if result.get("error"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,12 @@ Usage:
     python commoncrawl_graph.py example.com --update --json
     python commoncrawl_graph.py --info --json
     python commoncrawl_graph.py example.com --top-referrers 20 --json
+    python commoncrawl_graph.py --build-index --json
+    python commoncrawl_graph.py --build-index --ranks-file cc-main-2026-jan-feb-mar-domain-ranks.txt.gz
+
+--build-index converts a release's domain rankings into a local sorted index
+(see cc_rank_index.py), once per release. Lookups then read PageRank and
+harmonic centrality from it without downloading anything.
 """
 
 import argparse
@@ -36,9 +42,10 @@ _SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, _SCRIPTS_DIR)
 try:
     from backlinks_auth import get_cache_dir, load_config
+    from cc_rank_index import RankIndex, build_index, iter_file_lines
     from google_auth import validate_url
 except ImportError:
-    print("Error: backlinks_auth.py and google_auth.py required in scripts/", file=sys.stderr)
+    print("Error: backlinks_auth.py, cc_rank_index.py and google_auth.py required in scripts/", file=sys.stderr)
     sys.exit(1)
 
 # Common Crawl web graph base URL (HTTP access to S3 bucket)
@@ -62,6 +69,12 @@ VERTICES_SUFFIX = "-domain-vertices.txt.gz"
 EDGES_SUFFIX = "-domain-edges.txt.gz"
 RANKINGS_SUFFIX = "-domain-ranks.txt.gz"
 
+# Local rank index built by --build-index, stored in the cache directory
+RANK_INDEX_SUFFIX = "-domain-ranks.idx"
+
+# Open indexes by path, reused across lookups in one process
+_rank_indexes = {}
+
 
 def _graph_file_url(release: str, suffix: str) -> str:
     """Build the full URL for a CC web graph file."""
@@ -96,6 +109,48 @@ def _get_latest_release() -> Optional[str]:
     return None
 
 
+def _rank_index_path(release: str) -> str:
+    return os.path.join(get_cache_dir(), f"{release}{RANK_INDEX_SUFFIX}")
+
+
+def _indexed_releases() -> list:
+    """Known releases with a local rank index, newest first."""
+    return [release for release in KNOWN_RELEASES if os.path.exists(_rank_index_path(release))]
+
+
+def _open_rank_index(release: str) -> Optional[RankIndex]:
+    """The release's local rank index, or None if it has not been built."""
+    path = _rank_index_path(release)
+    index = _rank_indexes.get(path)
+    if index is None and os.path.exists(path):
+        try:
+            index = _rank_indexes[path] = RankIndex(path)
+        except (OSError, ValueError):
+            return None
+    return index
+
+
+def _iter_remote_gz_lines(url: str, timeout: int = 120):
+    """
+    Stream a gzipped text file over HTTP and yield its lines, decompressing
+    incrementally so that neither the download nor the text is held in memory.
+    """
+    import zlib
+
+    with requests.get(url, stream=True, timeout=timeout) as resp:
+        resp.raise_for_status()
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        leftover = b""
+        for chunk in resp.iter_content(chunk_size=1024 * 1024):
+            lines = (leftover + decompressor.decompress(chunk)).split(b"\n")
+            leftover = lines.pop()
+            for line in lines:
+                yield line.decode("utf-8", errors="replace")
+        leftover += decompressor.flush()
+        if leftover:
+            yield leftover.decode("utf-8", errors="replace")
+
+
 def _get_cache_path(domain: str, release: str, data_type: str) -> str:
     """Get the cache file path for a domain's data."""
     cache_dir = get_cache_dir()
@@ -242,9 +297,10 @@ def get_domain_metrics(domain: str, release: Optional[str] = None,
         domain = urlparse(domain).netloc
     domain = domain.replace("www.", "")
 
-    # Find release
+    # Find release: the newest one indexed locally, else the newest online
     if not release:
-        release = _get_latest_release()
+        indexed = _indexed_releases()
+        release = indexed[0] if indexed else _get_latest_release()
         if not release:
             return {
                 "status": "error",
@@ -253,6 +309,12 @@ def get_domain_metrics(domain: str, release: Optional[str] = None,
                 "metadata": {"source": "commoncrawl"},
             }
 
+    # A local rank index is authoritative and as fast as the per-domain
+    # cache, which may still hold answers from a partial streaming scan
+    rank_index = _open_rank_index(release)
+    if rank_index is not None:
+        return _metrics_from_index(domain, release, rank_index)
+
     # Check cache
     if not force_update:
         cached = _is_cached(domain, release)
@@ -342,6 +404,101 @@ def get_domain_metrics(domain: str, release: Optional[str] = None,
     return result
 
 
+def _metrics_from_index(domain: str, release: str, rank_index: RankIndex) -> dict:
+    """
+    get_domain_metrics() answered from a local rank index. The index holds
+    every line of the rankings file, so a domain missing from it is not in
+    the release's graph and the vertices file need not be scanned.
+    """
+    rankings_data = rank_index.lookup(domain) or {}
+    in_crawl = bool(rankings_data)
+    in_rankings = bool(rankings_data.get("pagerank"))
+    if in_rankings:
+        note = "Domain-level metrics from CC web graph (local rank index). Quarterly updates."
+    elif in_crawl:
+        note = "Domain found in CC crawl but below ranking threshold (too small/new for PageRank rankings)."
+    else:
+        note = "Domain not found in Common Crawl data. It may be too new, too small, or not yet crawled."
+
+    # Not written to the per-domain cache: the index answers as fast
+    return {
+        "status": "success",
+        "data": {
+            "domain": domain,
+            "in_crawl": in_crawl,
+            "in_rankings": in_rankings,
+            "pagerank": rankings_data.get("pagerank"),
+            "pagerank_rank": rankings_data.get("pagerank_rank"),
+            "harmonic_centrality": rankings_data.get("harmonic_centrality"),
+            "harmonic_centrality_rank": rankings_data.get("harmonic_centrality_rank"),
+            "n_hosts": rankings_data.get("n_hosts"),
+            "top_referring_domains": [],
+            "referring_domains_sample": 0,
+            "note": note,
+        },
+        "error": None,
+        "metadata": {
+            "source": "commoncrawl",
+            "release": release,
+            "from_cache": False,
+            "rank_index": rank_index.path,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+    }
+
+
+def build_rank_index(release: Optional[str] = None, ranks_file: Optional[str] = None,
+                     timeout: int = 120) -> dict:
+    """
+    Build the local rank index for a release (one-time, per release).
+
+    Args:
+        release: CC release name. Auto-detects latest if None.
+        ranks_file: Local copy of <release>-domain-ranks.txt.gz to read
+            instead of streaming it from Common Crawl.
+        timeout: Download timeout in seconds (per read).
+
+    Returns:
+        Standard response dict with the build stats.
+    """
+    if not release:
+        release = _get_latest_release()
+        if not release:
+            return {
+                "status": "error",
+                "data": None,
+                "error": "Could not find any Common Crawl web graph release. Check connectivity.",
+                "metadata": {"source": "commoncrawl"},
+            }
+
+    path = _rank_index_path(release)
+    source = ranks_file or _graph_file_url(release, RANKINGS_SUFFIX)
+    lines = iter_file_lines(ranks_file) if ranks_file else _iter_remote_gz_lines(source, timeout=timeout)
+    stale = _rank_indexes.pop(path, None)
+    if stale is not None:
+        stale.close()
+    try:
+        stats = build_index(lines, path)
+    except (OSError, ValueError, requests.exceptions.RequestException) as e:
+        return {
+            "status": "error",
+            "data": None,
+            "error": f"Could not build rank index from {source}: {e}",
+            "metadata": {"source": "commoncrawl", "release": release},
+        }
+
+    return {
+        "status": "success",
+        "data": {"release": release, "path": path, "ranks_source": source, **stats},
+        "error": None,
+        "metadata": {
+            "source": "commoncrawl",
+            "release": release,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+    }
+
+
 def get_graph_info() -> dict:
     """
     Get information about available CC web graph releases and cache status.
@@ -361,6 +518,7 @@ def get_graph_info() -> dict:
             "latest_release": latest,
             "known_releases": KNOWN_RELEASES,
             "cache_dir": cache_dir,
+            "indexed_releases": _indexed_releases(),
             "cached_files": len(cached_files),
             "cached_domains": [f.split("-cc-main")[0] for f in cached_files],
         },
@@ -409,6 +567,16 @@ def main():
         default=20,
         help="Number of top referring domains to return (default: 20)",
     )
+    parser.add_argument(
+        "--build-index",
+        action="store_true",
+        help="Build the local rank index for --release (default: latest), once per release",
+    )
+    parser.add_argument(
+        "--ranks-file",
+        default=None,
+        help="With --build-index, read this downloaded domain-ranks.txt.gz instead of streaming it",
+    )
     parser.add_argument(
         "--json",
         action="store_true",
@@ -428,6 +596,22 @@ def main():
             print(f"  Known releases: {', '.join(data.get('known_releases', []))}")
             print(f"  Cache dir:      {data.get('cache_dir', 'N/A')}")
             print(f"  Cached domains: {data.get('cached_files', 0)}")
+            print(f"  Rank indexes:   {', '.join(data.get('indexed_releases', [])) or 'none'}")
+        return
+
+    if args.build_index:
+        result = build_rank_index(release=args.release, ranks_file=args.ranks_file, timeout=args.timeout)
+        if args.json:
+            print(json.dumps(result, indent=2))
+        elif result["status"] == "success":
+            data = result["data"]
+            print(f"Built rank index for {data['release']}: {data['records']:,} domains, "
+                  f"{data['bytes'] / (1024 * 1024):.1f} MB in {data['seconds']}s")
+            print(f"  {data['path']}")
+        else:
+            print(f"Error: {result['error']}", file=sys.stderr)
+        if result["status"] != "success":
+            sys.exit(1)
         return
 
     if not args.domain:
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Shared DNS cache and SSRF guard for the fetch scripts.
+
+fetch_page.py, analyze_visual.py and capture_screenshot.py check that a URL
+does not resolve to a private/internal address before fetching it. They
+use this module so that the check and the connection agree on the address:
+
+  - check_host() resolves once (cached for DEFAULT_TTL seconds), rejects
+    the host if any of its addresses is private, loopback, reserved or
+    link-local, and returns the validated addresses to connect to. A
+    DNSCache built with `allow` exempts specific addresses or networks
+    (tests use it to reach a server on 127.0.0.1).
+  - fetch_page's connections resolve through the same cache and connect to
+    those validated addresses, re-checking them, which also covers
+    redirects. Like getaddrinfo-based clients, they try each address in
+    turn until one accepts the connection.
+  - The Playwright scripts pin Chromium to the first of them with
+    --host-resolver-rules.
+
+Usage:
+    python dns_cache.py example.com [other.example ...]
+
+Output: JSON with the addresses and SSRF verdict per host.
+"""
+
+import argparse
+import ipaddress
+import json
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+DEFAULT_TTL = 300
+MAX_ENTRIES = 4096
+
+
+def is_blocked_ip(address: str, allow: tuple = ()) -> bool:
+    """
+    True for private, loopback, reserved and link-local addresses, unless
+    the address falls in one of the `allow` networks (ipaddress objects).
+    """
+    try:
+        ip = ipaddress.ip_address(address.split("%", 1)[0])
+    except ValueError:
+        return True
+    if any(ip in network for network in allow if network.version == ip.version):
+        return False
+    return ip.is_private or ip.is_loopback or ip.is_reserved or ip.is_link_local
+
+
+class DNSCache:
+    """
+    Thread-safe, TTL-bounded cache of hostname -> addresses.
+
+    Failed lookups are not cached. Entries are evicted oldest-first past
+    max_entries. `allow` lists addresses or networks ("127.0.0.1",
+    "10.1.0.0/16") that check() accepts even though they are internal.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_entries: int = MAX_ENTRIES, allow: Iterable[str] = ()):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.allow = tuple(ipaddress.ip_network(a, strict=False) for a in allow)
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, host: str) -> list:
+        """
+        All addresses for `host` in resolver order, IPv4 and IPv6.
+
+        Raises socket.gaierror (or UnicodeError for invalid names) like
+        getaddrinfo.
+        """
+        key = host.lower().rstrip(".")
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        infos = socket.getaddrinfo(key, None, 0, socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+
+        with self._lock:
+            self._entries[key] = (now + self.ttl, addresses)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return addresses
+
+    def check(self, hostname: Optional[str]) -> tuple:
+        """
+        SSRF check for a hostname.
+
+        Returns:
+            (addresses, blocked): `addresses` are the validated addresses
+            to connect to, in resolver order, or empty if the name does not
+            resolve (let the HTTP client report that). `blocked` is the
+            offending address if any address the name resolves to is
+            private/internal and not allowed; addresses is empty then.
+        """
+        if not hostname:
+            return [], None
+        try:
+            addresses = self.resolve(hostname)
+        except (socket.gaierror, UnicodeError):
+            return [], None
+        for address in addresses:
+            if is_blocked_ip(address, self.allow):
+                return [], address
+        return list(addresses), None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = DNSCache()
+
+
+def resolve(host: str) -> list:
+    """Addresses for `host` from the shared cache."""
+    return _cache.resolve(host)
+
+
+def check_host(hostname: Optional[str], cache: Optional[DNSCache] = None) -> tuple:
+    """SSRF check for a hostname through `cache` (default: the shared one). See DNSCache.check()."""
+    return (cache or _cache).check(hostname)
+
+
+def host_resolver_rule(hostname: str, address: str) -> str:
+    """Chromium --host-resolver-rules value mapping `hostname` to `address`."""
+    if ":" in address:
+        address = f"[{address}]"
+    return f"MAP {hostname} {address}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve hosts through the shared DNS cache and SSRF check")
+    parser.add_argument("hosts", nargs="+", help="Hostnames to check")
+    args = parser.parse_args()
+
+    results = []
+    for host in args.hosts:
+        connect_to, blocked = check_host(host)
+        try:
+            addresses = resolve(host)
+            error = None
+        except (socket.gaierror, UnicodeError) as e:
+            addresses, error = [], str(e)
+        results.append({
+            "host": host,
+            "addresses": addresses,
+            "connect_to": connect_to,
+            "blocked": blocked,
+            "error": error,
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,13 @@ Stores title, meta tags, canonical, headings, schema/JSON-LD, OG tags,
 and Core Web Vitals as a "known good" state in SQLite.
 
 Usage:
-    python drift_baseline.py <url> [--skip-cwv]
+    python drift_baseline.py <url> [--skip-cwv] [--mode inprocess|subprocess]
+    python drift_baseline.py --urls urls.txt [--workers 8] [--per-host 2] [--skip-cwv]
+    python drift_baseline.py --sitemap https://example.com/sitemap.xml [--limit 20000]
+    python drift_baseline.py <url> --snapshot    # also archive raw HTML for drift_replay.py
 
 Output: JSON with baseline ID, timestamp, and captured elements.
-Storage: ~/.cache/gemini-seo/drift/baselines.db
+Storage: ~/.cache/gemini-seo/drift/baselines.db (snapshots.db with --snapshot)
 """
 
 import argparse
@@ -20,8 +23,14 @@ import re
 import sqlite3
 import subprocess
 import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime, timezone
 from urllib.parse import parse_qs, urlparse, urlunparse, urlencode
+from xml.etree import ElementTree
 
 # ---------------------------------------------------------------------------
 # Path setup — resolve scripts/ directory relative to this file
@@ -30,9 +39,13 @@ SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, SCRIPTS_DIR)
 
 from google_auth import validate_url  # noqa: E402
-
-DB_DIR = os.path.expanduser("~/.cache/gemini-seo/drift")
-DB_PATH = os.path.join(DB_DIR, "baselines.db")
+from fetch_page import map_by_host  # noqa: E402
+from drift_db import (  # noqa: E402
+    blob_row_values,
+    init_db,
+    init_snapshot_db,
+    put_snapshot,
+)
 
 # UTM parameters to strip during URL normalization
 UTM_PARAMS = {"utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content"}
@@ -83,71 +96,137 @@ def url_hash(url: str) -> str:
     return hashlib.sha256(normalized.encode()).hexdigest()[:16]
 
 
-# ---------------------------------------------------------------------------
-# Database setup
-# ---------------------------------------------------------------------------
-
-def init_db() -> sqlite3.Connection:
-    """Initialize the SQLite database and return a connection."""
-    os.makedirs(DB_DIR, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS baselines (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            url TEXT NOT NULL,
-            url_hash TEXT NOT NULL,
-            timestamp TEXT NOT NULL,
-            title TEXT,
-            meta_description TEXT,
-            canonical TEXT,
-            robots TEXT,
-            h1 TEXT,
-            h2_json TEXT,
-            h3_json TEXT,
-            schema_json TEXT,
-            og_json TEXT,
-            cwv_json TEXT,
-            html_hash TEXT,
-            schema_hash TEXT,
-            status_code INTEGER
-        )
-    """)
-    conn.execute("""
-        CREATE INDEX IF NOT EXISTS idx_url_hash ON baselines(url_hash)
-    """)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS comparisons (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            url TEXT NOT NULL,
-            url_hash TEXT NOT NULL,
-            baseline_id INTEGER NOT NULL,
-            timestamp TEXT NOT NULL,
-            results_json TEXT NOT NULL,
-            critical_count INTEGER DEFAULT 0,
-            warning_count INTEGER DEFAULT 0,
-            info_count INTEGER DEFAULT 0,
-            FOREIGN KEY (baseline_id) REFERENCES baselines(id)
-        )
-    """)
-    conn.execute("""
-        CREATE INDEX IF NOT EXISTS idx_comp_url_hash ON comparisons(url_hash)
-    """)
-    conn.commit()
-    return conn
-
-
 # ---------------------------------------------------------------------------
 # Page fetching via existing scripts (SSRF-protected)
 # ---------------------------------------------------------------------------
 
-def fetch_page_data(url: str) -> dict:
+# "inprocess" imports fetch_page / parse_html / pagespeed_check once and calls
+# them directly. "subprocess" spawns one interpreter per script per URL and is
+# kept for parity checks and benchmarking (see benchmarks/bench_drift_pipeline.py).
+EXECUTION_MODES = ("inprocess", "subprocess")
+DEFAULT_EXECUTION_MODE = "inprocess"
+
+# The parse_html() fields the baseline record and the drift rules read;
+# images, links, Twitter tags and word count are not extracted
+PARSED_FIELDS = (
+    "title", "meta_description", "meta_robots", "canonical",
+    "h1", "h2", "h3", "schema", "open_graph",
+)
+
+# Independent budgets for the two halves of a capture (seconds)
+PAGE_TIMEOUT = 60
+PSI_TIMEOUT = 120
+
+
+def fetch_page_data(
+    url: str,
+    mode: str = DEFAULT_EXECUTION_MODE,
+    known: dict | None = None,
+    timeout: int = PAGE_TIMEOUT,
+) -> dict:
     """
     Fetch and parse a page using the project's existing scripts.
 
-    Returns dict with keys: status_code, html, parsed, error
+    Args:
+        url: The URL to fetch.
+        mode: 'inprocess' (default) or 'subprocess'.
+        known: Optional validators from a stored baseline (keys: etag,
+            last_modified, html_hash, status_code). When given, the request is
+            conditional (in-process mode only) and parsing is skipped if the
+            server answers 304 or the body hashes to the known html_hash.
+        timeout: Page fetch timeout in seconds.
+
+    Returns dict with keys: status_code, final_url, headers, html, parsed,
+    unchanged ('not_modified', 'html_hash' or None), error
     """
-    result = {"status_code": None, "html": None, "parsed": None, "error": None}
+    if mode == "subprocess":
+        return _fetch_page_data_subprocess(url, known, timeout)
+    return _fetch_page_data_inprocess(url, known, timeout)
+
+
+def conditional_headers(known: dict | None) -> dict:
+    """Build If-None-Match / If-Modified-Since headers from stored validators."""
+    headers = {}
+    if known and known.get("etag"):
+        headers["If-None-Match"] = known["etag"]
+    if known and known.get("last_modified"):
+        headers["If-Modified-Since"] = known["last_modified"]
+    return headers
+
+
+def get_header(headers: dict, name: str) -> str | None:
+    """Case-insensitive lookup in a plain response-header dict."""
+    name = name.lower()
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _unchanged_body(html: str, status_code: int | None, known: dict | None) -> bool:
+    """True if the body and status match a stored baseline exactly."""
+    return bool(
+        known
+        and known.get("html_hash")
+        and status_code == known.get("status_code")
+        and hash_content(html) == known["html_hash"]
+    )
+
+
+def _fetch_page_data_inprocess(url: str, known: dict | None = None, timeout: int = PAGE_TIMEOUT) -> dict:
+    """Fetch via fetch_page.fetch_page() and parse via parse_html.parse_html()."""
+    from fetch_page import fetch_page
+    from parse_html import parse_html
+
+    result = {
+        "status_code": None,
+        "final_url": None,
+        "headers": {},
+        "html": None,
+        "parsed": None,
+        "unchanged": None,
+        "error": None,
+    }
+
+    # fetch_page() applies its own SSRF check (private/loopback/reserved IPs)
+    fetched = fetch_page(url, timeout=timeout, extra_headers=conditional_headers(known) or None)
+    result["status_code"] = fetched["status_code"]
+    result["final_url"] = fetched["url"]
+    result["headers"] = fetched["headers"]
+    if fetched["error"]:
+        result["error"] = f"Fetch failed: {fetched['error']}"
+        return result
+
+    if fetched["status_code"] == 304 and known:
+        result["unchanged"] = "not_modified"
+        return result
+
+    html_content = fetched["content"] or ""
+    result["html"] = html_content
+
+    if _unchanged_body(html_content, fetched["status_code"], known):
+        result["unchanged"] = "html_hash"
+        return result
+
+    try:
+        result["parsed"] = parse_html(html_content, url, fields=PARSED_FIELDS)
+    except Exception as e:  # same contract as the subprocess path: report, don't raise
+        result["error"] = f"Parse failed: {e}"
+
+    return result
+
+
+def _fetch_page_data_subprocess(url: str, known: dict | None = None, timeout: int = PAGE_TIMEOUT) -> dict:
+    """Fetch and parse by spawning fetch_page.py and parse_html.py."""
+    result = {
+        "status_code": None,
+        "final_url": None,
+        "headers": {},
+        "html": None,
+        "parsed": None,
+        "unchanged": None,
+        "error": None,
+    }
 
     # Step 1: Fetch the page via fetch_page.py
     fetch_script = os.path.join(SCRIPTS_DIR, "fetch_page.py")
@@ -156,10 +235,10 @@ def fetch_page_data(url: str) -> dict:
             [sys.executable, fetch_script, url, "--output", "/dev/stdout"],
             capture_output=True,
             text=True,
-            timeout=60,
+            timeout=timeout,
         )
     except subprocess.TimeoutExpired:
-        result["error"] = "Page fetch timed out after 60 seconds"
+        result["error"] = f"Page fetch timed out after {timeout} seconds"
         return result
 
     if proc.returncode != 0:
@@ -172,13 +251,21 @@ def fetch_page_data(url: str) -> dict:
     # Extract status code from stderr output (fetch_page.py prints "Status: NNN")
     status_match = re.search(r"Status:\s*(\d+)", proc.stderr or "")
     result["status_code"] = int(status_match.group(1)) if status_match else 200
+    url_match = re.search(r"^URL:\s*(\S+)", proc.stderr or "", re.MULTILINE)
+    result["final_url"] = url_match.group(1) if url_match else url
     result["html"] = html_content
 
+    # fetch_page.py cannot send conditional headers, but an identical body
+    # still lets us skip the parse step
+    if _unchanged_body(html_content, result["status_code"], known):
+        result["unchanged"] = "html_hash"
+        return result
+
     # Step 2: Parse the HTML via parse_html.py
     parse_script = os.path.join(SCRIPTS_DIR, "parse_html.py")
     try:
         proc = subprocess.run(
-            [sys.executable, parse_script, "--url", url, "--json"],
+            [sys.executable, parse_script, "--url", url, "--json", "--fields", ",".join(PARSED_FIELDS)],
             input=html_content,
             capture_output=True,
             text=True,
@@ -201,19 +288,145 @@ def fetch_page_data(url: str) -> dict:
     return result
 
 
-def fetch_cwv_data(url: str) -> dict | None:
+def fetch_cwv_data(url: str, mode: str = DEFAULT_EXECUTION_MODE, timeout: int = PSI_TIMEOUT) -> dict | None:
     """
-    Fetch Core Web Vitals via pagespeed_check.py.
+    Fetch Core Web Vitals via pagespeed_check.
+
+    Args:
+        url: The URL to analyze (mobile strategy).
+        mode: 'inprocess' (default) or 'subprocess'.
+        timeout: PSI request timeout in seconds.
 
     Returns CWV dict or None on failure.
     """
+    return fetch_cwv_result(url, mode=mode, timeout=timeout)["cwv"]
+
+
+def fetch_cwv_result(url: str, mode: str = DEFAULT_EXECUTION_MODE, timeout: int = PSI_TIMEOUT) -> dict:
+    """
+    Like fetch_cwv_data(), but keep the reason when PSI fails.
+
+    Returns:
+        Dict with keys: cwv (dict or None), error (str or None).
+    """
+    if mode == "subprocess":
+        psi = _fetch_psi_subprocess(url, timeout)
+    else:
+        from google_auth import get_api_key
+        from pagespeed_check import run_pagespeed
+
+        psi = run_pagespeed(url, strategy="mobile", api_key=get_api_key(), timeout=timeout)
+
+    if not psi or psi.get("error"):
+        return {"cwv": None, "error": (psi or {}).get("error") or "PageSpeed Insights returned no data"}
+
+    # Extract the key metrics
+    cwv = {
+        "performance_score": psi.get("lighthouse_scores", {}).get("performance"),
+        "lab_metrics": psi.get("lab_metrics", {}),
+        "field_metrics": psi.get("field_metrics", {}),
+    }
+    return {"cwv": cwv, "error": None}
+
+
+_psi_pool = None
+_psi_pool_size = 0
+_psi_pool_lock = threading.Lock()
+
+
+def _psi_executor(workers: int = 1) -> ThreadPoolExecutor:
+    """
+    Process-wide pool for PSI calls with at least `workers` threads.
+
+    Batch callers pass their page concurrency, so every page in flight can
+    have its PSI call running rather than queued. A caller needing more
+    threads than the current pool has gets a larger pool; calls already on
+    the old one finish there.
+    """
+    global _psi_pool, _psi_pool_size
+    workers = max(1, workers)
+    with _psi_pool_lock:
+        if _psi_pool is None or _psi_pool_size < workers:
+            previous = _psi_pool
+            _psi_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="drift-psi")
+            _psi_pool_size = workers
+            if previous is not None:
+                previous.shutdown(wait=False)
+        return _psi_pool
+
+
+def _timed_psi(running: threading.Event, started: list, url: str, mode: str, timeout: int) -> dict:
+    """PSI worker: record when the call actually starts, then run it."""
+    started.append(time.monotonic())
+    running.set()
+    return fetch_cwv_result(url, mode, timeout)
+
+
+def fetch_page_and_cwv(
+    url: str,
+    mode: str = DEFAULT_EXECUTION_MODE,
+    known: dict | None = None,
+    skip_cwv: bool = False,
+    page_timeout: int = PAGE_TIMEOUT,
+    psi_timeout: int = PSI_TIMEOUT,
+    psi_workers: int = 1,
+) -> tuple:
+    """
+    Fetch/parse the page and run PageSpeed Insights at the same time.
+
+    PSI is submitted to a shared pool first and the page is fetched on the
+    calling thread, so a capture takes about max(fetch, PSI) instead of the
+    sum. Each half has its own timeout; PSI's counts from when its call
+    starts running, so time spent queued behind other pages' calls is not
+    charged to it. Results are partial rather than all-or-nothing: a PSI
+    failure or timeout leaves the page data intact and is reported as
+    cwv["error"]. If the page fails, the PSI result is dropped (a queued
+    call is cancelled) since nothing can be stored without the page.
+
+    Batch callers pass their page concurrency as `psi_workers` to size the
+    shared PSI pool (see _psi_executor).
+
+    Returns:
+        (page_data, cwv) where page_data is fetch_page_data() output and cwv
+        is a fetch_cwv_result() dict, or None when skip_cwv is set.
+    """
+    future = None
+    running = threading.Event()
+    psi_started = []
+    if not skip_cwv:
+        future = _psi_executor(psi_workers).submit(_timed_psi, running, psi_started, url, mode, psi_timeout)
+
+    page_data = fetch_page_data(url, mode=mode, known=known, timeout=page_timeout)
+    if future is None:
+        return page_data, None
+    if page_data["error"]:
+        future.cancel()
+        return page_data, {"cwv": None, "error": "Skipped: page fetch failed"}
+
+    # A call still queued after a whole PSI budget is given up on; one that
+    # is running gets its full budget from its own start time
+    if not running.wait(psi_timeout) and future.cancel():
+        return page_data, {"cwv": None, "error": f"PageSpeed Insights timed out after {psi_timeout} seconds queued behind other calls"}
+    running.wait()
+    remaining = psi_started[0] + psi_timeout - time.monotonic()
+    try:
+        cwv = future.result(timeout=max(0.0, remaining))
+    except FutureTimeoutError:
+        cwv = {"cwv": None, "error": f"PageSpeed Insights timed out after {psi_timeout} seconds"}
+    except Exception as e:  # keep the page result even if PSI blows up
+        cwv = {"cwv": None, "error": f"PageSpeed Insights failed: {e}"}
+    return page_data, cwv
+
+
+def _fetch_psi_subprocess(url: str, timeout: int = PSI_TIMEOUT) -> dict | None:
+    """Run pagespeed_check.py in a child interpreter and return the mobile PSI dict."""
     psi_script = os.path.join(SCRIPTS_DIR, "pagespeed_check.py")
     try:
         proc = subprocess.run(
             [sys.executable, psi_script, url, "--psi-only", "--strategy", "mobile", "--json"],
             capture_output=True,
             text=True,
-            timeout=180,
+            timeout=timeout,
         )
     except subprocess.TimeoutExpired:
         return None
@@ -226,17 +439,7 @@ def fetch_cwv_data(url: str) -> dict | None:
     except json.JSONDecodeError:
         return None
 
-    # Extract the key metrics
-    psi = data.get("psi", {}).get("mobile", {})
-    if psi.get("error"):
-        return None
-
-    cwv = {
-        "performance_score": psi.get("lighthouse_scores", {}).get("performance"),
-        "lab_metrics": psi.get("lab_metrics", {}),
-        "field_metrics": psi.get("field_metrics", {}),
-    }
-    return cwv
+    return data.get("psi", {}).get("mobile", {})
 
 
 # ---------------------------------------------------------------------------
@@ -249,55 +452,47 @@ def hash_content(content: str) -> str:
 
 
 # ---------------------------------------------------------------------------
-# Main baseline capture
+# Baseline records
 # ---------------------------------------------------------------------------
 
-def capture_baseline(url: str, skip_cwv: bool = False) -> dict:
+# Column order for INSERTs into the baselines table
+BASELINE_COLUMNS = (
+    "url", "url_hash", "timestamp", "title", "meta_description", "canonical",
+    "robots", "h1", "h2_json", "h3_json", "schema_json", "og_json", "cwv_json",
+    "html_hash", "schema_hash", "status_code", "etag", "last_modified",
+)
+
+
+def build_baseline_record(url: str, page_data: dict, cwv_data: dict | None) -> dict:
     """
-    Capture a full SEO baseline for a URL.
+    Turn fetched + parsed page data into a baselines row (keyed by column name).
 
     Args:
-        url: The URL to baseline.
-        skip_cwv: If True, skip Core Web Vitals fetch.
+        url: The URL as requested (normalized here).
+        page_data: Output of fetch_page_data() with a non-empty 'parsed'.
+        cwv_data: Output of fetch_cwv_data(), or None.
 
     Returns:
-        Dict with baseline data or error.
+        Dict with one key per BASELINE_COLUMNS entry.
     """
-    # Validate URL (SSRF protection)
-    if not validate_url(url):
-        return {"error": "URL rejected: only public http/https URLs are accepted (SSRF protection)"}
-
-    # Fetch and parse the page
-    page_data = fetch_page_data(url)
-    if page_data["error"]:
-        return {"error": page_data["error"]}
-
     parsed = page_data["parsed"]
-    if not parsed:
-        return {"error": "No parsed data returned from HTML parser"}
-
-    # Fetch CWV (optional)
-    cwv_data = None
-    if not skip_cwv:
-        cwv_data = fetch_cwv_data(url)
 
     # Compute hashes
     html_content_hash = hash_content(page_data["html"]) if page_data["html"] else None
     schema_content = json.dumps(parsed.get("schema", []), sort_keys=True)
     schema_content_hash = hash_content(schema_content) if parsed.get("schema") else None
 
-    # Prepare baseline record
-    now = datetime.now(timezone.utc).isoformat()
-    norm_url = normalize_url(url)
-    uhash = url_hash(url)
-
     h1_list = parsed.get("h1", [])
     h1_text = h1_list[0] if h1_list else None
 
-    baseline = {
-        "url": norm_url,
-        "url_hash": uhash,
-        "timestamp": now,
+    # Validators for conditional re-fetches; only meaningful on a 200
+    headers = page_data.get("headers") or {}
+    cacheable = page_data["status_code"] == 200
+
+    return {
+        "url": normalize_url(url),
+        "url_hash": url_hash(url),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
         "title": parsed.get("title"),
         "meta_description": parsed.get("meta_description"),
         "canonical": parsed.get("canonical"),
@@ -311,75 +506,406 @@ def capture_baseline(url: str, skip_cwv: bool = False) -> dict:
         "html_hash": html_content_hash,
         "schema_hash": schema_content_hash,
         "status_code": page_data["status_code"],
+        "etag": get_header(headers, "ETag") if cacheable else None,
+        "last_modified": get_header(headers, "Last-Modified") if cacheable else None,
     }
 
+
+def insert_baselines(conn: sqlite3.Connection, records: list) -> list:
+    """
+    Insert baseline records in a single transaction.
+
+    JSON fields are written to the blob store (see drift_db) and the row
+    keeps only their content hashes, so unchanged headings/schema/OG/CWV
+    across captures are stored once.
+
+    Returns:
+        List of new baseline IDs, in the same order as records.
+    """
+    ids = []
+    with conn:
+        for record in records:
+            row = blob_row_values(conn, {c: record[c] for c in BASELINE_COLUMNS})
+            placeholders = ", ".join("?" for _ in row)
+            cursor = conn.execute(
+                f"INSERT INTO baselines ({', '.join(row)}) VALUES ({placeholders})",
+                tuple(row.values()),
+            )
+            ids.append(cursor.lastrowid)
+    return ids
+
+
+def collect_baseline(
+    url: str,
+    skip_cwv: bool = False,
+    mode: str = DEFAULT_EXECUTION_MODE,
+    page_timeout: int = PAGE_TIMEOUT,
+    psi_timeout: int = PSI_TIMEOUT,
+    psi_workers: int = 1,
+) -> dict:
+    """
+    Validate, fetch, parse and (optionally) measure CWV for one URL, without storing.
+
+    The page and PSI run concurrently (see fetch_page_and_cwv, which also
+    takes `psi_workers`). A PSI failure still yields a record, with cwv None
+    and the reason in cwv_error.
+
+    Returns:
+        Dict with keys: record (baselines row or None), parsed, cwv, cwv_error,
+        html, error.
+    """
+    out = {"record": None, "parsed": None, "cwv": None, "cwv_error": None, "html": None, "error": None}
+
+    # Validate URL (SSRF protection)
+    if not validate_url(url):
+        out["error"] = "URL rejected: only public http/https URLs are accepted (SSRF protection)"
+        return out
+
+    # Fetch and parse the page, with CWV (optional) in parallel
+    page_data, cwv = fetch_page_and_cwv(
+        url, mode=mode, skip_cwv=skip_cwv,
+        page_timeout=page_timeout, psi_timeout=psi_timeout, psi_workers=psi_workers,
+    )
+    if page_data["error"]:
+        out["error"] = page_data["error"]
+        return out
+
+    parsed = page_data["parsed"]
+    if not parsed:
+        out["error"] = "No parsed data returned from HTML parser"
+        return out
+
+    cwv_data = cwv["cwv"] if cwv else None
+    out["cwv_error"] = cwv["error"] if cwv else None
+
+    out["record"] = build_baseline_record(url, page_data, cwv_data)
+    out["parsed"] = parsed
+    out["cwv"] = cwv_data
+    out["html"] = page_data["html"]
+    return out
+
+
+def store_snapshots(records: list, htmls: list) -> int:
+    """
+    Archive the raw HTML behind baseline records in the snapshot store.
+
+    Versions already archived for a URL are skipped. Returns the number of
+    records that have a snapshot afterwards.
+    """
+    stored = 0
+    conn = init_snapshot_db()
+    try:
+        with conn:
+            for record, html in zip(records, htmls):
+                if html and record["html_hash"]:
+                    put_snapshot(conn, record["url_hash"], record["html_hash"], html)
+                    stored += 1
+    finally:
+        conn.close()
+    return stored
+
+
+def _baseline_summary(record: dict, parsed: dict, cwv_data: dict | None) -> dict:
+    """Human-oriented summary of a stored baseline."""
+    meta = record["meta_description"]
+    html_content_hash = record["html_hash"]
+    return {
+        "title": record["title"],
+        "meta_description": meta[:80] + "..." if meta and len(meta) > 80 else meta,
+        "canonical": record["canonical"],
+        "robots": record["robots"],
+        "h1": record["h1"],
+        "h2_count": len(parsed.get("h2", [])),
+        "h3_count": len(parsed.get("h3", [])),
+        "schema_count": len(parsed.get("schema", [])),
+        "og_tag_count": len(parsed.get("open_graph", {})),
+        "cwv_captured": cwv_data is not None,
+        "status_code": record["status_code"],
+        "html_hash": html_content_hash[:12] + "..." if html_content_hash else None,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Main baseline capture
+# ---------------------------------------------------------------------------
+
+def capture_baseline(
+    url: str,
+    skip_cwv: bool = False,
+    mode: str = DEFAULT_EXECUTION_MODE,
+    snapshot: bool = False,
+    page_timeout: int = PAGE_TIMEOUT,
+    psi_timeout: int = PSI_TIMEOUT,
+) -> dict:
+    """
+    Capture a full SEO baseline for a URL.
+
+    Args:
+        url: The URL to baseline.
+        skip_cwv: If True, skip Core Web Vitals fetch.
+        mode: Execution mode for fetch/parse/PSI ('inprocess' or 'subprocess').
+        snapshot: Also archive the raw HTML for offline replay.
+        page_timeout: Page fetch timeout in seconds.
+        psi_timeout: PageSpeed Insights timeout in seconds.
+
+    Returns:
+        Dict with baseline data or error.
+    """
+    collected = collect_baseline(
+        url, skip_cwv=skip_cwv, mode=mode, page_timeout=page_timeout, psi_timeout=psi_timeout
+    )
+    if collected["error"]:
+        return {"error": collected["error"]}
+
+    record = collected["record"]
+
     # Store in SQLite
     conn = init_db()
     try:
-        cursor = conn.execute(
-            """
-            INSERT INTO baselines (
-                url, url_hash, timestamp, title, meta_description, canonical,
-                robots, h1, h2_json, h3_json, schema_json, og_json, cwv_json,
-                html_hash, schema_hash, status_code
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                baseline["url"],
-                baseline["url_hash"],
-                baseline["timestamp"],
-                baseline["title"],
-                baseline["meta_description"],
-                baseline["canonical"],
-                baseline["robots"],
-                baseline["h1"],
-                baseline["h2_json"],
-                baseline["h3_json"],
-                baseline["schema_json"],
-                baseline["og_json"],
-                baseline["cwv_json"],
-                baseline["html_hash"],
-                baseline["schema_hash"],
-                baseline["status_code"],
-            ),
-        )
-        conn.commit()
-        baseline_id = cursor.lastrowid
+        baseline_id = insert_baselines(conn, [record])[0]
     finally:
         conn.close()
 
-    # Build summary output
-    h2_count = len(parsed.get("h2", []))
-    h3_count = len(parsed.get("h3", []))
-    schema_count = len(parsed.get("schema", []))
-    og_count = len(parsed.get("open_graph", {}))
-
-    output = {
+    result = {
         "status": "ok",
         "baseline_id": baseline_id,
-        "url": norm_url,
-        "timestamp": now,
-        "summary": {
-            "title": baseline["title"],
-            "meta_description": (
-                baseline["meta_description"][:80] + "..."
-                if baseline["meta_description"] and len(baseline["meta_description"]) > 80
-                else baseline["meta_description"]
-            ),
-            "canonical": baseline["canonical"],
-            "robots": baseline["robots"],
-            "h1": baseline["h1"],
-            "h2_count": h2_count,
-            "h3_count": h3_count,
-            "schema_count": schema_count,
-            "og_tag_count": og_count,
-            "cwv_captured": cwv_data is not None,
-            "status_code": baseline["status_code"],
-            "html_hash": html_content_hash[:12] + "..." if html_content_hash else None,
-        },
+        "url": record["url"],
+        "timestamp": record["timestamp"],
+        "summary": _baseline_summary(record, collected["parsed"], collected["cwv"]),
     }
+    if collected["cwv_error"]:
+        result["cwv_error"] = collected["cwv_error"]
+    if snapshot:
+        try:
+            result["snapshot_stored"] = store_snapshots([record], [collected["html"]]) == 1
+        except sqlite3.Error as e:
+            # Non-fatal: the baseline itself is already stored
+            result["snapshot_warning"] = f"Could not store snapshot: {e}"
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Bulk capture (URL lists and sitemaps)
+# ---------------------------------------------------------------------------
+
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+# sitemaps.org caps a sitemap at 50 MB uncompressed; also bounds gunzipping
+SITEMAP_MAX_BYTES = 50 * 1024 * 1024
+
+
+def read_url_list(path: str) -> list:
+    """
+    Read one URL per line from a file ('-' for stdin). Blank lines and
+    '#' comments are skipped.
+    """
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(os.path.realpath(path), "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    return [ln.strip() for ln in lines if ln.strip() and not ln.strip().startswith("#")]
+
+
+def _sitemap_xml(url: str, fetched: dict) -> bytes:
+    """
+    The XML bytes of a fetched sitemap, gunzipped when its name or
+    Content-Type says gzip and the body still is (a server sending
+    Content-Encoding: gzip has it decoded in transit already).
+
+    Raises:
+        ValueError: If the gzip data is corrupt or inflates past
+            SITEMAP_MAX_BYTES.
+    """
+    body = fetched["content"] or b""
+    content_type = next(
+        (v for k, v in (fetched.get("headers") or {}).items() if k.lower() == "content-type"), ""
+    )
+    says_gzip = urlparse(url).path.lower().endswith(".gz") or "gzip" in content_type.lower()
+    if not (says_gzip and body[:2] == b"\x1f\x8b"):
+        return body
+    try:
+        xml = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(body, SITEMAP_MAX_BYTES + 1)
+    except zlib.error as e:
+        raise ValueError(f"invalid gzip: {e}")
+    if len(xml) > SITEMAP_MAX_BYTES:
+        raise ValueError(f"larger than {SITEMAP_MAX_BYTES // (1024 * 1024)} MB uncompressed")
+    return xml
+
+
+def read_sitemap_urls(sitemap_url: str, limit: int = 50000, max_sitemaps: int = 100) -> list:
+    """
+    Collect page URLs from an XML sitemap or sitemap index.
+
+    Child sitemaps of an index are followed breadth-first. Every sitemap is
+    fetched through fetch_page() so the SSRF check applies. The XML is parsed
+    from the undecoded body, so its own encoding declaration is honoured,
+    and gzipped (.xml.gz) sitemaps are inflated.
+
+    Args:
+        sitemap_url: Sitemap or sitemap index URL.
+        limit: Stop after this many page URLs.
+        max_sitemaps: Stop after fetching this many sitemap files.
 
-    return output
+    Returns:
+        List of page URLs (document order, de-duplicated).
+
+    Raises:
+        ValueError: If the top-level sitemap cannot be fetched or parsed.
+    """
+    from fetch_page import fetch_page
+
+    pending = [sitemap_url]
+    seen_sitemaps = set()
+    urls = []
+    seen_urls = set()
+
+    while pending and len(seen_sitemaps) < max_sitemaps and len(urls) < limit:
+        current = pending.pop(0)
+        if current in seen_sitemaps or not validate_url(current):
+            continue
+        seen_sitemaps.add(current)
+
+        fetched = fetch_page(current, timeout=60, raw=True)
+        error = fetched["error"] or (
+            f"HTTP {fetched['status_code']}" if fetched["status_code"] != 200 else None
+        )
+        root = None
+        if not error:
+            try:
+                root = ElementTree.fromstring(_sitemap_xml(current, fetched))
+            except ElementTree.ParseError as e:
+                error = f"invalid XML: {e}"
+            except ValueError as e:
+                error = str(e)
+        if error:
+            if current == sitemap_url:
+                raise ValueError(f"Could not read sitemap {current}: {error}")
+            print(f"Warning: skipping sitemap {current}: {error}", file=sys.stderr)
+            continue
+
+        if root.tag == f"{SITEMAP_NS}sitemapindex":
+            for loc in root.iter(f"{SITEMAP_NS}loc"):
+                if loc.text:
+                    pending.append(loc.text.strip())
+            continue
+
+        for loc in root.iter(f"{SITEMAP_NS}loc"):
+            page = (loc.text or "").strip()
+            if page and page not in seen_urls:
+                seen_urls.add(page)
+                urls.append(page)
+                if len(urls) >= limit:
+                    break
+
+    return urls
+
+
+def capture_baselines(
+    urls: list,
+    skip_cwv: bool = False,
+    mode: str = DEFAULT_EXECUTION_MODE,
+    workers: int = 8,
+    per_host: int = 2,
+    batch_size: int = 200,
+    snapshot: bool = False,
+    page_timeout: int = PAGE_TIMEOUT,
+    psi_timeout: int = PSI_TIMEOUT,
+) -> dict:
+    """
+    Capture baselines for many URLs concurrently.
+
+    Fetch/parse/CWV run on a bounded thread pool with a per-host concurrency
+    cap. Rows are written by the calling thread in batched transactions, so
+    SQLite sees one commit per `batch_size` pages instead of one per page.
+
+    Args:
+        urls: URLs to baseline. Duplicates (after normalization) are dropped.
+        skip_cwv: Skip Core Web Vitals fetch.
+        mode: Execution mode for fetch/parse/PSI.
+        workers: Maximum concurrent pages in flight.
+        per_host: Maximum concurrent pages per hostname.
+        batch_size: Rows per INSERT transaction.
+        snapshot: Also archive each page's raw HTML for offline replay.
+        page_timeout: Per-page fetch timeout in seconds.
+        psi_timeout: Per-page PageSpeed Insights timeout in seconds.
+
+    Returns:
+        Dict with a summary and one compact entry per URL.
+    """
+    unique = {}
+    for u in urls:
+        unique.setdefault(url_hash(u), u)
+    queue = list(unique.values())
+    if not queue:
+        return {"error": "No URLs to baseline."}
+
+    def _work(u: str) -> dict:
+        return collect_baseline(
+            u, skip_cwv=skip_cwv, mode=mode,
+            page_timeout=page_timeout, psi_timeout=psi_timeout, psi_workers=workers,
+        )
+
+    def _crashed(u: str, e: Exception) -> dict:  # a worker crash must not lose the batch
+        return {"record": None, "error": f"Unexpected error: {e}"}
+
+    results = []
+    pending_records = []
+    pending_entries = []
+    pending_html = []
+    summary = {"total": len(queue), "captured": 0, "failed": 0, "cwv_captured": 0}
+    if snapshot:
+        summary["snapshots"] = 0
+    started = time.monotonic()
+
+    def _flush():
+        ids = insert_baselines(conn, pending_records)
+        for entry, baseline_id in zip(pending_entries, ids):
+            entry["baseline_id"] = baseline_id
+        if snapshot:
+            summary["snapshots"] += store_snapshots(pending_records, pending_html)
+        pending_records.clear()
+        pending_entries.clear()
+        pending_html.clear()
+
+    conn = init_db()
+    try:
+        for u, collected in map_by_host(_work, queue, workers=workers, per_host=per_host, on_error=_crashed):
+            if collected["error"]:
+                summary["failed"] += 1
+                results.append({"url": normalize_url(u), "status": "error", "error": collected["error"]})
+                continue
+
+            record = collected["record"]
+            summary["captured"] += 1
+            if collected["cwv"] is not None:
+                summary["cwv_captured"] += 1
+            entry = {
+                "url": record["url"],
+                "status": "ok",
+                "baseline_id": None,
+                "status_code": record["status_code"],
+                "title": record["title"],
+            }
+            if collected["cwv_error"]:
+                entry["cwv_error"] = collected["cwv_error"]
+            results.append(entry)
+            pending_records.append(record)
+            pending_entries.append(entry)
+            pending_html.append(collected["html"] if snapshot else None)
+            if len(pending_records) >= batch_size:
+                _flush()
+        if pending_records:
+            _flush()
+    finally:
+        conn.close()
+
+    summary["elapsed_seconds"] = round(time.monotonic() - started, 2)
+    return {
+        "status": "ok",
+        "summary": summary,
+        "results": results,
+    }
 
 
 # ---------------------------------------------------------------------------
@@ -390,15 +916,104 @@ def main():
     parser = argparse.ArgumentParser(
         description="Capture an SEO baseline snapshot for drift monitoring"
     )
-    parser.add_argument("url", help="URL to baseline")
+    parser.add_argument("url", nargs="?", help="URL to baseline")
+    parser.add_argument(
+        "--urls",
+        metavar="FILE",
+        help="Bulk mode: file with one URL per line ('-' for stdin)",
+    )
+    parser.add_argument(
+        "--sitemap",
+        metavar="URL",
+        help="Bulk mode: baseline every page listed in this sitemap (or sitemap index)",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=50000,
+        help="Bulk mode: maximum URLs to read from a sitemap (default: 50000)",
+    )
     parser.add_argument(
         "--skip-cwv",
         action="store_true",
         help="Skip Core Web Vitals fetch (faster, uses less API quota)",
     )
+    parser.add_argument(
+        "--mode",
+        choices=EXECUTION_MODES,
+        default=DEFAULT_EXECUTION_MODE,
+        help="Run fetch/parse/PSI in this process or as child scripts (default: inprocess)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Bulk mode: concurrent pages in flight (default: 8)",
+    )
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=2,
+        help="Bulk mode: concurrent pages per hostname (default: 2)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=200,
+        help="Bulk mode: baselines per database transaction (default: 200)",
+    )
+    parser.add_argument(
+        "--page-timeout",
+        type=int,
+        default=PAGE_TIMEOUT,
+        help=f"Page fetch timeout in seconds (default: {PAGE_TIMEOUT})",
+    )
+    parser.add_argument(
+        "--psi-timeout",
+        type=int,
+        default=PSI_TIMEOUT,
+        help=f"PageSpeed Insights timeout in seconds, runs alongside the page fetch (default: {PSI_TIMEOUT})",
+    )
+    parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help="Also archive the raw HTML (compressed, deduplicated) for drift_replay.py",
+    )
 
     args = parser.parse_args()
-    result = capture_baseline(args.url, skip_cwv=args.skip_cwv)
+
+    if args.urls or args.sitemap:
+        urls = [args.url] if args.url else []
+        try:
+            if args.urls:
+                urls.extend(read_url_list(args.urls))
+            if args.sitemap:
+                urls.extend(read_sitemap_urls(args.sitemap, limit=args.limit))
+        except (OSError, ValueError) as e:
+            print(json.dumps({"error": str(e)}, indent=2))
+            sys.exit(1)
+        result = capture_baselines(
+            urls,
+            skip_cwv=args.skip_cwv,
+            mode=args.mode,
+            workers=args.workers,
+            per_host=args.per_host,
+            batch_size=args.batch_size,
+            snapshot=args.snapshot,
+            page_timeout=args.page_timeout,
+            psi_timeout=args.psi_timeout,
+        )
+    elif args.url:
+        result = capture_baseline(
+            args.url,
+            skip_cwv=args.skip_cwv,
+            mode=args.mode,
+            snapshot=args.snapshot,
+            page_timeout=args.page_timeout,
+            psi_timeout=args.psi_timeout,
+        )
+    else:
+        parser.error("a URL, --urls FILE or --sitemap URL is required")
 
     print(json.dumps(result, indent=2))
 
@@ -6,7 +6,8 @@ Applies 17 comparison rules across 3 severity levels (CRITICAL, WARNING, INFO).
 Fetches current page state and compares against the most recent baseline.
 
 Usage:
-    python drift_compare.py <url> [--skip-cwv] [--baseline-id ID]
+    python drift_compare.py <url> [--skip-cwv] [--baseline-id ID] [--mode inprocess|subprocess]
+    python drift_compare.py --all [--match GLOB] [--host HOST] [--workers 8] [--per-host 2]
 
 Output: JSON with diffs, severity levels, and recommended actions.
 """
@@ -16,6 +17,7 @@ import json
 import os
 import sqlite3
 import sys
+import time
 from datetime import datetime, timezone
 from difflib import SequenceMatcher
 
@@ -27,14 +29,17 @@ sys.path.insert(0, SCRIPTS_DIR)
 
 from google_auth import validate_url  # noqa: E402
 from drift_baseline import (  # noqa: E402
-    DB_PATH,
-    fetch_cwv_data,
-    fetch_page_data,
+    DEFAULT_EXECUTION_MODE,
+    EXECUTION_MODES,
+    PAGE_TIMEOUT,
+    PSI_TIMEOUT,
+    fetch_page_and_cwv,
     hash_content,
-    init_db,
+    map_by_host,
     normalize_url,
     url_hash,
 )
+from drift_db import hydrate_baseline, init_db, url_filter_clause  # noqa: E402
 
 
 # ---------------------------------------------------------------------------
@@ -62,7 +67,7 @@ def load_baseline(conn: sqlite3.Connection, uhash: str, baseline_id: int | None
         return None
 
     columns = [desc[0] for desc in conn.execute("SELECT * FROM baselines LIMIT 0").description]
-    return dict(zip(columns, row))
+    return hydrate_baseline(conn, dict(zip(columns, row)))
 
 
 # ---------------------------------------------------------------------------
@@ -353,65 +358,21 @@ def rule_17_content_hash_changed(baseline: dict, current_html_hash: str | None)
 
 
 # ---------------------------------------------------------------------------
-# Main comparison
+# Rule evaluation
 # ---------------------------------------------------------------------------
 
-def run_comparison(url: str, skip_cwv: bool = False, baseline_id: int | None = None) -> dict:
-    """
-    Compare current page state to stored baseline.
-
-    Args:
-        url: The URL to compare.
-        skip_cwv: Skip Core Web Vitals fetch.
-        baseline_id: Specific baseline ID to compare against (default: most recent).
-
-    Returns:
-        Dict with comparison results or error.
-    """
-    # Validate URL (SSRF protection)
-    if not validate_url(url):
-        return {"error": "URL rejected: only public http/https URLs are accepted (SSRF protection)"}
-
-    uhash = url_hash(url)
-    norm_url = normalize_url(url)
+SEVERITIES = ("CRITICAL", "WARNING", "INFO")
 
-    # Load baseline
-    conn = init_db()
-    try:
-        baseline = load_baseline(conn, uhash, baseline_id)
-    except sqlite3.Error as e:
-        conn.close()
-        return {"error": f"Database error: {e}"}
 
-    if not baseline:
-        conn.close()
-        msg = f"No baseline found for {norm_url}."
-        if baseline_id:
-            msg += f" (baseline_id={baseline_id})"
-        msg += " Run `drift baseline` first."
-        return {"error": msg}
-
-    # Fetch current page state
-    page_data = fetch_page_data(url)
-    if page_data["error"]:
-        conn.close()
-        return {"error": page_data["error"]}
-
-    parsed = page_data["parsed"]
-    if not parsed:
-        conn.close()
-        return {"error": "No parsed data returned from HTML parser"}
-
-    # Fetch current CWV (optional)
-    current_cwv = None
-    if not skip_cwv:
-        current_cwv = fetch_cwv_data(url)
-
-    # Compute current hashes
-    current_html_hash = hash_content(page_data["html"]) if page_data["html"] else None
-
-    # Run all 17 comparison rules
-    findings = [
+def evaluate_rules(
+    baseline: dict,
+    parsed: dict,
+    status_code: int | None,
+    current_cwv: dict | None,
+    current_html_hash: str | None,
+) -> list:
+    """Run all 17 comparison rules and return their findings in rule order."""
+    return [
         # CRITICAL (Rules 1-8)
         rule_01_schema_removed(baseline, parsed),
         rule_02_canonical_changed(baseline, parsed),
@@ -420,7 +381,7 @@ def run_comparison(url: str, skip_cwv: bool = False, baseline_id: int | None = N
         rule_05_h1_removed(baseline, parsed),
         rule_06_h1_changed_significantly(baseline, parsed),
         rule_07_title_removed(baseline, parsed),
-        rule_08_status_code_error(baseline, page_data["status_code"]),
+        rule_08_status_code_error(baseline, status_code),
         # WARNING (Rules 9-14)
         rule_09_title_changed(baseline, parsed),
         rule_10_meta_description_changed(baseline, parsed),
@@ -434,6 +395,15 @@ def run_comparison(url: str, skip_cwv: bool = False, baseline_id: int | None = N
         rule_17_content_hash_changed(baseline, current_html_hash),
     ]
 
+
+def build_comparison_result(
+    norm_url: str,
+    baseline: dict,
+    findings: list,
+    status_code: int | None,
+    cwv_compared: bool,
+) -> dict:
+    """Assemble the comparison output dict from evaluated findings."""
     # Separate triggered and untriggered
     triggered = [f for f in findings if f["triggered"]]
     untriggered = [f for f in findings if not f["triggered"]]
@@ -443,15 +413,12 @@ def run_comparison(url: str, skip_cwv: bool = False, baseline_id: int | None = N
     warning_count = sum(1 for f in triggered if f["severity"] == "WARNING")
     info_count = sum(1 for f in triggered if f["severity"] == "INFO")
 
-    now = datetime.now(timezone.utc).isoformat()
-
-    # Build result
-    result = {
+    return {
         "status": "ok",
         "url": norm_url,
         "baseline_id": baseline["id"],
         "baseline_timestamp": baseline["timestamp"],
-        "comparison_timestamp": now,
+        "comparison_timestamp": datetime.now(timezone.utc).isoformat(),
         "summary": {
             "total_rules": len(findings),
             "triggered": len(triggered),
@@ -461,31 +428,175 @@ def run_comparison(url: str, skip_cwv: bool = False, baseline_id: int | None = N
         },
         "triggered_findings": triggered,
         "untriggered_findings": untriggered,
-        "current_status_code": page_data["status_code"],
-        "cwv_compared": current_cwv is not None,
+        "current_status_code": status_code,
+        "cwv_compared": cwv_compared,
     }
 
-    # Store comparison in database
-    try:
-        conn.execute(
+
+# Rules that need no parsed page (CWV only); the rest are skipped for unchanged pages
+CWV_RULES = (rule_11_cwv_regressed, rule_12_performance_score_dropped)
+
+
+def compare_to_baseline(
+    url: str,
+    baseline: dict,
+    skip_cwv: bool = False,
+    mode: str = DEFAULT_EXECUTION_MODE,
+    conditional: bool = True,
+    page_timeout: int = PAGE_TIMEOUT,
+    psi_timeout: int = PSI_TIMEOUT,
+    psi_workers: int = 1,
+) -> dict:
+    """
+    Fetch the current page and evaluate it against an already-loaded baseline.
+
+    Touches no database, so it is safe to call from worker threads. The page
+    and PSI are fetched concurrently; if PSI fails or times out, the content
+    rules still run, the CWV rules see no data, and the reason is reported
+    as cwv_error.
+
+    With `conditional`, the fetch carries If-None-Match / If-Modified-Since from
+    the baseline's stored validators. A 304, or a body whose hash equals the
+    baseline html_hash, short-circuits: nothing is parsed and only the CWV rules
+    (which don't depend on the HTML) are evaluated.
+
+    Returns:
+        Comparison result dict, or {"error": ...}.
+    """
+    known = None
+    if conditional:
+        known = {
+            "etag": baseline.get("etag"),
+            "last_modified": baseline.get("last_modified"),
+            "html_hash": baseline.get("html_hash"),
+            "status_code": baseline.get("status_code"),
+        }
+
+    page_data, cwv = fetch_page_and_cwv(
+        url, mode=mode, known=known, skip_cwv=skip_cwv,
+        page_timeout=page_timeout, psi_timeout=psi_timeout, psi_workers=psi_workers,
+    )
+    if page_data["error"]:
+        return {"error": page_data["error"]}
+
+    unchanged = page_data.get("unchanged")
+    parsed = page_data["parsed"]
+    if not parsed and not unchanged:
+        return {"error": "No parsed data returned from HTML parser"}
+
+    current_cwv = cwv["cwv"] if cwv else None
+
+    if unchanged:
+        findings = [rule(baseline, current_cwv) for rule in CWV_RULES] if current_cwv else []
+        result = build_comparison_result(
+            normalize_url(url), baseline, findings, page_data["status_code"], current_cwv is not None
+        )
+        result["unchanged"] = unchanged
+        result["summary"]["rules_skipped"] = 17 - len(findings)
+    else:
+        # Compute current hashes
+        current_html_hash = hash_content(page_data["html"]) if page_data["html"] else None
+
+        findings = evaluate_rules(
+            baseline, parsed, page_data["status_code"], current_cwv, current_html_hash
+        )
+        result = build_comparison_result(
+            normalize_url(url), baseline, findings, page_data["status_code"], current_cwv is not None
+        )
+
+    if cwv and cwv["error"]:
+        result["cwv_error"] = cwv["error"]
+    return result
+
+
+def insert_comparisons(conn: sqlite3.Connection, results: list) -> None:
+    """Store comparison results in a single transaction."""
+    with conn:
+        conn.executemany(
             """
             INSERT INTO comparisons (
                 url, url_hash, baseline_id, timestamp, results_json,
                 critical_count, warning_count, info_count
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            (
-                norm_url,
-                uhash,
-                baseline["id"],
-                now,
-                json.dumps(result),
-                critical_count,
-                warning_count,
-                info_count,
-            ),
+            [
+                (
+                    r["url"],
+                    url_hash(r["url"]),
+                    r["baseline_id"],
+                    r["comparison_timestamp"],
+                    json.dumps(r),
+                    r["summary"]["critical"],
+                    r["summary"]["warning"],
+                    r["summary"]["info"],
+                )
+                for r in results
+            ],
         )
-        conn.commit()
+
+
+# ---------------------------------------------------------------------------
+# Main comparison
+# ---------------------------------------------------------------------------
+
+def run_comparison(
+    url: str,
+    skip_cwv: bool = False,
+    baseline_id: int | None = None,
+    mode: str = DEFAULT_EXECUTION_MODE,
+    conditional: bool = True,
+    page_timeout: int = PAGE_TIMEOUT,
+    psi_timeout: int = PSI_TIMEOUT,
+) -> dict:
+    """
+    Compare current page state to stored baseline.
+
+    Args:
+        url: The URL to compare.
+        skip_cwv: Skip Core Web Vitals fetch.
+        baseline_id: Specific baseline ID to compare against (default: most recent).
+        mode: Execution mode for fetch/parse/PSI ('inprocess' or 'subprocess').
+        conditional: Short-circuit unchanged pages (304 or identical html_hash).
+        page_timeout: Page fetch timeout in seconds.
+        psi_timeout: PageSpeed Insights timeout in seconds.
+
+    Returns:
+        Dict with comparison results or error.
+    """
+    # Validate URL (SSRF protection)
+    if not validate_url(url):
+        return {"error": "URL rejected: only public http/https URLs are accepted (SSRF protection)"}
+
+    uhash = url_hash(url)
+    norm_url = normalize_url(url)
+
+    # Load baseline
+    conn = init_db()
+    try:
+        baseline = load_baseline(conn, uhash, baseline_id)
+    except sqlite3.Error as e:
+        conn.close()
+        return {"error": f"Database error: {e}"}
+
+    if not baseline:
+        conn.close()
+        msg = f"No baseline found for {norm_url}."
+        if baseline_id:
+            msg += f" (baseline_id={baseline_id})"
+        msg += " Run `drift baseline` first."
+        return {"error": msg}
+
+    result = compare_to_baseline(
+        url, baseline, skip_cwv=skip_cwv, mode=mode, conditional=conditional,
+        page_timeout=page_timeout, psi_timeout=psi_timeout,
+    )
+    if result.get("error"):
+        conn.close()
+        return result
+
+    # Store comparison in database
+    try:
+        insert_comparisons(conn, [result])
     except sqlite3.Error as e:
         # Non-fatal: comparison still succeeds even if we can't persist it
         result["db_warning"] = f"Could not save comparison: {e}"
@@ -495,15 +606,204 @@ def run_comparison(url: str, skip_cwv: bool = False, baseline_id: int | None = N
     return result
 
 
+# ---------------------------------------------------------------------------
+# Fleet comparison (--all)
+# ---------------------------------------------------------------------------
+
+def load_latest_baselines(
+    conn: sqlite3.Connection,
+    match: str | None = None,
+    host: str | None = None,
+) -> list:
+    """
+    Load the most recent baseline for every baselined URL.
+
+    Args:
+        conn: Open drift database connection.
+        match: Optional GLOB pattern on the normalized URL (e.g. '*/blog/*').
+        host: Optional hostname filter (exact, case-insensitive).
+
+    Returns:
+        List of baseline row dicts, ordered by URL.
+    """
+    sql = """
+        SELECT b.* FROM baselines b
+        JOIN (SELECT url_hash, MAX(id) AS id FROM baselines GROUP BY url_hash) latest
+          ON b.id = latest.id
+    """
+    where, params = url_filter_clause("b.url", match, host)
+    if where:
+        sql += " WHERE " + where
+    sql += " ORDER BY b.url"
+
+    cursor = conn.execute(sql, params)
+    columns = [desc[0] for desc in cursor.description]
+    # Shared across rows: sites reuse the same OG/schema blocks on many pages
+    blob_cache = {}
+    return [hydrate_baseline(conn, dict(zip(columns, row)), blob_cache) for row in cursor.fetchall()]
+
+
+def run_fleet_comparison(
+    match: str | None = None,
+    host: str | None = None,
+    skip_cwv: bool = False,
+    mode: str = DEFAULT_EXECUTION_MODE,
+    workers: int = 8,
+    per_host: int = 2,
+    batch_size: int = 200,
+    conditional: bool = True,
+    page_timeout: int = PAGE_TIMEOUT,
+    psi_timeout: int = PSI_TIMEOUT,
+) -> dict:
+    """
+    Compare every baselined URL (or a filtered subset) against its latest baseline.
+
+    Baselines are loaded once over a single connection, pages are fetched on a
+    bounded worker pool with a per-host cap, and comparison rows are written
+    in batched transactions by the calling thread.
+
+    Returns:
+        Dict with an aggregated severity rollup and one compact entry per URL.
+        Full findings are stored in the comparisons table as usual.
+    """
+    conn = init_db()
+    try:
+        try:
+            baselines = load_latest_baselines(conn, match=match, host=host)
+        except sqlite3.Error as e:
+            return {"error": f"Database error: {e}"}
+        if not baselines:
+            return {"error": "No baselines match. Run `drift baseline` first."}
+
+        queue = {b["url"]: b for b in baselines}
+
+        def _work(u: str) -> dict:
+            if not validate_url(u):
+                return {"error": "URL rejected: only public http/https URLs are accepted (SSRF protection)"}
+            return compare_to_baseline(
+                u, queue[u], skip_cwv=skip_cwv, mode=mode, conditional=conditional,
+                page_timeout=page_timeout, psi_timeout=psi_timeout, psi_workers=workers,
+            )
+
+        def _crashed(u: str, e: Exception) -> dict:  # one bad page must not sink the sweep
+            return {"error": f"Unexpected error: {e}"}
+
+        rollup = {
+            "urls": len(baselines),
+            "compared": 0,
+            "unchanged": 0,
+            "failed": 0,
+            "with_drift": 0,
+            "critical": 0,
+            "warning": 0,
+            "info": 0,
+            "urls_with_critical": 0,
+            "cwv_failed": 0,
+            "rules": {},
+        }
+        entries = []
+        pending = []
+        db_warning = None
+        started = time.monotonic()
+
+        def _flush():
+            nonlocal db_warning
+            try:
+                insert_comparisons(conn, pending)
+            except sqlite3.Error as e:
+                db_warning = f"Could not save some comparisons: {e}"
+            pending.clear()
+
+        for u, result in map_by_host(_work, list(queue), workers=workers, per_host=per_host, on_error=_crashed):
+            if result.get("error"):
+                rollup["failed"] += 1
+                entries.append({"url": u, "status": "error", "error": result["error"]})
+                continue
+
+            summary = result["summary"]
+            rollup["compared"] += 1
+            rollup["unchanged"] += 1 if result.get("unchanged") else 0
+            rollup["with_drift"] += 1 if summary["triggered"] else 0
+            rollup["urls_with_critical"] += 1 if summary["critical"] else 0
+            rollup["cwv_failed"] += 1 if result.get("cwv_error") else 0
+            for sev in SEVERITIES:
+                rollup[sev.lower()] += summary[sev.lower()]
+            for f in result["triggered_findings"]:
+                rollup["rules"][f["rule"]] = rollup["rules"].get(f["rule"], 0) + 1
+
+            entries.append({
+                "url": u,
+                "status": "ok",
+                "baseline_id": result["baseline_id"],
+                "critical": summary["critical"],
+                "warning": summary["warning"],
+                "info": summary["info"],
+                "unchanged": result.get("unchanged"),
+                "triggered_rules": [f["rule"] for f in result["triggered_findings"]],
+            })
+            pending.append(result)
+            if len(pending) >= batch_size:
+                _flush()
+        if pending:
+            _flush()
+    finally:
+        conn.close()
+
+    # Worst pages first, then by URL for stable output
+    entries.sort(key=lambda e: (-e.get("critical", 0), -e.get("warning", 0), -e.get("info", 0), e["url"]))
+    rollup["rules"] = dict(sorted(rollup["rules"].items(), key=lambda kv: (-kv[1], kv[0])))
+    rollup["elapsed_seconds"] = round(time.monotonic() - started, 2)
+
+    output = {
+        "status": "ok",
+        "comparison_timestamp": datetime.now(timezone.utc).isoformat(),
+        "summary": rollup,
+        "results": entries,
+    }
+    if db_warning:
+        output["db_warning"] = db_warning
+    return output
+
+
 # ---------------------------------------------------------------------------
 # CLI
 # ---------------------------------------------------------------------------
 
+def _print_severity_summary(summary: dict) -> None:
+    """Print critical/warning/info counts to stderr."""
+    critical = summary.get("critical", 0)
+    warning = summary.get("warning", 0)
+    info = summary.get("info", 0)
+
+    if critical > 0:
+        print(f"\n*** {critical} CRITICAL finding(s) ***", file=sys.stderr)
+    if warning > 0:
+        print(f"    {warning} WARNING finding(s)", file=sys.stderr)
+    if info > 0:
+        print(f"    {info} INFO finding(s)", file=sys.stderr)
+    if critical == 0 and warning == 0 and info == 0:
+        print("\n    No drift detected. Page matches baseline.", file=sys.stderr)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Compare current page state to stored SEO baseline"
     )
-    parser.add_argument("url", help="URL to compare against its baseline")
+    parser.add_argument("url", nargs="?", help="URL to compare against its baseline")
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Fleet mode: compare every baselined URL (combine with --match/--host to filter)",
+    )
+    parser.add_argument(
+        "--match",
+        metavar="GLOB",
+        help="Fleet mode: only URLs matching this glob (e.g. 'https://example.com/blog/*')",
+    )
+    parser.add_argument(
+        "--host",
+        help="Fleet mode: only URLs on this hostname",
+    )
     parser.add_argument(
         "--skip-cwv",
         action="store_true",
@@ -515,9 +815,77 @@ def main():
         default=None,
         help="Compare against a specific baseline ID (default: most recent)",
     )
+    parser.add_argument(
+        "--mode",
+        choices=EXECUTION_MODES,
+        default=DEFAULT_EXECUTION_MODE,
+        help="Run fetch/parse/PSI in this process or as child scripts (default: inprocess)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Fleet mode: concurrent pages in flight (default: 8)",
+    )
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=2,
+        help="Fleet mode: concurrent pages per hostname (default: 2)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=200,
+        help="Fleet mode: comparisons per database transaction (default: 200)",
+    )
+    parser.add_argument(
+        "--page-timeout",
+        type=int,
+        default=PAGE_TIMEOUT,
+        help=f"Page fetch timeout in seconds (default: {PAGE_TIMEOUT})",
+    )
+    parser.add_argument(
+        "--psi-timeout",
+        type=int,
+        default=PSI_TIMEOUT,
+        help=f"PageSpeed Insights timeout in seconds, runs alongside the page fetch (default: {PSI_TIMEOUT})",
+    )
+    parser.add_argument(
+        "--no-conditional",
+        action="store_true",
+        help="Always download and re-run every rule, even if the page is unchanged",
+    )
 
     args = parser.parse_args()
-    result = run_comparison(args.url, skip_cwv=args.skip_cwv, baseline_id=args.baseline_id)
+
+    if args.all or args.match or args.host:
+        if args.url or args.baseline_id is not None:
+            parser.error("--all/--match/--host cannot be combined with a URL or --baseline-id")
+        result = run_fleet_comparison(
+            match=args.match,
+            host=args.host,
+            skip_cwv=args.skip_cwv,
+            mode=args.mode,
+            workers=args.workers,
+            per_host=args.per_host,
+            batch_size=args.batch_size,
+            conditional=not args.no_conditional,
+            page_timeout=args.page_timeout,
+            psi_timeout=args.psi_timeout,
+        )
+    elif args.url:
+        result = run_comparison(
+            args.url,
+            skip_cwv=args.skip_cwv,
+            baseline_id=args.baseline_id,
+            mode=args.mode,
+            conditional=not args.no_conditional,
+            page_timeout=args.page_timeout,
+            psi_timeout=args.psi_timeout,
+        )
+    else:
+        parser.error("a URL or --all is required")
 
     print(json.dumps(result, indent=2))
 
@@ -526,18 +894,20 @@ def main():
 
     # Also print a human-readable summary to stderr
     summary = result.get("summary", {})
-    critical = summary.get("critical", 0)
-    warning = summary.get("warning", 0)
-    info = summary.get("info", 0)
-
-    if critical > 0:
-        print(f"\n*** {critical} CRITICAL finding(s) ***", file=sys.stderr)
-    if warning > 0:
-        print(f"    {warning} WARNING finding(s)", file=sys.stderr)
-    if info > 0:
-        print(f"    {info} INFO finding(s)", file=sys.stderr)
-    if critical == 0 and warning == 0 and info == 0:
-        print("\n    No drift detected. Page matches baseline.", file=sys.stderr)
+    if "urls" in summary:
+        print(
+            f"\n{summary['compared']}/{summary['urls']} URLs compared, "
+            f"{summary['unchanged']} unchanged, {summary['with_drift']} with drift, "
+            f"{summary['failed']} failed",
+            file=sys.stderr,
+        )
+        if summary["urls_with_critical"]:
+            print(f"    {summary['urls_with_critical']} URL(s) with CRITICAL findings", file=sys.stderr)
+    elif result.get("unchanged"):
+        print(f"\n    Page unchanged since baseline ({result['unchanged']}); content rules skipped.", file=sys.stderr)
+    if result.get("cwv_error"):
+        print(f"\n    CWV not compared: {result['cwv_error']}", file=sys.stderr)
+    _print_severity_summary(summary)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,862 @@
+#!/usr/bin/env python3
+"""
+SQLite storage layer for SEO drift monitoring.
+
+Owns the baselines.db schema and the content-addressed blob store used by
+drift_baseline.py, drift_compare.py and drift_history.py. Large JSON fields
+(headings, schema, OG tags, CWV) are stored once per distinct value in the
+`blobs` table, compressed, and referenced from baselines by SHA-256.
+
+Raw HTML snapshots (opt-in, `drift_baseline.py --snapshot`) live in a
+separate snapshots.db next to it, one row per distinct page version, stored
+as a zlib line delta against the previous version of the same URL.
+
+Schema changes are versioned migrations (MIGRATIONS, tracked in PRAGMA
+user_version) applied by init_db(). Retention (--prune) deletes old baselines
+by policy and releases the space with incremental auto-vacuum.
+
+Usage:
+    python drift_db.py --stats
+    python drift_db.py --migrate-blobs [--vacuum]
+    python drift_db.py --prune --keep-last 90 [--dry-run]
+    python drift_db.py --prune --thin-after 30 --thin-every 7
+
+Storage: ~/.cache/gemini-seo/drift/baselines.db, snapshots.db
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import zlib
+from typing import Optional
+from urllib.parse import urlparse
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DB_DIR = os.path.expanduser("~/.cache/gemini-seo/drift")
+DB_PATH = os.path.join(DB_DIR, "baselines.db")
+
+# Inline JSON column -> blob reference column
+BLOB_FIELDS = {
+    "h2_json": "h2_blob",
+    "h3_json": "h3_blob",
+    "schema_json": "schema_blob",
+    "og_json": "og_blob",
+    "cwv_json": "cwv_blob",
+}
+
+# Payloads smaller than this are stored uncompressed; the codec header would
+# cost more than it saves ("[]", "{}", short heading lists).
+MIN_COMPRESS_BYTES = 64
+
+DEFAULT_CODEC = "zstd" if zstandard is not None else "zlib"
+
+SNAPSHOT_DB_NAME = "snapshots.db"
+
+# Every Nth version of a URL is stored whole, bounding how many deltas a
+# read has to apply.
+SNAPSHOT_KEYFRAME_INTERVAL = 16
+
+# Versions are stored whole instead of as a delta when either page has more
+# lines than this, or when less than this share of the new version's lines
+# is found in the old one.
+SNAPSHOT_DELTA_MAX_LINES = 200_000
+SNAPSHOT_DELTA_MIN_MATCH = 0.5
+
+# Lines per window in the delta's anchor index
+_DELTA_ANCHOR_LINES = 4
+
+
+# ---------------------------------------------------------------------------
+# Schema
+# ---------------------------------------------------------------------------
+
+def _m1_base_tables(conn: sqlite3.Connection) -> None:
+    """Original baselines/comparisons tables."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS baselines (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT NOT NULL,
+            url_hash TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            title TEXT,
+            meta_description TEXT,
+            canonical TEXT,
+            robots TEXT,
+            h1 TEXT,
+            h2_json TEXT,
+            h3_json TEXT,
+            schema_json TEXT,
+            og_json TEXT,
+            cwv_json TEXT,
+            html_hash TEXT,
+            schema_hash TEXT,
+            status_code INTEGER
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS comparisons (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT NOT NULL,
+            url_hash TEXT NOT NULL,
+            baseline_id INTEGER NOT NULL,
+            timestamp TEXT NOT NULL,
+            results_json TEXT NOT NULL,
+            critical_count INTEGER DEFAULT 0,
+            warning_count INTEGER DEFAULT 0,
+            info_count INTEGER DEFAULT 0,
+            FOREIGN KEY (baseline_id) REFERENCES baselines(id)
+        )
+    """)
+
+
+def _m2_validators(conn: sqlite3.Connection) -> None:
+    """ETag / Last-Modified for conditional re-fetches."""
+    _add_missing_columns(conn, "baselines", {"etag": "TEXT", "last_modified": "TEXT"})
+
+
+def _m3_blob_store(conn: sqlite3.Connection) -> None:
+    """Content-addressed blobs table and the baselines columns that reference it."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS blobs (
+            hash TEXT PRIMARY KEY,
+            codec TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            data BLOB NOT NULL
+        )
+    """)
+    _add_missing_columns(conn, "baselines", {ref: "TEXT" for ref in BLOB_FIELDS.values()})
+
+
+def _m4_history_indexes(conn: sqlite3.Connection) -> None:
+    """
+    Composite per-URL indexes for "latest first" lookups.
+
+    (url_hash, id DESC) serves load_baseline, the MAX(id) GROUP BY of fleet
+    mode and history paging without a sort step. The comparisons index also
+    carries every column drift_history reads, so it never touches the table.
+    The old single-column indexes are prefixes of these and are dropped.
+    """
+    conn.execute("DROP INDEX IF EXISTS idx_url_hash")
+    conn.execute("DROP INDEX IF EXISTS idx_comp_url_hash")
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_baselines_url_id
+        ON baselines(url_hash, id DESC)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_comparisons_url_id
+        ON comparisons(url_hash, id DESC, baseline_id, timestamp,
+                       critical_count, warning_count, info_count)
+    """)
+    # Retention deletes comparisons by baseline
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_comparisons_baseline
+        ON comparisons(baseline_id)
+    """)
+
+
+def _m5_schedule(conn: sqlite3.Connection) -> None:
+    """Per-URL check schedule and work leases for drift_monitor.py."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schedule (
+            url_hash TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            interval_seconds INTEGER NOT NULL,
+            next_run_at REAL NOT NULL,
+            lease_owner TEXT,
+            lease_until REAL,
+            last_run_at REAL,
+            last_status TEXT,
+            last_error TEXT,
+            failures INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_schedule_next_run
+        ON schedule(next_run_at)
+    """)
+
+
+def _m6_schedule_host(conn: sqlite3.Connection) -> None:
+    """
+    Hostname per scheduled URL, so drift_monitor.claim_due() can cap work
+    per host in SQL across every scheduler sharing the database.
+    """
+    _add_missing_columns(conn, "schedule", {"host": "TEXT NOT NULL DEFAULT ''"})
+    rows = conn.execute("SELECT url_hash, url FROM schedule WHERE host = ''").fetchall()
+    conn.executemany(
+        "UPDATE schedule SET host = ? WHERE url_hash = ?",
+        [((urlparse(url).hostname or "").lower(), uhash) for uhash, url in rows],
+    )
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_schedule_host_lease
+        ON schedule(host, lease_until)
+    """)
+
+
+# (version, description, step). Steps are idempotent, so databases created
+# before versioning (user_version 0) at any earlier schema upgrade cleanly.
+# Append only; never renumber.
+MIGRATIONS = (
+    (1, "base tables", _m1_base_tables),
+    (2, "response validators", _m2_validators),
+    (3, "blob store", _m3_blob_store),
+    (4, "composite history indexes", _m4_history_indexes),
+    (5, "monitor schedule", _m5_schedule),
+    (6, "schedule host", _m6_schedule_host),
+)
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def migrate(conn: sqlite3.Connection) -> list:
+    """
+    Bring the schema up to SCHEMA_VERSION, tracked in PRAGMA user_version.
+
+    Each step runs in its own write transaction together with the version
+    bump, so a crash leaves the database at the last completed version and
+    two processes starting at once cannot apply a step twice.
+
+    Returns:
+        List of version numbers applied (empty when already current).
+    """
+    applied = []
+    for number, _description, step in MIGRATIONS:
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= number:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Re-check under the write lock
+            if conn.execute("PRAGMA user_version").fetchone()[0] < number:
+                step(conn)
+                conn.execute(f"PRAGMA user_version = {number}")
+                applied.append(number)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return applied
+
+
+def init_db() -> sqlite3.Connection:
+    """Initialize the SQLite database and return a connection."""
+    os.makedirs(DB_DIR, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH)
+    # Only takes effect while the file is still empty; older databases are
+    # switched over by `drift_db.py --vacuum`.
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.execute("PRAGMA journal_mode=WAL")
+    migrate(conn)
+    return conn
+
+
+def _add_missing_columns(conn: sqlite3.Connection, table: str, columns: dict) -> None:
+    """ALTER TABLE ADD COLUMN for each {name: type} not yet present in table."""
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for name, col_type in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {col_type}")
+
+
+def url_filter_clause(column: str, match: str | None = None, host: str | None = None) -> tuple:
+    """
+    WHERE fragment selecting normalized URLs by GLOB and/or hostname.
+
+    Returns:
+        (sql, params); sql is "" when there is nothing to filter.
+    """
+    clauses = []
+    params = []
+    if match:
+        clauses.append(f"{column} GLOB ?")
+        params.append(match)
+    if host:
+        # Normalized URLs are scheme://host[:port]/..., so prefix matches are exact
+        host = host.lower()
+        clauses.append(f"({column} GLOB ? OR {column} GLOB ? OR {column} GLOB ? OR {column} GLOB ?)")
+        params.extend([f"http://{host}/*", f"https://{host}/*", f"http://{host}:*", f"https://{host}:*"])
+    return " AND ".join(clauses), params
+
+
+# ---------------------------------------------------------------------------
+# Blob store
+# ---------------------------------------------------------------------------
+
+def _compress(raw: bytes, codec: str) -> tuple:
+    """Return (codec, payload). Small inputs are stored raw."""
+    if len(raw) < MIN_COMPRESS_BYTES:
+        return "raw", raw
+    if codec == "zstd" and zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=10).compress(raw)
+    return "zlib", zlib.compress(raw, 6)
+
+
+def _decompress(codec: str, payload: bytes) -> bytes:
+    """Inverse of _compress()."""
+    if codec == "raw":
+        return bytes(payload)
+    if codec == "zlib":
+        return zlib.decompress(payload)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Blob is zstd-compressed; install with: pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    raise ValueError(f"Unknown blob codec: {codec}")
+
+
+def put_blob(conn: sqlite3.Connection, text: str, codec: str = DEFAULT_CODEC) -> str:
+    """
+    Store a text value once, keyed by its SHA-256, and return the key.
+
+    Existing blobs are left untouched, so repeated captures of identical
+    JSON cost no extra storage. The INSERT is issued even then: it opens the
+    write transaction, so a concurrent gc_blobs() cannot delete the blob
+    before the caller's row referencing it is committed. Does not commit.
+    """
+    raw = text.encode("utf-8")
+    key = hashlib.sha256(raw).hexdigest()
+    used_codec, payload = _compress(raw, codec)
+    conn.execute(
+        "INSERT OR IGNORE INTO blobs (hash, codec, size, data) VALUES (?, ?, ?, ?)",
+        (key, used_codec, len(raw), sqlite3.Binary(payload)),
+    )
+    return key
+
+
+def get_blob(conn: sqlite3.Connection, key: str, cache: dict | None = None) -> str | None:
+    """Load and decompress a blob by key. Returns None if it does not exist."""
+    if cache is not None and key in cache:
+        return cache[key]
+    row = conn.execute("SELECT codec, data FROM blobs WHERE hash = ?", (key,)).fetchone()
+    if row is None:
+        return None
+    text = _decompress(row[0], row[1]).decode("utf-8")
+    if cache is not None:
+        cache[key] = text
+    return text
+
+
+def blob_row_values(conn: sqlite3.Connection, record: dict) -> dict:
+    """
+    Return a copy of a baselines record with the JSON fields moved into blobs.
+
+    The inline *_json columns are set to NULL and the matching *_blob columns
+    hold the blob keys (NULL stays NULL, e.g. a baseline without CWV).
+    """
+    row = dict(record)
+    for inline, ref in BLOB_FIELDS.items():
+        value = row.get(inline)
+        row[ref] = put_blob(conn, value) if value is not None else None
+        row[inline] = None
+    return row
+
+
+def hydrate_baseline(conn: sqlite3.Connection, row: dict, cache: dict | None = None) -> dict:
+    """
+    Fill in a baseline row's *_json fields from the blob store.
+
+    Rows written before blob storage (inline JSON, no refs) pass through
+    unchanged, so comparison rules see the same shape either way.
+    """
+    for inline, ref in BLOB_FIELDS.items():
+        if row.get(inline) is None and row.get(ref):
+            row[inline] = get_blob(conn, row[ref], cache)
+    return row
+
+
+# ---------------------------------------------------------------------------
+# HTML snapshot archive
+# ---------------------------------------------------------------------------
+
+def snapshot_db_path() -> str:
+    """Path of the snapshot archive, next to baselines.db."""
+    return os.path.join(DB_DIR, SNAPSHOT_DB_NAME)
+
+
+def init_snapshot_db() -> sqlite3.Connection:
+    """Initialize the snapshot archive and return a connection."""
+    os.makedirs(DB_DIR, exist_ok=True)
+    conn = sqlite3.connect(snapshot_db_path())
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS snapshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url_hash TEXT NOT NULL,
+            html_hash TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            base_id INTEGER,
+            chain_len INTEGER NOT NULL DEFAULT 0,
+            size INTEGER NOT NULL,
+            data BLOB NOT NULL,
+            UNIQUE (url_hash, html_hash),
+            FOREIGN KEY (base_id) REFERENCES snapshots(id)
+        )
+    """)
+    conn.commit()
+    return conn
+
+
+def _line_delta(old: str, new: str) -> Optional[list]:
+    """
+    Encode `new` as copy/insert ops against `old`, line by line, or None
+    when a delta is not worth it (see SNAPSHOT_DELTA_MAX_LINES and
+    SNAPSHOT_DELTA_MIN_MATCH).
+
+    ["c", i1, i2] copies old lines [i1:i2]; ["i", [...]] inserts new lines.
+
+    Linear time, unlike difflib, which is quadratic on the lines HTML
+    repeats (</div>, blank lines): every _DELTA_ANCHOR_LINES-line window of
+    `old` is indexed by content, and a copy continues line by line for as
+    long as the two versions agree. Where they stop agreeing, the next
+    window of `new` is looked up in the index; lines not found are inserted.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    if max(len(old_lines), len(new_lines)) > SNAPSHOT_DELTA_MAX_LINES:
+        return None
+
+    width = _DELTA_ANCHOR_LINES
+    anchors = {}
+    for i in range(len(old_lines) - width + 1):
+        anchors.setdefault(tuple(old_lines[i:i + width]), i)
+
+    ops = []
+    inserted = []
+    copied = 0
+    expect = 0      # old line following the last copy
+    j = 0
+    while j < len(new_lines):
+        if expect < len(old_lines) and old_lines[expect] == new_lines[j]:
+            start = expect
+        else:
+            start = anchors.get(tuple(new_lines[j:j + width]))
+            if start is None:
+                inserted.append(new_lines[j])
+                j += 1
+                continue
+        if inserted:
+            ops.append(["i", inserted])
+            inserted = []
+        end = start
+        while j < len(new_lines) and end < len(old_lines) and old_lines[end] == new_lines[j]:
+            end += 1
+            j += 1
+        if ops and ops[-1][0] == "c" and ops[-1][2] == start:
+            ops[-1][2] = end
+        else:
+            ops.append(["c", start, end])
+        copied += end - start
+        expect = end
+    if inserted:
+        ops.append(["i", inserted])
+    if copied < SNAPSHOT_DELTA_MIN_MATCH * len(new_lines):
+        return None
+    return ops
+
+
+def _apply_line_delta(old: str, ops: list) -> str:
+    """Inverse of _line_delta()."""
+    old_lines = old.splitlines(keepends=True)
+    out = []
+    for op in ops:
+        if op[0] == "c":
+            out.extend(old_lines[op[1]:op[2]])
+        else:
+            out.extend(op[1])
+    return "".join(out)
+
+
+def put_snapshot(conn: sqlite3.Connection, uhash: str, html_hash: str, html: str) -> int:
+    """
+    Archive one version of a page and return its snapshot id.
+
+    A version already stored for this URL (same html_hash) is not stored
+    again. Otherwise it is stored as a delta against the URL's latest
+    snapshot, or whole when it is a keyframe or the delta would not be
+    smaller. Does not commit.
+    """
+    row = conn.execute(
+        "SELECT id FROM snapshots WHERE url_hash = ? AND html_hash = ?",
+        (uhash, html_hash),
+    ).fetchone()
+    if row:
+        return row[0]
+
+    full = zlib.compress(html.encode("utf-8"), 6)
+    kind, base_id, chain_len, payload = "full", None, 0, full
+
+    latest = conn.execute(
+        "SELECT id, chain_len FROM snapshots WHERE url_hash = ? ORDER BY id DESC LIMIT 1",
+        (uhash,),
+    ).fetchone()
+    if latest and latest[1] + 1 < SNAPSHOT_KEYFRAME_INTERVAL:
+        ops = _line_delta(get_snapshot(conn, latest[0]), html)
+        if ops is not None:
+            delta = zlib.compress(json.dumps(ops, separators=(",", ":")).encode("utf-8"), 6)
+            if len(delta) < len(full):
+                kind, base_id, chain_len, payload = "delta", latest[0], latest[1] + 1, delta
+
+    cursor = conn.execute(
+        "INSERT INTO snapshots (url_hash, html_hash, kind, base_id, chain_len, size, data) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (uhash, html_hash, kind, base_id, chain_len, len(html), sqlite3.Binary(payload)),
+    )
+    return cursor.lastrowid
+
+
+def get_snapshot(conn: sqlite3.Connection, snapshot_id: int, cache: dict | None = None) -> str | None:
+    """
+    Rebuild the HTML of a snapshot by id, following its delta chain.
+
+    Args:
+        cache: Optional {snapshot_id: html} dict. Replaying a URL's history in
+            order hits it for every base, so each delta is applied once.
+    """
+    chain = []
+    current = snapshot_id
+    html = None
+    while current is not None:
+        if cache is not None and current in cache:
+            html = cache[current]
+            break
+        row = conn.execute(
+            "SELECT kind, base_id, data FROM snapshots WHERE id = ?", (current,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[0] == "full":
+            html = zlib.decompress(row[2]).decode("utf-8")
+            if cache is not None:
+                cache[current] = html
+            break
+        chain.append((current, row[2]))
+        current = row[1]
+
+    for sid, payload in reversed(chain):
+        html = _apply_line_delta(html, json.loads(zlib.decompress(payload)))
+        if cache is not None:
+            cache[sid] = html
+    return html
+
+
+def find_snapshot(conn: sqlite3.Connection, uhash: str, html_hash: str) -> int | None:
+    """Snapshot id for a URL version, or None if it was not archived."""
+    row = conn.execute(
+        "SELECT id FROM snapshots WHERE url_hash = ? AND html_hash = ?",
+        (uhash, html_hash),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def snapshot_stats(conn: sqlite3.Connection) -> dict:
+    """Version counts and sizes for the snapshot archive."""
+    urls, versions, raw_bytes, stored_bytes = conn.execute(
+        "SELECT COUNT(DISTINCT url_hash), COUNT(*), COALESCE(SUM(size), 0), "
+        "COALESCE(SUM(LENGTH(data)), 0) FROM snapshots"
+    ).fetchone()
+    kinds = dict(conn.execute("SELECT kind, COUNT(*) FROM snapshots GROUP BY kind").fetchall())
+    return {
+        "db_path": snapshot_db_path(),
+        "urls": urls,
+        "versions": versions,
+        "html_bytes": raw_bytes,
+        "stored_bytes": stored_bytes,
+        "kinds": kinds,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Maintenance
+# ---------------------------------------------------------------------------
+
+def migrate_inline_json(conn: sqlite3.Connection, batch_size: int = 500) -> dict:
+    """
+    Move inline JSON from pre-blob baselines rows into the blob store.
+
+    Works in id order, one transaction per batch, and is safe to interrupt
+    and re-run: rows already migrated have no inline JSON left.
+
+    Returns:
+        Dict with rows migrated and inline bytes moved.
+    """
+    inline_cols = list(BLOB_FIELDS)
+    where = " OR ".join(f"{c} IS NOT NULL" for c in inline_cols)
+    migrated = 0
+    inline_bytes = 0
+    last_id = 0
+
+    while True:
+        rows = conn.execute(
+            f"SELECT id, {', '.join(inline_cols)} FROM baselines "
+            f"WHERE id > ? AND ({where}) ORDER BY id LIMIT ?",
+            (last_id, batch_size),
+        ).fetchall()
+        if not rows:
+            break
+        with conn:
+            for row in rows:
+                record = dict(zip(inline_cols, row[1:]))
+                inline_bytes += sum(len(v.encode("utf-8")) for v in record.values() if v)
+                values = blob_row_values(conn, record)
+                assignments = ", ".join(f"{c} = ?" for c in values)
+                conn.execute(
+                    f"UPDATE baselines SET {assignments} WHERE id = ?",
+                    (*values.values(), row[0]),
+                )
+                migrated += 1
+        last_id = rows[-1][0]
+
+    return {"rows_migrated": migrated, "inline_bytes_moved": inline_bytes}
+
+
+def retention_candidates(
+    conn: sqlite3.Connection,
+    keep_last: int | None = None,
+    thin_after_days: int | None = None,
+    thin_every_days: int = 7,
+) -> list:
+    """
+    Baseline ids a retention policy would delete, oldest first.
+
+    Args:
+        keep_last: Keep at most this many baselines per URL.
+        thin_after_days: For baselines older than this, keep only the newest
+            one per URL in each `thin_every_days` bucket.
+        thin_every_days: Bucket width used when thinning.
+
+    The newest baseline of every URL is always kept.
+    """
+    conditions = []
+    params = []
+    if keep_last is not None:
+        conditions.append("rn > ?")
+        params.append(max(1, keep_last))
+    if thin_after_days is not None:
+        conditions.append("(age_days > ? AND bucket_rn > 1)")
+        params.append(thin_after_days)
+    if not conditions:
+        return []
+
+    sql = f"""
+        SELECT id FROM (
+            SELECT id,
+                   ROW_NUMBER() OVER (PARTITION BY url_hash ORDER BY id DESC) AS rn,
+                   julianday('now') - julianday(timestamp) AS age_days,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY url_hash, CAST(julianday(timestamp) / ? AS INTEGER)
+                       ORDER BY id DESC
+                   ) AS bucket_rn
+            FROM baselines
+        )
+        WHERE rn > 1 AND ({" OR ".join(conditions)})
+        ORDER BY id
+    """
+    return [row[0] for row in conn.execute(sql, [max(1, thin_every_days), *params])]
+
+
+def delete_baselines(conn: sqlite3.Connection, ids: list, batch_size: int = 500) -> dict:
+    """
+    Delete baselines and the comparisons made against them, in batches.
+
+    Returns:
+        Dict with baselines and comparisons deleted.
+    """
+    deleted = {"baselines": 0, "comparisons": 0}
+    for i in range(0, len(ids), batch_size):
+        chunk = ids[i:i + batch_size]
+        marks = ", ".join("?" for _ in chunk)
+        with conn:
+            deleted["comparisons"] += conn.execute(
+                f"DELETE FROM comparisons WHERE baseline_id IN ({marks})", chunk
+            ).rowcount
+            deleted["baselines"] += conn.execute(
+                f"DELETE FROM baselines WHERE id IN ({marks})", chunk
+            ).rowcount
+    return deleted
+
+
+def gc_blobs(conn: sqlite3.Connection) -> int:
+    """Delete blobs no baseline references any more. Returns the count."""
+    refs = " UNION ".join(
+        f"SELECT {ref} FROM baselines WHERE {ref} IS NOT NULL" for ref in BLOB_FIELDS.values()
+    )
+    with conn:
+        return conn.execute(f"DELETE FROM blobs WHERE hash NOT IN ({refs})").rowcount
+
+
+def incremental_vacuum(conn: sqlite3.Connection) -> int | None:
+    """
+    Return free pages to the filesystem without rewriting the whole file.
+
+    Returns:
+        Bytes released, or None when the database is not in incremental
+        auto-vacuum mode (created before it; run `--vacuum` once).
+    """
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        return None
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    conn.execute("PRAGMA incremental_vacuum").fetchall()
+    after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return (before - after) * page_size
+
+
+def apply_retention(
+    conn: sqlite3.Connection,
+    keep_last: int | None = None,
+    thin_after_days: int | None = None,
+    thin_every_days: int = 7,
+    dry_run: bool = False,
+) -> dict:
+    """
+    Prune baselines by policy, then drop orphaned blobs and free pages.
+
+    See retention_candidates() for the policy. Comparisons made against a
+    pruned baseline are pruned with it. The snapshot archive is not touched,
+    so pruned captures can still be inspected there.
+    """
+    ids = retention_candidates(conn, keep_last, thin_after_days, thin_every_days)
+    result = {"policy": {
+        "keep_last": keep_last,
+        "thin_after_days": thin_after_days,
+        "thin_every_days": thin_every_days,
+    }}
+    if dry_run:
+        result["would_delete_baselines"] = len(ids)
+        return result
+    result["deleted"] = delete_baselines(conn, ids)
+    result["deleted"]["blobs"] = gc_blobs(conn)
+    result["bytes_released"] = incremental_vacuum(conn)
+    return result
+
+
+def storage_stats(conn: sqlite3.Connection) -> dict:
+    """Row counts and blob-store sizes for the drift database."""
+    baselines = conn.execute("SELECT COUNT(*) FROM baselines").fetchone()[0]
+    where = " OR ".join(f"{c} IS NOT NULL" for c in BLOB_FIELDS)
+    inline_rows = conn.execute(f"SELECT COUNT(*) FROM baselines WHERE {where}").fetchone()[0]
+    comparisons = conn.execute("SELECT COUNT(*) FROM comparisons").fetchone()[0]
+    blob_count, raw_bytes, stored_bytes = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM blobs"
+    ).fetchone()
+    codecs = dict(conn.execute("SELECT codec, COUNT(*) FROM blobs GROUP BY codec").fetchall())
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    return {
+        "db_path": DB_PATH,
+        "schema_version": conn.execute("PRAGMA user_version").fetchone()[0],
+        "auto_vacuum": {0: "none", 1: "full", 2: "incremental"}.get(auto_vacuum, auto_vacuum),
+        "file_bytes": page_size * page_count,
+        "free_bytes": page_size * free_pages,
+        "baselines": baselines,
+        "baselines_with_inline_json": inline_rows,
+        "comparisons": comparisons,
+        "blobs": blob_count,
+        "blob_bytes_uncompressed": raw_bytes,
+        "blob_bytes_stored": stored_bytes,
+        "blob_codecs": codecs,
+    }
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Maintain the SEO drift SQLite database"
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Show row counts and storage sizes",
+    )
+    parser.add_argument(
+        "--migrate-blobs",
+        action="store_true",
+        help="Move inline JSON of older baselines into the compressed blob store",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Apply the retention policy given by --keep-last / --thin-after",
+    )
+    parser.add_argument(
+        "--keep-last",
+        type=int,
+        metavar="N",
+        help="Retention: keep at most N baselines per URL",
+    )
+    parser.add_argument(
+        "--thin-after",
+        type=int,
+        metavar="DAYS",
+        help="Retention: past this age keep one baseline per URL per --thin-every days",
+    )
+    parser.add_argument(
+        "--thin-every",
+        type=int,
+        default=7,
+        metavar="DAYS",
+        help="Retention: bucket width for --thin-after (default: 7)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="With --prune: only count what would be deleted",
+    )
+    parser.add_argument(
+        "--vacuum",
+        action="store_true",
+        help="Full VACUUM (also switches older databases to incremental auto-vacuum)",
+    )
+
+    args = parser.parse_args()
+    if not (args.stats or args.migrate_blobs or args.prune or args.vacuum):
+        parser.error("nothing to do: pass --stats, --migrate-blobs, --prune or --vacuum")
+    if args.prune and args.keep_last is None and args.thin_after is None:
+        parser.error("--prune needs --keep-last and/or --thin-after")
+
+    conn = init_db()
+    try:
+        result = {}
+        if args.migrate_blobs:
+            result["migration"] = migrate_inline_json(conn)
+        if args.prune:
+            result["retention"] = apply_retention(
+                conn,
+                keep_last=args.keep_last,
+                thin_after_days=args.thin_after,
+                thin_every_days=args.thin_every,
+                dry_run=args.dry_run,
+            )
+        if args.vacuum:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+            result["vacuumed"] = True
+        result["stats"] = storage_stats(conn)
+        if os.path.exists(snapshot_db_path()):
+            snap_conn = init_snapshot_db()
+            try:
+                result["snapshots"] = snapshot_stats(snap_conn)
+            finally:
+                snap_conn.close()
+    except (sqlite3.Error, RuntimeError, ValueError) as e:
+        print(json.dumps({"error": str(e)}, indent=2))
+        sys.exit(1)
+    finally:
+        conn.close()
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,8 @@ import sys
 SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, SCRIPTS_DIR)
 
-from drift_baseline import DB_PATH, init_db, normalize_url, url_hash  # noqa: E402
+import drift_db  # noqa: E402
+from drift_baseline import normalize_url, url_hash  # noqa: E402
 
 
 def get_history(url: str, limit: int = 20) -> dict:
@@ -33,17 +34,17 @@ def get_history(url: str, limit: int = 20) -> dict:
     norm_url = normalize_url(url)
     uhash = url_hash(url)
 
-    if not os.path.exists(DB_PATH):
+    if not os.path.exists(drift_db.DB_PATH):
         return {"url": norm_url, "baselines": [], "comparisons": [], "note": "No database found. Run `drift baseline` first."}
 
-    conn = init_db()
+    conn = drift_db.init_db()
     try:
         # Fetch baselines (all queries parameterized)
         rows = conn.execute(
             """
             SELECT id, url, timestamp, title, canonical, robots, h1,
                    status_code, html_hash, schema_hash,
-                   CASE WHEN cwv_json IS NOT NULL THEN 1 ELSE 0 END as has_cwv
+                   CASE WHEN cwv_json IS NOT NULL OR cwv_blob IS NOT NULL THEN 1 ELSE 0 END as has_cwv
             FROM baselines
             WHERE url_hash = ?
             ORDER BY id DESC
@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+Long-running drift monitor: scheduled, rate-limited baseline/compare checks.
+
+Each monitored URL has its own check interval in the `schedule` table of
+baselines.db. The scheduler claims due URLs under a time-limited lease, runs
+them on a worker pool (a baseline the first time, a comparison afterwards)
+and reschedules them with jitter, so load stays steady instead of arriving
+in cron-shaped bursts. Concurrency per host and PSI calls per minute are
+capped. After a crash, expired leases are simply claimed again.
+
+Usage:
+    python drift_monitor.py add <url> [<url> ...] --interval 1d
+    python drift_monitor.py add --urls urls.txt --interval 6h
+    python drift_monitor.py remove <url> [<url> ...]
+    python drift_monitor.py list
+    python drift_monitor.py run [--workers 8] [--per-host 2] [--psi-per-minute 60] [--once]
+
+Output: JSON (run prints a summary on exit; per-check progress goes to stderr).
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import signal
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from google_auth import validate_url  # noqa: E402
+from drift_baseline import (  # noqa: E402
+    DEFAULT_EXECUTION_MODE,
+    EXECUTION_MODES,
+    PAGE_TIMEOUT,
+    PSI_TIMEOUT,
+    collect_baseline,
+    insert_baselines,
+    normalize_url,
+    read_url_list,
+    url_hash,
+)
+from drift_compare import compare_to_baseline, insert_comparisons, load_baseline  # noqa: E402
+from drift_db import init_db  # noqa: E402
+
+DEFAULT_INTERVAL = 86400
+DEFAULT_JITTER = 0.1
+# Must outlast page + PSI timeouts plus time spent waiting for PSI budget
+DEFAULT_LEASE_SECONDS = 900
+# First retry after a failed check; doubles per consecutive failure, capped
+# at the URL's own interval
+RETRY_BASE_SECONDS = 300
+
+_INTERVAL_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*$", re.IGNORECASE)
+_INTERVAL_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_interval(text: str) -> int:
+    """Parse '90', '30m', '6h', '1d' or '2w' into seconds."""
+    match = _INTERVAL_RE.match(str(text))
+    if not match:
+        raise ValueError(f"Invalid interval: {text!r} (use e.g. 3600, 30m, 6h, 1d)")
+    seconds = int(float(match.group(1)) * _INTERVAL_UNITS[match.group(2).lower()])
+    if seconds < 60:
+        raise ValueError("Interval must be at least 60 seconds")
+    return seconds
+
+
+def _host(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+def _iso(ts: float | None) -> str | None:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts else None
+
+
+class RateLimiter:
+    """
+    Allow at most `per_minute` acquisitions in any rolling 60-second window.
+
+    Thread-safe. acquire() blocks until a slot frees up or `stop` is set.
+    """
+
+    def __init__(self, per_minute: int, clock=time.monotonic):
+        self.per_minute = max(1, per_minute)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stamps = deque()
+
+    def _try(self) -> float:
+        """Take a slot and return 0, or return seconds until one frees up."""
+        with self._lock:
+            now = self._clock()
+            while self._stamps and now - self._stamps[0] >= 60:
+                self._stamps.popleft()
+            if len(self._stamps) < self.per_minute:
+                self._stamps.append(now)
+                return 0.0
+            return 60 - (now - self._stamps[0])
+
+    def acquire(self, stop: threading.Event | None = None) -> bool:
+        """Block for a slot. Returns False if `stop` was set while waiting."""
+        while True:
+            wait_for = self._try()
+            if wait_for <= 0:
+                return True
+            if stop is not None:
+                if stop.wait(min(wait_for, 1.0)):
+                    return False
+            else:
+                time.sleep(min(wait_for, 1.0))
+
+
+# ---------------------------------------------------------------------------
+# Schedule management
+# ---------------------------------------------------------------------------
+
+def add_urls(
+    conn: sqlite3.Connection,
+    urls: list,
+    interval: int = DEFAULT_INTERVAL,
+    now: float | None = None,
+    rng: random.Random | None = None,
+) -> dict:
+    """
+    Add URLs to the schedule, or update the interval of ones already there.
+
+    New URLs get a random first run within one interval, so adding a large
+    list does not make every URL due at once.
+    """
+    now = time.time() if now is None else now
+    rng = rng or random.Random()
+    added = updated = rejected = 0
+    with conn:
+        for u in urls:
+            if not validate_url(u):
+                rejected += 1
+                continue
+            uhash = url_hash(u)
+            exists = conn.execute("SELECT 1 FROM schedule WHERE url_hash = ?", (uhash,)).fetchone()
+            if exists:
+                conn.execute(
+                    "UPDATE schedule SET interval_seconds = ? WHERE url_hash = ?", (interval, uhash)
+                )
+                updated += 1
+            else:
+                url = normalize_url(u)
+                conn.execute(
+                    "INSERT INTO schedule (url_hash, url, host, interval_seconds, next_run_at) VALUES (?, ?, ?, ?, ?)",
+                    (uhash, url, _host(url), interval, now + rng.uniform(0, interval)),
+                )
+                added += 1
+    return {"added": added, "updated": updated, "rejected": rejected}
+
+
+def remove_urls(conn: sqlite3.Connection, urls: list) -> int:
+    """Remove URLs from the schedule. Baselines and comparisons are kept."""
+    with conn:
+        return sum(
+            conn.execute("DELETE FROM schedule WHERE url_hash = ?", (url_hash(u),)).rowcount
+            for u in urls
+        )
+
+
+def list_schedule(conn: sqlite3.Connection) -> list:
+    """All scheduled URLs, soonest due first."""
+    rows = conn.execute(
+        """
+        SELECT url, interval_seconds, next_run_at, last_run_at, last_status,
+               last_error, failures, lease_owner, lease_until
+        FROM schedule ORDER BY next_run_at
+        """
+    ).fetchall()
+    now = time.time()
+    return [
+        {
+            "url": r[0],
+            "interval_seconds": r[1],
+            "next_run_at": _iso(r[2]),
+            "last_run_at": _iso(r[3]),
+            "last_status": r[4],
+            "last_error": r[5],
+            "failures": r[6],
+            "leased_by": r[7] if r[8] and r[8] > now else None,
+        }
+        for r in rows
+    ]
+
+
+def claim_due(
+    conn: sqlite3.Connection,
+    owner: str,
+    limit: int,
+    lease_seconds: int = DEFAULT_LEASE_SECONDS,
+    per_host: int = 2,
+    now: float | None = None,
+) -> list:
+    """
+    Lease up to `limit` due URLs for this worker.
+
+    At most `per_host` URLs per host are leased at any time, counting the
+    live leases of every scheduler sharing the database, so the pool is
+    never tied up waiting on one site. The cap is applied in SQL
+    (ROW_NUMBER() per host over the due rows), so a host with a large
+    backlog cannot hide other hosts' due URLs. Runs under BEGIN IMMEDIATE,
+    so concurrent schedulers never claim the same URL.
+
+    Returns:
+        List of job dicts (url_hash, url, interval_seconds, failures).
+    """
+    if limit <= 0:
+        return []
+    now = time.time() if now is None else now
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        rows = conn.execute(
+            """
+            WITH leased AS (
+                SELECT host, COUNT(*) AS n FROM schedule
+                WHERE lease_until >= ?
+                GROUP BY host
+            ),
+            due AS (
+                SELECT url_hash, url, interval_seconds, failures, host, next_run_at,
+                       ROW_NUMBER() OVER (PARTITION BY host ORDER BY next_run_at) AS host_rank
+                FROM schedule
+                WHERE next_run_at <= ? AND (lease_until IS NULL OR lease_until < ?)
+            )
+            SELECT url_hash, url, interval_seconds, failures FROM due
+            LEFT JOIN leased USING (host)
+            WHERE host_rank + COALESCE(leased.n, 0) <= ?
+            ORDER BY next_run_at
+            LIMIT ?
+            """,
+            (now, now, now, per_host, limit),
+        ).fetchall()
+        jobs = []
+        for uhash, url, interval, failures in rows:
+            conn.execute(
+                "UPDATE schedule SET lease_owner = ?, lease_until = ? WHERE url_hash = ?",
+                (owner, now + lease_seconds, uhash),
+            )
+            jobs.append({"url_hash": uhash, "url": url, "interval_seconds": interval, "failures": failures})
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return jobs
+
+
+def next_run_time(
+    job: dict,
+    ok: bool,
+    now: float,
+    jitter: float = DEFAULT_JITTER,
+    rng: random.Random | None = None,
+) -> float:
+    """
+    When to check a URL next.
+
+    Success: one interval later, +/- `jitter` of it. Failure: exponential
+    retry from RETRY_BASE_SECONDS, never later than a normal interval.
+    """
+    rng = rng or random.Random()
+    interval = job["interval_seconds"]
+    if not ok:
+        interval = min(interval, RETRY_BASE_SECONDS * 2 ** job["failures"])
+    return now + interval * (1 + rng.uniform(-jitter, jitter))
+
+
+def finish_job(
+    conn: sqlite3.Connection,
+    job: dict,
+    outcome: dict,
+    now: float | None = None,
+    jitter: float = DEFAULT_JITTER,
+    rng: random.Random | None = None,
+) -> None:
+    """
+    Store a check's result and reschedule the URL, releasing its lease.
+
+    Delivery is at-least-once: a crash between storing the result and
+    rescheduling means the check runs again after the lease expires.
+    """
+    now = time.time() if now is None else now
+    ok = not outcome.get("error")
+    if ok and outcome["kind"] == "baseline":
+        insert_baselines(conn, [outcome["record"]])
+    elif ok:
+        insert_comparisons(conn, [outcome["result"]])
+
+    with conn:
+        conn.execute(
+            """
+            UPDATE schedule
+            SET next_run_at = ?, last_run_at = ?, last_status = ?, last_error = ?,
+                failures = ?, lease_owner = NULL, lease_until = NULL
+            WHERE url_hash = ?
+            """,
+            (
+                next_run_time(job, ok, now, jitter, rng),
+                now,
+                outcome["kind"] if ok else "error",
+                outcome.get("error"),
+                0 if ok else job["failures"] + 1,
+                job["url_hash"],
+            ),
+        )
+
+
+def release_leases(conn: sqlite3.Connection, owner: str) -> int:
+    """Drop this worker's leases (clean shutdown) so others can claim them now."""
+    with conn:
+        return conn.execute(
+            "UPDATE schedule SET lease_owner = NULL, lease_until = NULL WHERE lease_owner = ?",
+            (owner,),
+        ).rowcount
+
+
+# ---------------------------------------------------------------------------
+# Scheduler loop
+# ---------------------------------------------------------------------------
+
+def _run_check(job: dict, baseline: dict | None, options: dict, psi_limiter, stop) -> dict:
+    """Worker: baseline a new URL or compare a known one. No database access."""
+    url = job["url"]
+    if not validate_url(url):
+        return {"kind": "compare", "error": "URL rejected: only public http/https URLs are accepted (SSRF protection)"}
+
+    skip_cwv = options["skip_cwv"]
+    if not skip_cwv and psi_limiter is not None and not psi_limiter.acquire(stop):
+        # Shutting down: leave the URL as it was; its lease is released on exit
+        return {"kind": "compare", "aborted": True}
+
+    timeouts = {
+        "page_timeout": options["page_timeout"],
+        "psi_timeout": options["psi_timeout"],
+        "psi_workers": options["workers"],
+    }
+    if baseline is None:
+        collected = collect_baseline(url, skip_cwv=skip_cwv, mode=options["mode"], **timeouts)
+        return {"kind": "baseline", "record": collected["record"], "error": collected["error"]}
+
+    result = compare_to_baseline(
+        url, baseline, skip_cwv=skip_cwv, mode=options["mode"],
+        conditional=options["conditional"], **timeouts,
+    )
+    return {"kind": "compare", "result": result, "error": result.get("error")}
+
+
+def run_monitor(
+    workers: int = 8,
+    per_host: int = 2,
+    psi_per_minute: int = 60,
+    skip_cwv: bool = False,
+    mode: str = DEFAULT_EXECUTION_MODE,
+    conditional: bool = True,
+    jitter: float = DEFAULT_JITTER,
+    lease_seconds: int = DEFAULT_LEASE_SECONDS,
+    page_timeout: int = PAGE_TIMEOUT,
+    psi_timeout: int = PSI_TIMEOUT,
+    once: bool = False,
+    poll_seconds: float = 5.0,
+    stop: threading.Event | None = None,
+) -> dict:
+    """
+    Run due checks until stopped (or, with `once`, until nothing is due).
+
+    The calling thread owns the database connection: it claims work, loads
+    baselines, and stores results. Worker threads only fetch and evaluate.
+    On stop, in-flight checks finish and unstarted leases are released.
+
+    Returns:
+        Summary dict with counts of checks run, failures and drift found.
+    """
+    stop = stop or threading.Event()
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    options = {
+        "skip_cwv": skip_cwv,
+        "mode": mode,
+        "conditional": conditional,
+        "page_timeout": page_timeout,
+        "psi_timeout": psi_timeout,
+        "workers": workers,
+    }
+    psi_limiter = None if skip_cwv else RateLimiter(psi_per_minute)
+    rng = random.Random()
+    summary = {"checks": 0, "baselines": 0, "comparisons": 0, "failed": 0, "with_drift": 0, "critical": 0}
+    started = time.monotonic()
+
+    conn = init_db()
+    in_flight = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            while True:
+                if not stop.is_set():
+                    jobs = claim_due(
+                        conn, owner, workers - len(in_flight), lease_seconds, per_host=per_host,
+                    )
+                    for job in jobs:
+                        baseline = load_baseline(conn, job["url_hash"])
+                        future = pool.submit(_run_check, job, baseline, options, psi_limiter, stop)
+                        in_flight[future] = job
+
+                if not in_flight:
+                    if once or stop.is_set():
+                        break
+                    row = conn.execute("SELECT MIN(next_run_at) FROM schedule").fetchone()
+                    idle = poll_seconds if row[0] is None else min(poll_seconds, max(0.0, row[0] - time.time()))
+                    stop.wait(max(idle, 0.05))
+                    continue
+
+                done, _ = wait(list(in_flight), timeout=poll_seconds, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = in_flight.pop(future)
+                    try:
+                        outcome = future.result()
+                    except Exception as e:  # one bad page must not stop the monitor
+                        outcome = {"kind": "compare", "error": f"Unexpected error: {e}"}
+                    if outcome.get("aborted"):
+                        continue
+                    try:
+                        finish_job(conn, job, outcome, jitter=jitter, rng=rng)
+                    except sqlite3.Error as e:
+                        outcome["error"] = f"Could not store result: {e}"
+
+                    summary["checks"] += 1
+                    if outcome.get("error"):
+                        summary["failed"] += 1
+                        status = f"error: {outcome['error']}"
+                    elif outcome["kind"] == "baseline":
+                        summary["baselines"] += 1
+                        status = "baseline captured"
+                    else:
+                        summary["comparisons"] += 1
+                        counts = outcome["result"]["summary"]
+                        summary["with_drift"] += 1 if counts["triggered"] else 0
+                        summary["critical"] += counts["critical"]
+                        status = f"{counts['critical']} critical, {counts['warning']} warning, {counts['info']} info"
+                    print(f"[drift-monitor] {job['url']}: {status}", file=sys.stderr)
+    finally:
+        try:
+            release_leases(conn, owner)
+        finally:
+            conn.close()
+
+    summary["elapsed_seconds"] = round(time.monotonic() - started, 2)
+    return {"status": "ok", "summary": summary}
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Scheduled SEO drift monitoring with per-host and PSI rate limits"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_add = sub.add_parser("add", help="Schedule URLs (or change their interval)")
+    p_add.add_argument("urls", nargs="*", help="URLs to monitor")
+    p_add.add_argument("--urls", dest="url_file", metavar="FILE", help="File with one URL per line ('-' for stdin)")
+    p_add.add_argument("--interval", default="1d", help="Check interval, e.g. 30m, 6h, 1d (default: 1d)")
+
+    p_remove = sub.add_parser("remove", help="Stop monitoring URLs")
+    p_remove.add_argument("urls", nargs="+", help="URLs to remove")
+
+    sub.add_parser("list", help="Show the schedule")
+
+    p_run = sub.add_parser("run", help="Run the scheduler")
+    p_run.add_argument("--workers", type=int, default=8, help="Concurrent checks (default: 8)")
+    p_run.add_argument("--per-host", type=int, default=2, help="Concurrent checks per hostname (default: 2)")
+    p_run.add_argument("--psi-per-minute", type=int, default=60, help="PageSpeed Insights calls per minute (default: 60)")
+    p_run.add_argument("--skip-cwv", action="store_true", help="Skip Core Web Vitals (no PSI calls)")
+    p_run.add_argument("--mode", choices=EXECUTION_MODES, default=DEFAULT_EXECUTION_MODE,
+                       help="Run fetch/parse/PSI in this process or as child scripts (default: inprocess)")
+    p_run.add_argument("--jitter", type=float, default=DEFAULT_JITTER,
+                       help="Spread each next run by +/- this fraction of the interval (default: 0.1)")
+    p_run.add_argument("--lease", type=int, default=DEFAULT_LEASE_SECONDS,
+                       help="Seconds a claimed check stays reserved if this process dies (default: 900)")
+    p_run.add_argument("--page-timeout", type=int, default=PAGE_TIMEOUT,
+                       help=f"Page fetch timeout in seconds (default: {PAGE_TIMEOUT})")
+    p_run.add_argument("--psi-timeout", type=int, default=PSI_TIMEOUT,
+                       help=f"PageSpeed Insights timeout in seconds (default: {PSI_TIMEOUT})")
+    p_run.add_argument("--no-conditional", action="store_true",
+                       help="Always download and re-run every rule, even if the page is unchanged")
+    p_run.add_argument("--once", action="store_true", help="Run what is due now, then exit (cron-friendly)")
+
+    args = parser.parse_args()
+
+    conn = init_db()
+    try:
+        if args.command == "add":
+            urls = list(args.urls)
+            if args.url_file:
+                urls.extend(read_url_list(args.url_file))
+            if not urls:
+                parser.error("add needs URLs or --urls FILE")
+            result = {"status": "ok", **add_urls(conn, urls, parse_interval(args.interval))}
+        elif args.command == "remove":
+            result = {"status": "ok", "removed": remove_urls(conn, args.urls)}
+        elif args.command == "list":
+            result = {"status": "ok", "schedule": list_schedule(conn)}
+        else:
+            result = None
+    except (OSError, ValueError, sqlite3.Error) as e:
+        result = {"error": str(e)}
+    finally:
+        conn.close()
+
+    if args.command == "run":
+        stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+        result = run_monitor(
+            workers=args.workers,
+            per_host=args.per_host,
+            psi_per_minute=args.psi_per_minute,
+            skip_cwv=args.skip_cwv,
+            mode=args.mode,
+            conditional=not args.no_conditional,
+            jitter=args.jitter,
+            lease_seconds=args.lease,
+            page_timeout=args.page_timeout,
+            psi_timeout=args.psi_timeout,
+            once=args.once,
+            stop=stop,
+        )
+
+    print(json.dumps(result, indent=2))
+
+    if result.get("error"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
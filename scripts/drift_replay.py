@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Replay drift rules over archived HTML snapshots, without network access.
+
+Walks each URL's baseline history in order and re-runs the current rule set
+from drift_compare.py on every consecutive pair of captures: the earlier
+baseline is the reference, the later capture's archived HTML is the "current"
+page. Use it to backtest a new or tuned rule against months of history.
+
+Only captures taken with `drift_baseline.py --snapshot` can be replayed;
+others are counted as missing.
+
+Usage:
+    python drift_replay.py <url> [--rules title_changed,h1_removed] [--since 2025-01-01]
+    python drift_replay.py --all [--match GLOB] [--host HOST] [--workers 4]
+
+Output: JSON with per-URL triggered findings and a per-rule rollup.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import drift_db  # noqa: E402
+from drift_baseline import PARSED_FIELDS, normalize_url, url_hash  # noqa: E402
+from drift_compare import SEVERITIES, evaluate_rules, load_latest_baselines  # noqa: E402
+
+
+def select_rules(spec: str | None) -> set | None:
+    """
+    Parse a --rules value into a set of rule names and/or 1-based rule numbers.
+
+    Returns None (all rules) for an empty spec.
+    """
+    if not spec:
+        return None
+    selected = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if part.isdigit():
+            selected.add(int(part))
+        elif part:
+            selected.add(part)
+    return selected
+
+
+def _selected(findings: list, rules: set | None) -> list:
+    """Keep findings whose rule name or position (1-17) is in `rules`."""
+    if rules is None:
+        return findings
+    return [f for n, f in enumerate(findings, start=1) if n in rules or f["rule"] in rules]
+
+
+def load_history(conn: sqlite3.Connection, uhash: str, since: str | None = None) -> list:
+    """All baselines for a URL hash, oldest first, with JSON fields hydrated."""
+    sql = "SELECT * FROM baselines WHERE url_hash = ?"
+    params = [uhash]
+    if since:
+        sql += " AND timestamp >= ?"
+        params.append(since)
+    cursor = conn.execute(sql + " ORDER BY id", params)
+    columns = [desc[0] for desc in cursor.description]
+    blob_cache = {}
+    return [drift_db.hydrate_baseline(conn, dict(zip(columns, row)), blob_cache) for row in cursor.fetchall()]
+
+
+def replay_url(uhash: str, rules: set | None = None, since: str | None = None) -> dict:
+    """
+    Replay the rule set over one URL's archived history.
+
+    Opens its own connections, so it can run in a worker process.
+
+    Returns:
+        Dict with url, transitions (only those with triggered findings),
+        counts of replayed/missing captures, and per-rule trigger counts.
+    """
+    from parse_html import parse_html
+
+    conn = drift_db.init_db()
+    snap_conn = drift_db.init_snapshot_db()
+    try:
+        history = load_history(conn, uhash, since)
+        out = {
+            "url": history[0]["url"] if history else None,
+            "captures": len(history),
+            "replayed": 0,
+            "missing_snapshots": 0,
+            "rule_counts": {},
+            "transitions": [],
+        }
+        html_cache = {}
+        parsed_by_hash = {}
+
+        for previous, current in zip(history, history[1:]):
+            html_hash = current["html_hash"]
+            parsed = parsed_by_hash.get(html_hash)
+            if parsed is None:
+                snapshot_id = drift_db.find_snapshot(snap_conn, uhash, html_hash) if html_hash else None
+                html = drift_db.get_snapshot(snap_conn, snapshot_id, html_cache) if snapshot_id else None
+                if html is None:
+                    out["missing_snapshots"] += 1
+                    continue
+                parsed = parse_html(html, current["url"], fields=PARSED_FIELDS)
+                parsed_by_hash[html_hash] = parsed
+
+            current_cwv = json.loads(current["cwv_json"]) if current.get("cwv_json") else None
+            findings = evaluate_rules(previous, parsed, current["status_code"], current_cwv, html_hash)
+            triggered = [f for f in _selected(findings, rules) if f["triggered"]]
+            out["replayed"] += 1
+            for f in triggered:
+                out["rule_counts"][f["rule"]] = out["rule_counts"].get(f["rule"], 0) + 1
+            if triggered:
+                out["transitions"].append({
+                    "from_baseline_id": previous["id"],
+                    "to_baseline_id": current["id"],
+                    "from_timestamp": previous["timestamp"],
+                    "to_timestamp": current["timestamp"],
+                    "triggered_findings": triggered,
+                })
+        return out
+    finally:
+        snap_conn.close()
+        conn.close()
+
+
+def run_replay(
+    uhashes: list,
+    rules: set | None = None,
+    since: str | None = None,
+    workers: int = 1,
+) -> dict:
+    """
+    Replay many URLs and roll the results up.
+
+    Parsing dominates, so URLs are spread over `workers` processes.
+    """
+    if not os.path.exists(drift_db.snapshot_db_path()):
+        return {"error": "No snapshot archive found. Capture baselines with --snapshot first."}
+
+    started = time.monotonic()
+    if workers > 1 and len(uhashes) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(replay_url, uhashes, [rules] * len(uhashes), [since] * len(uhashes)))
+    else:
+        results = [replay_url(h, rules, since) for h in uhashes]
+
+    rule_counts = {}
+    severity_counts = {s.lower(): 0 for s in SEVERITIES}
+    for r in results:
+        for name, count in r["rule_counts"].items():
+            rule_counts[name] = rule_counts.get(name, 0) + count
+        for t in r["transitions"]:
+            for f in t["triggered_findings"]:
+                severity_counts[f["severity"].lower()] += 1
+
+    summary = {
+        "urls": len(results),
+        "captures": sum(r["captures"] for r in results),
+        "replayed": sum(r["replayed"] for r in results),
+        "missing_snapshots": sum(r["missing_snapshots"] for r in results),
+        "transitions_with_findings": sum(len(r["transitions"]) for r in results),
+        **severity_counts,
+        "rules": dict(sorted(rule_counts.items(), key=lambda kv: (-kv[1], kv[0]))),
+        "elapsed_seconds": round(time.monotonic() - started, 2),
+    }
+    return {
+        "status": "ok",
+        "summary": summary,
+        "results": [r for r in results if r["transitions"]],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay drift rules over archived HTML snapshots (no network)"
+    )
+    parser.add_argument("url", nargs="?", help="URL whose history to replay")
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Replay every baselined URL (combine with --match/--host to filter)",
+    )
+    parser.add_argument("--match", metavar="GLOB", help="Only URLs matching this glob")
+    parser.add_argument("--host", help="Only URLs on this hostname")
+    parser.add_argument(
+        "--rules",
+        help="Comma-separated rule names or numbers to report (default: all 17)",
+    )
+    parser.add_argument(
+        "--since",
+        metavar="DATE",
+        help="Only captures at or after this ISO date/timestamp",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for parsing (default: 1)",
+    )
+
+    args = parser.parse_args()
+    rules = select_rules(args.rules)
+
+    if args.all or args.match or args.host:
+        if args.url:
+            parser.error("--all/--match/--host cannot be combined with a URL")
+        if not os.path.exists(drift_db.DB_PATH):
+            print(json.dumps({"error": "No database found. Run `drift baseline` first."}, indent=2))
+            sys.exit(1)
+        conn = drift_db.init_db()
+        try:
+            uhashes = [b["url_hash"] for b in load_latest_baselines(conn, match=args.match, host=args.host)]
+        finally:
+            conn.close()
+    elif args.url:
+        uhashes = [url_hash(args.url)]
+    else:
+        parser.error("a URL or --all is required")
+
+    try:
+        result = run_replay(uhashes, rules=rules, since=args.since, workers=args.workers)
+    except sqlite3.Error as e:
+        result = {"error": f"Database error: {e}"}
+    if args.url and "summary" in result:
+        result["url"] = normalize_url(args.url)
+
+    print(json.dumps(result, indent=2))
+
+    if result.get("error"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
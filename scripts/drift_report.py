@@ -4,9 +4,17 @@ Generate an HTML report for SEO drift comparison results.
 
 Uses the gemini-seo color palette for severity-coded cards.
 
+Dashboard mode renders many comparisons into one document: a summary
+table, a collapsible section per URL and an in-page severity filter. Sections
+are written to disk as they are rendered, so memory stays flat for hundreds
+of URLs.
+
 Usage:
     python drift_report.py <comparison_json_file> [--output report.html]
     echo '{"status":"ok",...}' | python drift_report.py --stdin [--output report.html]
+    python drift_report.py --dashboard --db [--match GLOB] [--host HOST] --output dashboard.html
+    python drift_report.py --dashboard a.json b.json ... [--min-severity warning] --output dashboard.html
+    ... | python drift_report.py --dashboard --stdin --output dashboard.html   (NDJSON)
 
 Output: Self-contained HTML file with severity-coded diff cards.
 """
@@ -15,7 +23,10 @@ import argparse
 import html
 import json
 import os
+import shutil
+import sqlite3
 import sys
+import tempfile
 from datetime import datetime, timezone
 
 
@@ -59,73 +70,9 @@ def _escape(text) -> str:
     return html.escape(str(text))
 
 
-def generate_html(comparison: dict) -> str:
-    """Generate a self-contained HTML report from comparison data."""
-    url = comparison.get("url", "Unknown URL")
-    baseline_ts = comparison.get("baseline_timestamp", "")
-    compare_ts = comparison.get("comparison_timestamp", "")
-    summary = comparison.get("summary", {})
-    triggered = comparison.get("triggered_findings", [])
-    untriggered = comparison.get("untriggered_findings", [])
-
-    critical = summary.get("critical", 0)
-    warning = summary.get("warning", 0)
-    info = summary.get("info", 0)
-    total_triggered = summary.get("triggered", 0)
-
-    # Overall status badge
-    if critical > 0:
-        status_text = "DRIFT DETECTED"
-        status_color = COLORS["red"]
-    elif warning > 0:
-        status_text = "CHANGES DETECTED"
-        status_color = COLORS["amber"]
-    elif info > 0:
-        status_text = "MINOR CHANGES"
-        status_color = COLORS["navy"]
-    else:
-        status_text = "NO DRIFT"
-        status_color = COLORS["green"]
-
-    # Build finding cards
-    finding_cards = ""
-    for finding in triggered:
-        sev = finding.get("severity", "INFO")
-        color = SEVERITY_COLORS.get(sev, COLORS["navy"])
-        bg = SEVERITY_BG.get(sev, COLORS["light_gray"])
-        finding_cards += f"""
-        <div class="finding-card" style="border-left: 4px solid {color}; background: {bg};">
-            <div class="finding-header">
-                <span class="severity-badge" style="background: {color}; color: {COLORS['white']};">{sev}</span>
-                <span class="rule-name">{_escape(finding.get('rule', ''))}</span>
-            </div>
-            <p class="finding-message">{_escape(finding.get('message', ''))}</p>
-            <div class="finding-diff">
-                <div class="diff-old">
-                    <strong>Before:</strong> {_escape(finding.get('old_value'))}
-                </div>
-                <div class="diff-new">
-                    <strong>After:</strong> {_escape(finding.get('new_value'))}
-                </div>
-            </div>
-        </div>
-        """
-
-    # Passed rules summary
-    passed_list = ""
-    for finding in untriggered:
-        passed_list += f"<li>{_escape(finding.get('rule', ''))}: {_escape(finding.get('message', ''))}</li>\n"
-
-    report_time = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-
-    return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>SEO Drift Report - {_escape(url)}</title>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+def _base_css() -> str:
+    """Stylesheet shared by the single-URL report and the dashboard."""
+    return f"""        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
         body {{
             font-family: 'Times New Roman', Georgia, serif;
             background: {COLORS['cream']};
@@ -266,7 +213,76 @@ def generate_html(comparison: dict) -> str:
             color: {COLORS['mid_gray']};
             border-top: 1px solid #e5e7eb;
         }}
-    </style>
+"""
+
+
+def _status(critical: int, warning: int, info: int) -> tuple:
+    """Overall status label and color for a set of severity counts."""
+    if critical > 0:
+        return "DRIFT DETECTED", COLORS["red"]
+    if warning > 0:
+        return "CHANGES DETECTED", COLORS["amber"]
+    if info > 0:
+        return "MINOR CHANGES", COLORS["navy"]
+    return "NO DRIFT", COLORS["green"]
+
+
+def _finding_card(finding: dict) -> str:
+    """One severity-coded diff card."""
+    sev = finding.get("severity", "INFO")
+    color = SEVERITY_COLORS.get(sev, COLORS["navy"])
+    bg = SEVERITY_BG.get(sev, COLORS["light_gray"])
+    return f"""
+        <div class="finding-card" data-severity="{_escape(sev)}" style="border-left: 4px solid {color}; background: {bg};">
+            <div class="finding-header">
+                <span class="severity-badge" style="background: {color}; color: {COLORS['white']};">{sev}</span>
+                <span class="rule-name">{_escape(finding.get('rule', ''))}</span>
+            </div>
+            <p class="finding-message">{_escape(finding.get('message', ''))}</p>
+            <div class="finding-diff">
+                <div class="diff-old">
+                    <strong>Before:</strong> {_escape(finding.get('old_value'))}
+                </div>
+                <div class="diff-new">
+                    <strong>After:</strong> {_escape(finding.get('new_value'))}
+                </div>
+            </div>
+        </div>
+        """
+
+
+def generate_html(comparison: dict) -> str:
+    """Generate a self-contained HTML report from comparison data."""
+    url = comparison.get("url", "Unknown URL")
+    baseline_ts = comparison.get("baseline_timestamp", "")
+    compare_ts = comparison.get("comparison_timestamp", "")
+    summary = comparison.get("summary", {})
+    triggered = comparison.get("triggered_findings", [])
+    untriggered = comparison.get("untriggered_findings", [])
+
+    critical = summary.get("critical", 0)
+    warning = summary.get("warning", 0)
+    info = summary.get("info", 0)
+    total_triggered = summary.get("triggered", 0)
+
+    # Overall status badge
+    status_text, status_color = _status(critical, warning, info)
+
+    finding_cards = "".join(_finding_card(f) for f in triggered)
+    passed_list = "".join(
+        f"<li>{_escape(f.get('rule', ''))}: {_escape(f.get('message', ''))}</li>\n" for f in untriggered
+    )
+
+    report_time = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>SEO Drift Report - {_escape(url)}</title>
+    <style>
+{_base_css()}    </style>
 </head>
 <body>
     <div class="header">
@@ -312,18 +328,297 @@ def generate_html(comparison: dict) -> str:
 </html>"""
 
 
+# ---------------------------------------------------------------------------
+# Multi-URL dashboard
+# ---------------------------------------------------------------------------
+
+SEVERITY_RANK = {"CRITICAL": 3, "WARNING": 2, "INFO": 1}
+
+DASHBOARD_CSS = f"""
+        body {{ max-width: 1100px; }}
+        .filter {{ margin-bottom: 1rem; font-family: sans-serif; font-size: 0.9rem; }}
+        table.summary {{
+            width: 100%;
+            border-collapse: collapse;
+            background: {COLORS['white']};
+            margin-bottom: 2rem;
+            font-size: 0.9rem;
+        }}
+        table.summary th, table.summary td {{
+            padding: 0.4rem 0.6rem;
+            border-bottom: 1px solid #e5e7eb;
+            text-align: left;
+        }}
+        table.summary th {{ background: {COLORS['light_gray']}; }}
+        table.summary td.num {{ text-align: right; font-family: monospace; }}
+        table.summary a {{ color: {COLORS['navy']}; word-break: break-all; }}
+        details.url-section {{
+            background: {COLORS['white']};
+            border: 1px solid #e5e7eb;
+            border-radius: 8px;
+            margin-bottom: 1rem;
+            padding: 0.5rem 1rem;
+        }}
+        details.url-section summary {{ cursor: pointer; font-family: monospace; word-break: break-all; }}
+        details.url-section .meta {{ font-size: 0.8rem; color: {COLORS['mid_gray']}; margin: 0.5rem 0; }}
+        body.min-1 [data-rank="0"],
+        body.min-2 [data-rank="1"], body.min-2 [data-rank="0"],
+        body.min-3 [data-rank="2"], body.min-3 [data-rank="1"], body.min-3 [data-rank="0"],
+        body.min-2 .finding-card[data-severity="INFO"],
+        body.min-3 .finding-card[data-severity="INFO"],
+        body.min-3 .finding-card[data-severity="WARNING"] {{ display: none; }}
+"""
+
+# Sets body.min-N from the filter; rows/sections carry data-rank (worst severity)
+DASHBOARD_JS = """
+    document.getElementById('severity-filter').addEventListener('change', function (e) {
+        document.body.className = e.target.value === '0' ? '' : 'min-' + e.target.value;
+    });
+"""
+
+
+def _worst_rank(comparison: dict) -> int:
+    summary = comparison.get("summary", {})
+    if summary.get("critical"):
+        return 3
+    if summary.get("warning"):
+        return 2
+    return 1 if summary.get("info") else 0
+
+
+def _url_section(comparison: dict, anchor: str, min_rank: int) -> str:
+    """Collapsible per-URL section; open by default when it has CRITICAL findings."""
+    summary = comparison.get("summary", {})
+    critical = summary.get("critical", 0)
+    warning = summary.get("warning", 0)
+    info = summary.get("info", 0)
+    status_text, status_color = _status(critical, warning, info)
+    findings = [
+        f for f in comparison.get("triggered_findings", [])
+        if SEVERITY_RANK.get(f.get("severity"), 1) >= min_rank
+    ]
+    notes = []
+    if comparison.get("unchanged"):
+        notes.append(f"unchanged ({_escape(comparison['unchanged'])}), content rules skipped")
+    if comparison.get("cwv_error"):
+        notes.append(f"CWV not compared: {_escape(comparison['cwv_error'])}")
+    passed = len(comparison.get("untriggered_findings", []))
+    return "".join([
+        f'\n    <details class="url-section" id="{anchor}" data-rank="{_worst_rank(comparison)}"',
+        " open>" if critical else ">",
+        f'\n        <summary><span class="severity-badge" style="background: {status_color}; '
+        f'color: {COLORS["white"]};">{status_text}</span> {_escape(comparison.get("url"))}</summary>',
+        f'\n        <div class="meta">Baseline: {_escape(comparison.get("baseline_timestamp", ""))} | '
+        f'Compared: {_escape(comparison.get("comparison_timestamp", ""))} | {passed} checks passed'
+        + "".join(f" | {n}" for n in notes) + "</div>",
+        "".join(_finding_card(f) for f in findings),
+        "\n    </details>\n",
+    ])
+
+
+def write_dashboard(comparisons, out, min_severity: str | None = None, title: str = "SEO Drift Dashboard") -> dict:
+    """
+    Stream many comparison results into one HTML dashboard.
+
+    Per-URL sections are rendered one at a time into a temporary file while
+    the (small) summary rows are collected. The head, summary table and
+    filter are then written to `out`, followed by the sections copied from
+    the temp file. Neither the comparisons nor the rendered HTML are ever
+    held in memory as a whole.
+
+    Args:
+        comparisons: Iterable of drift_compare result dicts (errors are counted
+            and skipped).
+        out: Writable text file.
+        min_severity: Drop URLs and findings below this severity
+            ('CRITICAL', 'WARNING' or 'INFO'). None keeps every URL.
+
+    Returns:
+        Dict with counts of URLs rendered, skipped and by worst severity.
+    """
+    min_rank = SEVERITY_RANK.get((min_severity or "").upper(), 0)
+    rows = []
+    counts = {"urls": 0, "skipped": 0, "errors": 0, "critical": 0, "warning": 0, "info": 0}
+
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as sections:
+        for comparison in comparisons:
+            if not isinstance(comparison, dict) or comparison.get("error"):
+                counts["errors"] += 1
+                continue
+            rank = _worst_rank(comparison)
+            if rank < min_rank:
+                counts["skipped"] += 1
+                continue
+            anchor = f"u{len(rows)}"
+            sections.write(_url_section(comparison, anchor, min_rank))
+            summary = comparison.get("summary", {})
+            rows.append((
+                -rank, -summary.get("critical", 0), -summary.get("warning", 0),
+                str(comparison.get("url", "")), anchor,
+                summary.get("critical", 0), summary.get("warning", 0), summary.get("info", 0), rank,
+            ))
+            counts["urls"] += 1
+            for sev in ("critical", "warning", "info"):
+                counts[sev] += summary.get(sev, 0)
+
+        rows.sort()
+        report_time = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+        out.write(f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{_escape(title)}</title>
+    <style>
+{_base_css()}{DASHBOARD_CSS}    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>{_escape(title)}</h1>
+        <div class="timestamps">{counts['urls']} URL(s) | Generated {report_time}</div>
+    </div>
+
+    <div class="summary-grid">
+        <div class="summary-card">
+            <div class="count" style="color: {COLORS['red']};">{counts['critical']}</div>
+            <div class="label">Critical</div>
+        </div>
+        <div class="summary-card">
+            <div class="count" style="color: {COLORS['amber']};">{counts['warning']}</div>
+            <div class="label">Warning</div>
+        </div>
+        <div class="summary-card">
+            <div class="count" style="color: {COLORS['navy']};">{counts['info']}</div>
+            <div class="label">Info</div>
+        </div>
+    </div>
+
+    <div class="filter">
+        <label for="severity-filter">Show:</label>
+        <select id="severity-filter">
+            <option value="0">All URLs</option>
+            <option value="1">Any drift</option>
+            <option value="2">Warning and above</option>
+            <option value="3">Critical only</option>
+        </select>
+    </div>
+
+    <h2 class="section-title">Summary</h2>
+    <table class="summary">
+        <thead><tr><th>URL</th><th>Critical</th><th>Warning</th><th>Info</th></tr></thead>
+        <tbody>
+""")
+        out.write("".join(
+            f'            <tr data-rank="{rank}"><td><a href="#{anchor}">{_escape(url)}</a></td>'
+            f'<td class="num">{critical}</td><td class="num">{warning}</td><td class="num">{info}</td></tr>\n'
+            for _, _, _, url, anchor, critical, warning, info, rank in rows
+        ))
+        out.write("""        </tbody>
+    </table>
+
+    <h2 class="section-title">Details</h2>
+""")
+        sections.seek(0)
+        shutil.copyfileobj(sections, out)
+
+    out.write(f"""
+    <div class="footer">
+        Generated by Gemini SEO Drift Monitor | {report_time}
+    </div>
+    <script>{DASHBOARD_JS}    </script>
+</body>
+</html>
+""")
+    return counts
+
+
+def iter_json_files(paths: list):
+    """Yield comparisons from JSON files holding one result or a list of results."""
+    for path in paths:
+        with open(os.path.realpath(path), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, list):
+            yield from data
+        else:
+            yield data
+
+
+def iter_ndjson(stream):
+    """Yield comparisons from newline-delimited JSON (blank lines skipped)."""
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_latest_comparisons(match: str | None = None, host: str | None = None):
+    """Yield the newest stored comparison per URL from the drift database."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from drift_db import init_db, url_filter_clause
+
+    where, params = url_filter_clause("c.url", match, host)
+    sql = """
+        SELECT c.results_json FROM comparisons c
+        JOIN (SELECT url_hash, MAX(id) AS id FROM comparisons GROUP BY url_hash) latest
+          ON c.id = latest.id
+    """
+    if where:
+        sql += " WHERE " + where
+    conn = init_db()
+    try:
+        for (raw,) in conn.execute(sql + " ORDER BY c.url", params):
+            yield json.loads(raw)
+    finally:
+        conn.close()
+
+
 # ---------------------------------------------------------------------------
 # CLI
 # ---------------------------------------------------------------------------
 
+def _dashboard_main(args) -> None:
+    """CLI path for --dashboard."""
+    if args.db:
+        comparisons = iter_latest_comparisons(match=args.match, host=args.host)
+    elif args.stdin:
+        comparisons = iter_ndjson(sys.stdin)
+    elif args.file:
+        missing = [p for p in args.file if not os.path.isfile(os.path.realpath(p))]
+        if missing:
+            print(f"Error: File not found: {missing[0]}", file=sys.stderr)
+            sys.exit(1)
+        comparisons = iter_json_files(args.file)
+    else:
+        print("Error: --dashboard needs JSON files, --stdin or --db", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        if args.output:
+            try:
+                with open(args.output, "w", encoding="utf-8") as f:
+                    counts = write_dashboard(comparisons, f, min_severity=args.min_severity)
+            except (ValueError, sqlite3.Error):
+                # --db rows are read lazily, so a database error can surface
+                # mid-write; do not leave a half-written dashboard behind
+                os.remove(args.output)
+                raise
+            print(f"Dashboard with {counts['urls']} URL(s) saved to {args.output}", file=sys.stderr)
+        else:
+            counts = write_dashboard(comparisons, sys.stdout, min_severity=args.min_severity)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if counts["errors"]:
+        print(f"Warning: skipped {counts['errors']} failed or invalid comparison(s)", file=sys.stderr)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Generate an HTML report from SEO drift comparison results"
     )
     parser.add_argument(
         "file",
-        nargs="?",
-        help="Path to comparison JSON file (or use --stdin)",
+        nargs="*",
+        help="Path to comparison JSON file (or use --stdin); several with --dashboard",
     )
     parser.add_argument(
         "--stdin",
@@ -335,16 +630,40 @@ def main():
         default=None,
         help="Output HTML file path (default: stdout)",
     )
+    parser.add_argument(
+        "--dashboard",
+        action="store_true",
+        help="Render many comparisons (files, --stdin NDJSON or --db) into one dashboard",
+    )
+    parser.add_argument(
+        "--db",
+        action="store_true",
+        help="Dashboard: use the latest stored comparison of every URL",
+    )
+    parser.add_argument("--match", metavar="GLOB", help="Dashboard --db: only URLs matching this glob")
+    parser.add_argument("--host", help="Dashboard --db: only URLs on this hostname")
+    parser.add_argument(
+        "--min-severity",
+        choices=("info", "warning", "critical"),
+        help="Dashboard: leave out URLs and findings below this severity",
+    )
 
     args = parser.parse_args()
 
+    if args.dashboard:
+        _dashboard_main(args)
+        return
+    if len(args.file) > 1:
+        print("Error: Several files need --dashboard", file=sys.stderr)
+        sys.exit(1)
+
     # Load comparison data
     if args.stdin:
         raw = sys.stdin.read()
     elif args.file:
-        real_path = os.path.realpath(args.file)
+        real_path = os.path.realpath(args.file[0])
         if not os.path.isfile(real_path):
-            print(f"Error: File not found: {args.file}", file=sys.stderr)
+            print(f"Error: File not found: {args.file[0]}", file=sys.stderr)
             sys.exit(1)
         with open(real_path, "r", encoding="utf-8") as f:
             raw = f.read()
@@ -2,24 +2,50 @@
 """
 Fetch a web page with proper headers and error handling.
 
+Connections are reused across calls: fetch_page() draws its requests.Session
+from a process-wide pool keyed by scheme and host, so batch callers pay the
+TCP+TLS handshake once per host instead of once per page. The SSRF check
+and the connection share one cached DNS lookup (dns_cache.py), and the
+socket connects to the address that was checked.
+
+fetch_pages() fetches many URLs on a thread pool with a global and a
+per-host concurrency cap and yields results as they complete.
+
 Usage:
     python fetch_page.py https://example.com
     python fetch_page.py https://example.com --output page.html
+    python fetch_page.py --batch urls.txt [--workers 16] [--per-host 2]   (NDJSON out)
+    python fetch_page.py https://example.com --cache [--respect-cache-control]
+    python fetch_page.py https://example.com --head-only 64   (stop after </head> or 64 KB)
+    python fetch_page.py --batch urls.txt --timing   (per-hop timings, percentiles on stderr)
 """
 
 import argparse
-import ipaddress
-import socket
+import atexit
+import http.cookiejar
+import json
+import os
 import sys
-from typing import Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
 from urllib.parse import urlparse
 
 try:
     import requests
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+    from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
 except ImportError:
     print("Error: requests library required. Install with: pip install requests")
     sys.exit(1)
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from dns_cache import check_host  # noqa: E402
+
 
 DEFAULT_USER_AGENT = (
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
@@ -43,6 +69,309 @@ DEFAULT_HEADERS = {
     "Connection": "keep-alive",
 }
 
+# Body bytes kept per response by the CLI (fetch_page() itself reads whole
+# bodies unless given max_bytes). Googlebot stops reading HTML after 15 MB,
+# so anything beyond that is invisible to search anyway.
+DEFAULT_MAX_BYTES = 15 * 1024 * 1024
+
+# Default read budget for head_only fetches
+HEAD_ONLY_BYTES = 64 * 1024
+
+STREAM_CHUNK_BYTES = 16 * 1024
+
+
+# ---------------------------------------------------------------------------
+# Timing instrumentation (opt-in per request: fetch_page(timing=True))
+# ---------------------------------------------------------------------------
+
+# The tracer for the fetch running on this thread, if it asked for timings.
+# Connections opened while it is set report their setup phases to it.
+_trace_local = threading.local()
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+class _Tracer:
+    """Collects setup timings of new connections and one record per hop."""
+
+    def __init__(self):
+        self.setup = None
+        self.hops = []
+
+    def on_response(self, response, *args, **kwargs):
+        """requests response hook: runs once per hop, redirects included."""
+        setup = self.setup or {}
+        self.setup = None
+        elapsed = response.elapsed.total_seconds() * 1000
+        setup_ms = setup.get("dns_ms", 0) + setup.get("connect_ms", 0) + setup.get("tls_ms", 0)
+        self.hops.append({
+            "url": response.url,
+            "status_code": response.status_code,
+            "reused_connection": not setup,
+            "dns_ms": setup.get("dns_ms", 0.0),
+            "connect_ms": setup.get("connect_ms", 0.0),
+            "tls_ms": setup.get("tls_ms", 0.0),
+            "ttfb_ms": round(max(0.0, elapsed - setup_ms), 2),
+            "download_ms": None,
+        })
+        return response
+
+
+class _PinnedHTTPConnection(HTTPConnection):
+    """
+    Connects to the addresses validated by the SSRF check.
+
+    The host is resolved through the shared dns_cache (so a fetch looks it
+    up once, not once for the check and again for the socket), refused if
+    it maps to a private/internal address (which also catches redirects
+    to internal hosts), and urllib3 connects to those exact addresses,
+    trying each in resolver order until one accepts. TLS SNI and
+    certificate checks still use the hostname. DNS and TCP connect times
+    are reported to the thread's tracer, if any.
+    """
+
+    def _new_conn(self):
+        tracer = getattr(_trace_local, "tracer", None)
+        dns_host = self._dns_host
+        started = time.perf_counter()
+        addresses, blocked = check_host(dns_host)
+        if blocked:
+            raise NewConnectionError(self, f"Blocked: {dns_host} resolves to private/internal IP ({blocked})")
+        resolved_at = time.perf_counter()
+        # Unresolvable names fall through to urllib3's NameResolutionError
+        candidates = addresses or [dns_host]
+        try:
+            for attempt, address in enumerate(candidates, 1):
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                    break
+                except (ConnectTimeoutError, NewConnectionError):
+                    # An unreachable AAAA record or a node that is down:
+                    # move on to the next validated address
+                    if attempt == len(candidates):
+                        raise
+        finally:
+            self._dns_host = dns_host
+        if tracer is None:
+            return sock
+        tracer.setup = {
+            "dns_ms": _ms(resolved_at - started),
+            "connect_ms": _ms(time.perf_counter() - resolved_at),
+            "tls_ms": 0.0,
+        }
+        return sock
+
+
+class _PinnedHTTPSConnection(_PinnedHTTPConnection, HTTPSConnection):
+    """Adds the TLS handshake (connect() minus DNS and TCP) to the setup timings."""
+
+    def connect(self):
+        tracer = getattr(_trace_local, "tracer", None)
+        started = time.perf_counter()
+        super().connect()
+        if tracer is not None and tracer.setup is not None:
+            total = _ms(time.perf_counter() - started)
+            tracer.setup["tls_ms"] = round(max(0.0, total - tracer.setup["dns_ms"] - tracer.setup["connect_ms"]), 2)
+
+
+class _PinnedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _PinnedHTTPConnection
+
+
+class _PinnedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _PinnedHTTPSConnection
+
+
+class _PinnedHTTPAdapter(requests.adapters.HTTPAdapter):
+    """HTTPAdapter whose connection pools use the timed connection classes."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _PinnedHTTPConnectionPool,
+            "https": _PinnedHTTPSConnectionPool,
+        }
+
+
+def _percentile(sorted_values: list, pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list; None if it is empty."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def timing_percentiles(results, percentiles=(50, 90, 99)) -> dict:
+    """
+    Aggregate the `timing` of many fetch_page() results.
+
+    Each phase is summed over the hops of one fetch (a redirect chain costs
+    all of its hops), then reported as nearest-rank percentiles across
+    fetches. Results without timings (errors, cache hits) are skipped.
+
+    Returns:
+        {"fetches": n, "total_ms": {"p50": ..., ...}, "dns_ms": {...}, ...}
+    """
+    phases = ("dns_ms", "connect_ms", "tls_ms", "ttfb_ms", "download_ms", "total_ms")
+    samples = {p: [] for p in phases}
+    wire = decoded = 0
+    for result in results:
+        timing = (result or {}).get("timing")
+        if not timing or not timing.get("hops"):
+            continue
+        for phase in phases[:-1]:
+            samples[phase].append(sum(hop[phase] or 0 for hop in timing["hops"]))
+        samples["total_ms"].append(timing["total_ms"])
+        wire += timing.get("wire_bytes") or 0
+        decoded += timing.get("decoded_bytes") or 0
+    summary = {"fetches": len(samples["total_ms"]), "wire_bytes": wire, "decoded_bytes": decoded}
+    for phase, values in samples.items():
+        values.sort()
+        summary[phase] = {f"p{p}": _percentile(values, p) for p in percentiles}
+    return summary
+
+
+# Keep-alive connections kept per host, and hosts kept in the pool
+POOL_CONNECTIONS = 10
+MAX_POOLED_HOSTS = 256
+
+
+class SessionPool:
+    """
+    Thread-safe pool of keep-alive requests.Session objects, one per host.
+
+    Each session mounts an HTTPAdapter that keeps up to `pool_size` idle
+    connections to its host. Hosts are evicted least-recently-used once
+    `max_hosts` is exceeded, so a crawl over thousands of domains does not
+    hold thousands of sockets open.
+
+    Sessions never persist cookies between calls, so a pooled fetch sees the
+    same (empty) cookie state as a fresh session did. Cookies set during a
+    redirect chain still apply within that request.
+    """
+
+    def __init__(self, pool_size: int = POOL_CONNECTIONS, max_hosts: int = MAX_POOLED_HOSTS):
+        self.pool_size = pool_size
+        self.max_hosts = max_hosts
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _new_session(self, max_redirects: int) -> "requests.Session":
+        session = requests.Session()
+        session.max_redirects = max_redirects
+        session.cookies = requests.cookies.RequestsCookieJar(
+            policy=http.cookiejar.DefaultCookiePolicy(allowed_domains=[])
+        )
+        adapter = _PinnedHTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.pool_size,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def get(self, url: str, max_redirects: int = 5) -> "requests.Session":
+        """Return the pooled session for `url`'s host, creating it if needed."""
+        parsed = urlparse(url)
+        key = (parsed.scheme, (parsed.hostname or "").lower(), parsed.port, max_redirects)
+        evicted = []
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+                return session
+            session = self._new_session(max_redirects)
+            self._sessions[key] = session
+            while len(self._sessions) > self.max_hosts:
+                evicted.append(self._sessions.popitem(last=False)[1])
+        for old in evicted:
+            old.close()
+        return session
+
+    def close(self) -> None:
+        """Close every pooled session and its connections."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+_session_pool = SessionPool()
+atexit.register(lambda: _session_pool.close())
+
+
+def configure_session_pool(pool_size: int = POOL_CONNECTIONS, max_hosts: int = MAX_POOLED_HOSTS) -> SessionPool:
+    """
+    Replace the shared session pool (closing the old one) with new limits.
+
+    Set pool_size to at least the number of concurrent requests per host.
+    """
+    global _session_pool
+    old, _session_pool = _session_pool, SessionPool(pool_size=pool_size, max_hosts=max_hosts)
+    old.close()
+    return _session_pool
+
+
+def get_session(url: str, max_redirects: int = 5) -> "requests.Session":
+    """Shared keep-alive session for `url`'s host."""
+    return _session_pool.get(url, max_redirects=max_redirects)
+
+
+def close_sessions() -> None:
+    """Close all pooled connections (also done automatically at exit)."""
+    _session_pool.close()
+
+
+def _read_body(
+    response, max_bytes: Optional[int], head_only: bool, deadline: Optional[float], decode: bool = True
+) -> tuple:
+    """
+    Read a streamed response body, stopping early at the byte cap, at
+    </head> in head-only mode, or when the overall deadline passes (None
+    disables the cap or deadline).
+
+    Returns (text, bytes_read, truncation) where truncation is None,
+    "max_bytes", "head_only" (stopped at </head>) or "deadline". Decoding matches
+    requests' Response.text; with decode=False `text` is the body bytes.
+    """
+    body = bytearray()
+    truncation = None
+    for chunk in response.iter_content(chunk_size=STREAM_CHUNK_BYTES):
+        # Re-scan a little of the previous chunk in case the tag was split
+        scan_from = max(0, len(body) - 7)
+        body += chunk
+        if head_only:
+            end = body[scan_from:].lower().find(b"</head>")
+            if end != -1:
+                del body[scan_from + end + 7:]
+                truncation = "head_only"
+                break
+        if max_bytes is not None and len(body) > max_bytes:
+            del body[max_bytes:]
+            truncation = "max_bytes"
+            break
+        if deadline is not None and time.monotonic() > deadline:
+            truncation = "deadline"
+            break
+
+    if not decode:
+        return bytes(body), len(body), truncation
+    encoding = response.encoding
+    if encoding is None:
+        encoding = requests.compat.chardet.detect(bytes(body))["encoding"] if body else "utf-8"
+    try:
+        text = str(body, encoding or "utf-8", errors="replace")
+    except (LookupError, TypeError):
+        text = str(body, errors="replace")
+    return text, len(body), truncation
+
 
 def fetch_page(
     url: str,
@@ -50,6 +379,13 @@ def fetch_page(
     follow_redirects: bool = True,
     max_redirects: int = 5,
     user_agent: Optional[str] = None,
+    extra_headers: Optional[dict] = None,
+    cache=None,
+    max_bytes: Optional[int] = None,
+    max_time: Optional[float] = None,
+    head_only: bool = False,
+    timing: bool = False,
+    raw: bool = False,
 ) -> dict:
     """
     Fetch a web page and return response details.
@@ -59,6 +395,28 @@ def fetch_page(
         timeout: Request timeout in seconds
         follow_redirects: Whether to follow redirects
         max_redirects: Maximum number of redirects to follow
+        user_agent: Override the default User-Agent
+        extra_headers: Additional request headers (e.g. If-None-Match)
+        cache: Optional http_cache.HTTPCache. Cached pages are revalidated
+            with their ETag/Last-Modified and served from disk on 304. It is
+            bypassed when extra_headers carries its own validators.
+        max_bytes: Stop reading the body after this many (decoded) bytes
+            (default: read it all; the CLI uses DEFAULT_MAX_BYTES).
+        max_time: Stop reading the body this many seconds after the request
+            was sent. `timeout` only bounds each socket read, so this is what
+            stops a slow endless stream. Default: no overall limit.
+        head_only: Stop at </head>; max_bytes then bounds the search
+            (pass e.g. HEAD_ONLY_BYTES). For callers that only need
+            title/meta/canonical/hreflang.
+
+        A body cut short by max_bytes, max_time or head_only is not an
+        error: check `truncated` before treating the content as the page.
+        timing: Add a `timing` breakdown: per redirect hop DNS, TCP
+            connect, TLS, time to first byte (0 for reused connections'
+            setup phases), the final hop's download time, and body bytes
+            on the wire vs decoded.
+        raw: Return `content` as the body bytes, undecoded, for formats that
+            declare their own encoding (XML). The cache is bypassed.
 
     Returns:
         Dictionary with:
@@ -67,7 +425,12 @@ def fetch_page(
             - content: Response body
             - headers: Response headers
             - redirect_chain: List of redirect URLs
+            - truncated: True if the body was cut short
+            - truncation: Why: "max_bytes", "head_only" or "deadline" (None if complete)
+            - bytes_read: Body bytes kept
             - error: Error message if failed
+            - timing: With timing=True only, see above
+            - cache: With a cache only: "fresh", "revalidated", "stored" or "miss"
     """
     result = {
         "url": url,
@@ -76,6 +439,9 @@ def fetch_page(
         "headers": {},
         "redirect_chain": [],
         "redirect_details": [],
+        "truncated": False,
+        "truncation": None,
+        "bytes_read": 0,
         "error": None,
     }
 
@@ -89,35 +455,74 @@ def fetch_page(
         result["error"] = f"Invalid URL scheme: {parsed.scheme}"
         return result
 
-    # SSRF prevention: block private/internal IPs
-    try:
-        resolved_ip = socket.gethostbyname(parsed.hostname)
-        ip = ipaddress.ip_address(resolved_ip)
-        if ip.is_private or ip.is_loopback or ip.is_reserved:
-            result["error"] = f"Blocked: URL resolves to private/internal IP ({resolved_ip})"
-            return result
-    except (socket.gaierror, ValueError):
-        pass  # DNS resolution failure handled by requests below
+    # SSRF prevention: block private/internal IPs. The lookup is cached and
+    # the connection is pinned to the addresses checked here.
+    _addresses, blocked = check_host(parsed.hostname)
+    if blocked:
+        result["error"] = f"Blocked: URL resolves to private/internal IP ({blocked})"
+        return result
+
+    # Callers sending their own validators want to see the 304 themselves,
+    # and the cache only holds decoded text
+    if cache is not None and (raw or (extra_headers and any(
+        k.lower() in ("if-none-match", "if-modified-since") for k in extra_headers
+    ))):
+        cache = None
+    entry = cache.lookup(url, user_agent) if cache is not None else None
+    if entry is not None and cache.is_fresh(entry):
+        cached = cache.load(url, user_agent)
+        if cached is not None:
+            cached["cache"] = "fresh"
+            return cached
 
+    tracer = _Tracer() if timing else None
+    _trace_local.tracer = tracer
     try:
-        session = requests.Session()
-        session.max_redirects = max_redirects
+        session = get_session(url, max_redirects=max_redirects)
 
         headers = dict(DEFAULT_HEADERS)
         if user_agent:
             headers["User-Agent"] = user_agent
+        if extra_headers:
+            headers.update(extra_headers)
+        if entry is not None:
+            headers.update(cache.conditional_headers(entry))
 
+        started = time.monotonic()
         response = session.get(
             url,
             headers=headers,
             timeout=timeout,
             allow_redirects=follow_redirects,
+            stream=True,
+            hooks={"response": tracer.on_response} if tracer else None,
         )
+        body_started = time.perf_counter()
+        try:
+            text, bytes_read, truncation = _read_body(
+                response, max_bytes, head_only,
+                deadline=started + max_time if max_time is not None else None,
+                decode=not raw,
+            )
+            wire_bytes = response.raw.tell() if hasattr(response.raw, "tell") else None
+        finally:
+            response.close()
+        if tracer is not None and tracer.hops:
+            tracer.hops[-1]["download_ms"] = _ms(time.perf_counter() - body_started)
+            result["timing"] = {
+                "hops": tracer.hops,
+                "total_ms": _ms(time.monotonic() - started),
+                "wire_bytes": wire_bytes,
+                "decoded_bytes": bytes_read,
+            }
 
         result["url"] = response.url
         result["status_code"] = response.status_code
-        result["content"] = response.text
+        result["content"] = text
         result["headers"] = dict(response.headers)
+        result["bytes_read"] = bytes_read
+        result["truncated"] = truncation is not None
+        result["truncation"] = truncation
 
         # Track redirect chain with status codes
         if response.history:
@@ -127,6 +532,18 @@ def fetch_page(
                 for r in response.history
             ]
 
+        if cache is not None:
+            cached = None
+            if response.status_code == 304 and entry is not None:
+                cached = cache.load(url, user_agent, revalidated_headers=dict(response.headers))
+            if cached is not None:
+                if "timing" in result:
+                    cached["timing"] = result["timing"]
+                result = cached
+                result["cache"] = "revalidated"
+            else:
+                result["cache"] = "stored" if cache.store(url, result, user_agent) else "miss"
+
     except requests.exceptions.Timeout:
         result["error"] = f"Request timed out after {timeout} seconds"
     except requests.exceptions.TooManyRedirects:
@@ -137,14 +554,253 @@ def fetch_page(
         result["error"] = f"Connection error: {e}"
     except requests.exceptions.RequestException as e:
         result["error"] = f"Request failed: {e}"
+    finally:
+        _trace_local.tracer = None
 
     return result
 
 
+# ---------------------------------------------------------------------------
+# Batch fetching
+# ---------------------------------------------------------------------------
+
+class HostLimiter:
+    """
+    Cap the number of concurrent in-flight requests per hostname.
+
+    One BoundedSemaphore per host, created lazily. Use as:
+        with limiter.slot(url):
+            ...fetch...
+    """
+
+    def __init__(self, per_host: int = 2):
+        self.per_host = max(1, per_host)
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def _semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            sem = self._semaphores.get(host)
+            if sem is None:
+                sem = threading.BoundedSemaphore(self.per_host)
+                self._semaphores[host] = sem
+            return sem
+
+    @contextmanager
+    def slot(self, url: str):
+        sem = self._semaphore((urlparse(url).hostname or "").lower())
+        with sem:
+            yield
+
+
+def interleave_by_host(urls: list) -> list:
+    """
+    Reorder URLs round-robin across hosts so workers are not all queued
+    behind the per-host cap of a single large site.
+    """
+    buckets = {}
+    for u in urls:
+        buckets.setdefault((urlparse(u).hostname or "").lower(), []).append(u)
+    ordered = []
+    queues = [iter(b) for b in buckets.values()]
+    while queues:
+        remaining = []
+        for q in queues:
+            item = next(q, None)
+            if item is not None:
+                ordered.append(item)
+                remaining.append(q)
+        queues = remaining
+    return ordered
+
+
+def map_by_host(
+    func: Callable[[str], Any],
+    urls,
+    workers: int = 8,
+    per_host: int = 2,
+    on_error: Optional[Callable[[str, Exception], Any]] = None,
+) -> Iterator[tuple]:
+    """
+    Run func(url) for many URLs concurrently, yielding results as they complete.
+
+    The worker pool behind fetch_pages(), for callers that do more per URL
+    than one fetch (drift capture, backlink verification). URLs are
+    deduplicated and interleaved across hosts, and at most `per_host` calls
+    run at once per hostname, so one large site cannot occupy every worker.
+
+    Args:
+        func: Called once per URL on a worker thread.
+        urls: Iterable of URLs.
+        workers: Global cap on concurrent calls.
+        per_host: Cap on concurrent calls per hostname.
+        on_error: Builds the result for a URL whose call raised; without it
+            the exception propagates to the caller.
+
+    Yields:
+        (url, result) tuples in completion order.
+    """
+    queue = interleave_by_host(list(dict.fromkeys(urls)))
+    if not queue:
+        return
+    limiter = HostLimiter(per_host)
+
+    def _work(u: str):
+        with limiter.slot(u):
+            return func(u)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(workers, len(queue))), thread_name_prefix="map-by-host")
+    try:
+        futures = {pool.submit(_work, u): u for u in queue}
+        for future in as_completed(futures):
+            u = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                if on_error is None:
+                    raise
+                result = on_error(u, e)
+            yield u, result
+    finally:
+        # Runs when the caller stops iterating early, too
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def fetch_pages(
+    urls,
+    workers: int = 8,
+    per_host: int = 2,
+    **fetch_kwargs,
+) -> Iterator[tuple]:
+    """
+    Fetch many URLs concurrently, yielding results as they complete.
+
+    Runs fetch_page() through map_by_host(): `workers` threads, at most
+    `per_host` requests in flight per hostname, URLs deduplicated and
+    interleaved across hosts. Connections come from the shared session
+    pool; raise its pool_size (see configure_session_pool) if per_host
+    exceeds it.
+
+    Args:
+        urls: Iterable of URLs.
+        workers: Global cap on concurrent requests.
+        per_host: Cap on concurrent requests per hostname.
+        **fetch_kwargs: Passed to every fetch_page() call (timeout,
+            user_agent, extra_headers, ...).
+
+    Yields:
+        (requested_url, result) tuples in completion order, where result has
+        the same shape as fetch_page()'s, including SSRF blocks and errors.
+    """
+    def _error(u: str, e: Exception) -> dict:  # one bad URL must not end the batch
+        return {
+            "url": u, "status_code": None, "content": None, "headers": {},
+            "redirect_chain": [], "redirect_details": [], "truncated": False,
+            "truncation": None, "bytes_read": 0, "error": f"Unexpected error: {e}",
+        }
+
+    yield from map_by_host(
+        lambda u: fetch_page(u, **fetch_kwargs), urls, workers=workers, per_host=per_host, on_error=_error
+    )
+
+
+def _body_limits(args) -> dict:
+    """fetch_page() max_bytes/max_time/head_only/timing keyword arguments from the CLI flags."""
+    limits = {"max_time": args.max_time, "timing": args.timing}
+    if args.head_only is not None:
+        return {**limits, "max_bytes": args.head_only * 1024, "head_only": True}
+    return {**limits, "max_bytes": args.max_bytes}
+
+
+def _batch_main(args, user_agent: Optional[str], cache=None) -> None:
+    """CLI path for --batch: NDJSON results on stdout, a tally on stderr."""
+    if args.batch == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(args.batch, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    urls = [ln.strip() for ln in lines if ln.strip() and not ln.strip().startswith("#")]
+
+    configure_session_pool(pool_size=max(POOL_CONNECTIONS, args.per_host))
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    failed = 0
+    timings = []
+    try:
+        for requested, result in fetch_pages(
+            urls,
+            workers=args.workers,
+            per_host=args.per_host,
+            timeout=args.timeout,
+            follow_redirects=not args.no_redirects,
+            user_agent=user_agent,
+            cache=cache,
+            **_body_limits(args),
+        ):
+            failed += bool(result["error"])
+            if result.get("timing"):
+                timings.append({"timing": result["timing"]})
+            out.write(json.dumps({"requested_url": requested, **result}) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Fetched {len(set(urls)) - failed} of {len(set(urls))} URL(s), {failed} failed", file=sys.stderr)
+    if cache is not None:
+        c = cache.counters
+        print(
+            f"Cache: {c['revalidated']} revalidated (304), {c['fresh']} fresh, {c['stored']} stored, "
+            f"{c['bytes_saved']} body bytes not transferred",
+            file=sys.stderr,
+        )
+    if args.timing:
+        print(json.dumps({"timing_percentiles": timing_percentiles(timings)}, indent=2), file=sys.stderr)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Fetch a web page for SEO analysis")
-    parser.add_argument("url", help="URL to fetch")
+    parser.add_argument("url", nargs="?", help="URL to fetch")
     parser.add_argument("--output", "-o", help="Output file path")
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Fetch every URL in FILE ('-' for stdin, one per line); prints one JSON result per line",
+    )
+    parser.add_argument("--workers", type=int, default=8, help="Batch: concurrent requests (default: 8)")
+    parser.add_argument("--per-host", type=int, default=2, help="Batch: concurrent requests per host (default: 2)")
+    parser.add_argument(
+        "--max-bytes",
+        type=int,
+        default=DEFAULT_MAX_BYTES,
+        help=f"Stop reading the body after this many bytes (default: {DEFAULT_MAX_BYTES})",
+    )
+    parser.add_argument(
+        "--max-time",
+        type=float,
+        metavar="SECONDS",
+        help="Stop reading the body this many seconds after the request (default: no limit)",
+    )
+    parser.add_argument(
+        "--head-only",
+        type=int,
+        nargs="?",
+        const=HEAD_ONLY_BYTES // 1024,
+        metavar="KB",
+        help=f"Only read up to </head>, at most KB kilobytes (default: {HEAD_ONLY_BYTES // 1024})",
+    )
+    parser.add_argument(
+        "--timing",
+        action="store_true",
+        help="Record DNS/connect/TLS/TTFB/download per hop; --batch adds percentiles on stderr",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Revalidate against the on-disk HTTP cache (~/.cache/gemini-seo/http)",
+    )
+    parser.add_argument(
+        "--respect-cache-control",
+        action="store_true",
+        help="With --cache: serve responses still fresh under Cache-Control without a request",
+    )
     parser.add_argument("--timeout", "-t", type=int, default=30, help="Timeout in seconds")
     parser.add_argument("--no-redirects", action="store_true", help="Don't follow redirects")
     parser.add_argument("--user-agent", help="Custom User-Agent string")
@@ -158,16 +814,29 @@ def main():
     )
 
     args = parser.parse_args()
+    if not args.url and not args.batch:
+        parser.error("a URL or --batch FILE is required")
 
     ua = args.user_agent
     if args.googlebot:
         ua = GOOGLEBOT_USER_AGENT
 
+    cache = None
+    if args.cache:
+        from http_cache import HTTPCache
+        cache = HTTPCache(respect_cache_control=args.respect_cache_control)
+
+    if args.batch:
+        _batch_main(args, ua, cache)
+        return
+
     result = fetch_page(
         args.url,
         timeout=args.timeout,
         follow_redirects=not args.no_redirects,
         user_agent=ua,
+        cache=cache,
+        **_body_limits(args),
     )
 
     if result["error"]:
@@ -184,6 +853,22 @@ def main():
     # Print metadata to stderr
     print(f"\nURL: {result['url']}", file=sys.stderr)
     print(f"Status: {result['status_code']}", file=sys.stderr)
+    if result.get("cache"):
+        print(f"Cache: {result['cache']}", file=sys.stderr)
+    if result.get("truncated"):
+        print(f"Truncated: {result['truncation']} after {result['bytes_read']} bytes", file=sys.stderr)
+    if result.get("timing"):
+        t = result["timing"]
+        for hop in t["hops"]:
+            setup = "reused" if hop["reused_connection"] else (
+                f"dns {hop['dns_ms']} ms, connect {hop['connect_ms']} ms, tls {hop['tls_ms']} ms"
+            )
+            download = f", download {hop['download_ms']} ms" if hop["download_ms"] is not None else ""
+            print(f"  {hop['status_code']} {hop['url']}: {setup}, ttfb {hop['ttfb_ms']} ms{download}", file=sys.stderr)
+        print(
+            f"Total: {t['total_ms']} ms, {t['wire_bytes']} bytes on the wire, {t['decoded_bytes']} decoded",
+            file=sys.stderr,
+        )
     if result["redirect_details"]:
         for rd in result["redirect_details"]:
             print(f"  {rd['status_code']} -> {rd['url']}", file=sys.stderr)
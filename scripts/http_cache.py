@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Persistent HTTP revalidation cache for fetch_page().
+
+Opt-in: pass `cache=HTTPCache()` to fetch_page() / fetch_pages(), or use
+`fetch_page.py --cache`. Response bodies are stored zlib-compressed in a
+SQLite file together with their ETag / Last-Modified validators. The next
+fetch of the same URL sends If-None-Match / If-Modified-Since, and a 304
+answer is served from the cache, so a re-audit of a mostly unchanged site
+only transfers headers.
+
+With `respect_cache_control=True`, responses still fresh under
+Cache-Control max-age (or Expires) are served without any request, and
+no-store responses are never written. The cache is bounded by size and
+evicts least-recently-used entries.
+
+Usage:
+    python http_cache.py --stats
+    python http_cache.py --evict --max-size 128
+    python http_cache.py --clear
+
+Storage: ~/.cache/gemini-seo/http/cache.db
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+import zlib
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import sqlite_lru  # noqa: E402
+
+CACHE_DIR = os.path.expanduser("~/.cache/gemini-seo/http")
+CACHE_DB_NAME = "cache.db"
+
+TABLE = "entries"
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_MAX_AGE_RE = re.compile(r"max-age\s*=\s*(\d+)", re.IGNORECASE)
+
+
+def cache_key(url: str, user_agent: Optional[str] = None) -> str:
+    """Entries are keyed by URL and User-Agent (prerender services vary on it)."""
+    return hashlib.sha256(f"{user_agent or ''}\n{url}".encode("utf-8")).hexdigest()
+
+
+def _header(headers: dict, name: str) -> Optional[str]:
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def freshness_lifetime(headers: dict) -> Optional[float]:
+    """
+    Seconds a response may be served without revalidation, per
+    Cache-Control max-age or Expires. None when the response gives no
+    lifetime; 0 when it must always be revalidated.
+    """
+    cache_control = (_header(headers, "Cache-Control") or "").lower()
+    if "no-cache" in cache_control or "no-store" in cache_control:
+        return 0
+    match = _MAX_AGE_RE.search(cache_control)
+    if match:
+        return float(match.group(1))
+    expires = _header(headers, "Expires")
+    if expires:
+        try:
+            return max(0.0, parsedate_to_datetime(expires).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return 0
+    return None
+
+
+class HTTPCache:
+    """
+    Size-bounded, LRU-evicted store of fetch_page() results and validators.
+
+    Safe to share between the threads of fetch_pages(): all access goes
+    through one connection guarded by a lock.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        respect_cache_control: bool = False,
+    ):
+        self.path = path or os.path.join(CACHE_DIR, CACHE_DB_NAME)
+        self.max_bytes = max_bytes
+        self.respect_cache_control = respect_cache_control
+        self.counters = {"fresh": 0, "revalidated": 0, "stored": 0, "bytes_saved": 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite_lru.connect(self.path, TABLE, """
+            url TEXT NOT NULL,
+            final_url TEXT,
+            status_code INTEGER,
+            headers_json TEXT,
+            redirects_json TEXT,
+            etag TEXT,
+            last_modified TEXT,
+            body BLOB,
+            fresh_until REAL
+        """)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- lookups ------------------------------------------------------------
+
+    def lookup(self, url: str, user_agent: Optional[str] = None) -> Optional[dict]:
+        """Cached entry for a URL, or None. Does not decompress the body."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, fresh_until, raw_size FROM entries WHERE key = ?",
+                (cache_key(url, user_agent),),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "fresh_until": row[2], "raw_size": row[3]}
+
+    def is_fresh(self, entry: dict, now: Optional[float] = None) -> bool:
+        """True if the entry can be served without contacting the server."""
+        if not self.respect_cache_control or not entry.get("fresh_until"):
+            return False
+        return entry["fresh_until"] > (time.time() if now is None else now)
+
+    @staticmethod
+    def conditional_headers(entry: dict) -> dict:
+        """If-None-Match / If-Modified-Since for revalidating an entry."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def load(self, url: str, user_agent: Optional[str] = None, revalidated_headers: Optional[dict] = None) -> Optional[dict]:
+        """
+        Rebuild a fetch_page() result from the cache and mark it used.
+
+        `revalidated_headers` are the headers of a 304 answer; their
+        Cache-Control/Expires refresh the entry's freshness.
+        """
+        key = cache_key(url, user_agent)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT final_url, status_code, headers_json, redirects_json, body, raw_size "
+                "FROM entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            updates = {"last_access": now}
+            if revalidated_headers is not None:
+                lifetime = freshness_lifetime(revalidated_headers)
+                updates["stored_at"] = now
+                updates["fresh_until"] = now + lifetime if lifetime else None
+            self._conn.execute(
+                "UPDATE entries SET " + ", ".join(f"{k} = ?" for k in updates) + " WHERE key = ?",
+                (*updates.values(), key),
+            )
+            self._conn.commit()
+            self.counters["fresh" if revalidated_headers is None else "revalidated"] += 1
+            self.counters["bytes_saved"] += row[5]
+
+        final_url, status_code, headers_json, redirects_json, body, raw_size = row
+        redirects = json.loads(redirects_json or "[]")
+        return {
+            "url": final_url,
+            "status_code": status_code,
+            "content": zlib.decompress(body).decode("utf-8"),
+            "headers": json.loads(headers_json or "{}"),
+            "redirect_chain": [r["url"] for r in redirects],
+            "redirect_details": redirects,
+            "truncated": False,
+            "truncation": None,
+            "bytes_read": raw_size,
+            "error": None,
+        }
+
+    # -- writes -------------------------------------------------------------
+
+    def store(self, url: str, result: dict, user_agent: Optional[str] = None) -> bool:
+        """
+        Store a successful fetch_page() result. Returns False if it was not
+        cacheable (error, non-200, no or truncated body, or no-store under
+        Cache-Control).
+        """
+        if result.get("error") or result.get("status_code") != 200 or result.get("content") is None:
+            return False
+        if result.get("truncated"):
+            return False
+        headers = result.get("headers") or {}
+        if self.respect_cache_control and "no-store" in (_header(headers, "Cache-Control") or "").lower():
+            return False
+
+        raw = result["content"].encode("utf-8")
+        body = zlib.compress(raw, 6)
+        now = time.time()
+        lifetime = freshness_lifetime(headers)
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO entries
+                   (key, url, final_url, status_code, headers_json, redirects_json, etag,
+                    last_modified, body, raw_size, stored_size, stored_at, fresh_until, last_access)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    cache_key(url, user_agent), url, result.get("url"), result["status_code"],
+                    json.dumps(headers), json.dumps(result.get("redirect_details") or []),
+                    _header(headers, "ETag"), _header(headers, "Last-Modified"),
+                    body, len(raw), len(body), now, now + lifetime if lifetime else None, now,
+                ),
+            )
+            self._conn.commit()
+            self.counters["stored"] += 1
+            sqlite_lru.evict(self._conn, TABLE, self.max_bytes)
+        return True
+
+    def evict(self) -> int:
+        """Drop least-recently-used entries until under max_bytes. Returns count."""
+        with self._lock:
+            return sqlite_lru.evict(self._conn, TABLE, self.max_bytes)
+
+    def clear(self) -> int:
+        with self._lock:
+            return sqlite_lru.clear(self._conn, TABLE)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, raw, stored = sqlite_lru.totals(self._conn, TABLE)
+        return {
+            "path": self.path,
+            "entries": entries,
+            "raw_bytes": raw,
+            "stored_bytes": stored,
+            "max_bytes": self.max_bytes,
+            "file_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+            **self.counters,
+        }
+
+
+def main():
+    sqlite_lru.cache_main(
+        "Inspect or trim the fetch_page HTTP cache",
+        DEFAULT_MAX_BYTES,
+        lambda max_bytes: HTTPCache(max_bytes=max_bytes),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -72,6 +72,7 @@ def run_pagespeed(
     strategy: str = "mobile",
     api_key: Optional[str] = None,
     categories: Optional[list] = None,
+    timeout: int = 120,
 ) -> dict:
     """
     Run PageSpeed Insights v5 analysis.
@@ -81,6 +82,7 @@ def run_pagespeed(
         strategy: 'mobile' or 'desktop'.
         api_key: Google API key (optional but recommended for quota).
         categories: List of categories: PERFORMANCE, ACCESSIBILITY, BEST_PRACTICES, SEO.
+        timeout: HTTP timeout for the PSI request, in seconds.
 
     Returns:
         Dictionary with lighthouse scores, lab metrics, field data (if available),
@@ -123,11 +125,11 @@ def run_pagespeed(
         params["key"] = api_key
 
     try:
-        resp = requests.get(PSI_ENDPOINT, params=params, timeout=120)
+        resp = requests.get(PSI_ENDPOINT, params=params, timeout=timeout)
         resp.raise_for_status()
         data = resp.json()
     except requests.exceptions.Timeout:
-        result["error"] = "PageSpeed Insights request timed out (120s). The target page may be very slow."
+        result["error"] = f"PageSpeed Insights request timed out ({timeout}s). The target page may be very slow."
         return result
     except requests.exceptions.HTTPError as e:
         if resp.status_code == 429:
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache of parse_html() results.
+
+Opt-in: pass `cache=ParseCache()` to parse_html(), or use
+`parse_html.py --cache`. Results are keyed by the SHA-256 of the HTML
+together with the base URL, the selected fields and the parser version, so
+the same body parsed again (by drift, backlink verification or page
+analysis) is answered from the cache instead of re-parsed. A change to
+parse_html() that alters its output bumps PARSER_VERSION there, which
+retires every older entry.
+
+Two tiers, both size-bounded and evicted least-recently-used:
+  - memory: always on, per process
+  - disk:   optional SQLite file (`path`), shared between processes; bodies
+            are stored zlib-compressed
+
+Entries are stored as JSON, so every hit returns a fresh copy that the
+caller may modify.
+
+Usage:
+    python parse_cache.py --stats
+    python parse_cache.py --evict --max-size 64
+    python parse_cache.py --clear
+
+Storage: ~/.cache/gemini-seo/parse/cache.db
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import sqlite_lru  # noqa: E402
+
+CACHE_DIR = os.path.expanduser("~/.cache/gemini-seo/parse")
+CACHE_DB_NAME = "cache.db"
+DEFAULT_PATH = os.path.join(CACHE_DIR, CACHE_DB_NAME)
+TABLE = "results"
+
+DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024
+DEFAULT_DISK_BYTES = 256 * 1024 * 1024
+
+
+def cache_key(html: str, base_url: Optional[str], fields, version: str) -> str:
+    """SHA-256 over the parser version, base URL, field selection and HTML."""
+    selection = ",".join(sorted(fields)) if fields is not None else "*"
+    digest = hashlib.sha256(f"{version}\n{base_url or ''}\n{selection}\n".encode("utf-8"))
+    digest.update(html.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    In-memory LRU of parse results, optionally backed by a SQLite file.
+
+    Thread-safe; the disk tier goes through one connection guarded by the
+    same lock.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_memory_bytes: int = DEFAULT_MEMORY_BYTES,
+        max_disk_bytes: int = DEFAULT_DISK_BYTES,
+    ):
+        self.path = path
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.counters = {"hits": 0, "disk_hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+        self._memory = OrderedDict()    # key -> JSON bytes
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            self._conn = sqlite_lru.connect(path, TABLE, "body BLOB NOT NULL")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._memory)
+
+    # -- lookups ------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[dict]:
+        """A copy of the cached result for `key`, or None."""
+        with self._lock:
+            raw = self._memory.get(key)
+            if raw is not None:
+                self._memory.move_to_end(key)
+                self.counters["hits"] += 1
+                return json.loads(raw)
+            if self._conn is not None:
+                row = self._conn.execute("SELECT body FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+                    self._conn.commit()
+                    raw = zlib.decompress(row[0])
+                    self._remember_locked(key, raw)
+                    self.counters["disk_hits"] += 1
+                    return json.loads(raw)
+            self.counters["misses"] += 1
+        return None
+
+    # -- writes -------------------------------------------------------------
+
+    def put(self, key: str, result: dict) -> None:
+        """Store a result in memory and, if configured, on disk."""
+        raw = json.dumps(result, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            self._remember_locked(key, raw)
+            if self._conn is not None:
+                body = zlib.compress(raw, 6)
+                now = time.time()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (key, body, raw_size, stored_size, stored_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, body, len(raw), len(body), now, now),
+                )
+                self._conn.commit()
+                self._evict_disk_locked()
+            self.counters["stored"] += 1
+
+    def _remember_locked(self, key: str, raw: bytes) -> None:
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        if len(raw) > self.max_memory_bytes:
+            return
+        self._memory[key] = raw
+        self._memory_bytes += len(raw)
+        if self._memory_bytes > self.max_memory_bytes:
+            target = self.max_memory_bytes * sqlite_lru.EVICT_TARGET
+            while self._memory_bytes > target:
+                _key, victim = self._memory.popitem(last=False)
+                self._memory_bytes -= len(victim)
+                self.counters["evicted"] += 1
+
+    def _evict_disk_locked(self) -> int:
+        evicted = sqlite_lru.evict(self._conn, TABLE, self.max_disk_bytes)
+        self.counters["evicted"] += evicted
+        return evicted
+
+    def evict(self) -> int:
+        """Drop least-recently-used disk entries until under max_disk_bytes."""
+        with self._lock:
+            return self._evict_disk_locked() if self._conn is not None else 0
+
+    def clear(self) -> int:
+        """Empty both tiers. Returns the number of entries removed."""
+        with self._lock:
+            removed = len(self._memory)
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self._conn is not None:
+                removed = sqlite_lru.clear(self._conn, TABLE)
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            result = {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+            }
+            if self._conn is not None:
+                entries, raw, stored = sqlite_lru.totals(self._conn, TABLE)
+                result.update({
+                    "path": self.path,
+                    "disk_entries": entries,
+                    "raw_bytes": raw,
+                    "stored_bytes": stored,
+                    "max_disk_bytes": self.max_disk_bytes,
+                })
+            lookups = self.counters["hits"] + self.counters["disk_hits"] + self.counters["misses"]
+            hit_rate = (self.counters["hits"] + self.counters["disk_hits"]) / lookups if lookups else None
+        return {**result, **self.counters, "hit_rate": hit_rate}
+
+
+def main():
+    sqlite_lru.cache_main(
+        "Inspect or trim the parse_html result cache",
+        DEFAULT_DISK_BYTES,
+        lambda max_bytes: ParseCache(path=DEFAULT_PATH, max_disk_bytes=max_bytes),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,18 +2,49 @@
 """
 Parse HTML and extract SEO-relevant elements.
 
+Two parser backends produce identical results:
+  - lxml: handles libxml2's parse events directly, without building a
+    tree (default when lxml is installed, several times faster on large
+    pages)
+  - bs4:  walks a BeautifulSoup tree built with lxml, or html.parser when
+    lxml is missing
+
+Callers that need only some fields can select them (`fields=`, CLI
+`--fields`); the rest are neither extracted nor returned. Results can be
+memoized by content hash (`cache=ParseCache()`, CLI `--cache`; see
+parse_cache.py).
+
+parse_html_stream() (CLI `--stream`) produces the same result from a
+document fed in chunks, without building a tree, for pages too large to
+hold in memory.
+
+With `compact=True` (CLI `--compact`) links and images come back as
+columnar lists with interned origins and rel values instead of one dict
+each, for pages with tens of thousands of anchors. iter_links() reads
+links from either shape; expand_result() converts a compact result back.
+
 Usage:
     python parse_html.py page.html
     python parse_html.py --url https://example.com
+    python parse_html.py page.html --backend bs4
+    python parse_html.py page.html --url https://example.com --fields links,word_count
+    python parse_html.py page.html --cache
+    python parse_html.py huge-category-page.html --stream --max-links 5000
+    python parse_html.py sitemap-page.html --url https://example.com --compact --json
+    fetch_page.py --batch urls.txt | python parse_html.py --batch - --workers 8
 """
 
 import argparse
+import copy
 import json
 import os
 import re
 import sys
-from typing import Optional
-from urllib.parse import urljoin, urlparse
+from abc import ABC, abstractmethod
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator, Optional
+from urllib.parse import urljoin, urlparse, urlsplit
 
 try:
     from bs4 import BeautifulSoup
@@ -22,12 +53,18 @@ except ImportError:
     sys.exit(1)
 
 try:
-    import lxml  # noqa: F401
+    from lxml import etree
     _HTML_PARSER = "lxml"
 except ImportError:
+    etree = None
     _HTML_PARSER = "html.parser"
 
 
+# Bump whenever a change alters parse_html() output, so that results cached
+# by parse_cache.ParseCache under the old version are no longer served.
+PARSER_VERSION = "1"
+
+
 # Lazy-loader detection — covers native + the major JS lazy-loaders found on
 # WordPress/WooCommerce sites (Perfmatters, EWWW Image Optimizer, generic
 # `data-src` patterns). Sites optimized by these plugins strip native
@@ -68,19 +105,551 @@ def _detect_lazy_method(img) -> str:
     return "none"
 
 
-def parse_html(html: str, base_url: Optional[str] = None) -> dict:
+_WORD_RE = re.compile(r"\b\w+\b")
+
+# Subtrees whose text is not part of the visible word count
+_HIDDEN_TAGS = frozenset(("script", "style", "nav", "footer", "header"))
+
+_HEADING_TAGS = ("h1", "h2", "h3")
+
+# BeautifulSoup keeps the strings under these tags as Script, Stylesheet,
+# TemplateString, RubyTextString etc., which get_text() skips. The lxml
+# backend mutes the same subtrees.
+_STRING_CONTAINER_TAGS = frozenset(("script", "style", "template", "rt", "rp"))
+
+# Elements whose attributes _Extractor reads, and the attributes
+# BeautifulSoup splits into lists on them
+_ATTRIBUTE_TAGS = frozenset(("meta", "link", "img", "a", "script"))
+_LIST_ATTRIBUTES = {"a": ("class", "rel"), "link": ("class", "rel")}
+_NONSPACE_RE = re.compile(r"\S+")
+
+# Result fields in output order, with the elements each one is read from
+_FIELD_TAGS = {
+    "title": ("title",),
+    "meta_description": ("meta",),
+    "meta_robots": ("meta",),
+    "canonical": ("link",),
+    "h1": ("h1",),
+    "h2": ("h2",),
+    "h3": ("h3",),
+    "images": ("img",),
+    "links": ("a",),
+    "schema": ("script",),
+    "open_graph": ("meta",),
+    "twitter_card": ("meta",),
+    "word_count": (),
+    "hreflang": ("link",),
+}
+FIELDS = tuple(_FIELD_TAGS)
+
+# Compact results (parse_html(compact=True)) hold links and images as
+# parallel lists, one entry per link/image, tagged with this format:
+#
+#   links:  {"format": "columnar",
+#            "origins": [[origin, internal], ...], "rels": [[rel, ...], ...],
+#            "origin": [i, ...], "path": [...], "text": [...], "rel": [i, ...]}
+#   images: {"format": "columnar",
+#            "origins": [origin, ...], "lazy_methods": [method, ...],
+#            "origin": [i, ...], "path": [...], "alt": [...], "width": [...],
+#            "height": [...], "loading": [...], "lazy_method": [i, ...]}
+#
+# A URL is origins[origin] + path, where the origin is its "scheme://host"
+# prefix ("" when it has none), so the split is lossless. Origins, rel
+# lists and lazy methods repeat across a page and are stored once.
+COMPACT_FORMAT = "columnar"
+_ORIGIN_RE = re.compile(r"[A-Za-z][A-Za-z0-9+.-]*://[^/?#]*")
+
+Link = namedtuple("Link", ("href", "text", "rel", "internal"))
+
+
+def _split_origin(url: str) -> tuple:
+    """(origin, rest) with origin + rest == url."""
+    match = _ORIGIN_RE.match(url)
+    if match is None:
+        return "", url
+    return match.group(), url[match.end():]
+
+
+def _compact_links() -> dict:
+    return {"format": COMPACT_FORMAT, "origins": [], "rels": [], "origin": [], "path": [], "text": [], "rel": []}
+
+
+def _compact_images() -> dict:
+    return {
+        "format": COMPACT_FORMAT,
+        "origins": [],
+        "lazy_methods": [],
+        "origin": [],
+        "path": [],
+        "alt": [],
+        "width": [],
+        "height": [],
+        "loading": [],
+        "lazy_method": [],
+    }
+
+
+def _rel_matches(tag, value: str) -> bool:
+    """Same test as soup.find_all("link", rel=value) on the multi-valued rel."""
+    rel = tag.get("rel")
+    if rel is None:
+        return False
+    if isinstance(rel, str):
+        return rel == value
+    return value in rel or " ".join(rel) == value
+
+
+def _is_suspicious_heading(text: str) -> bool:
+    """Suspiciously short or purely numeric headings (likely counters/stats)."""
+    stripped = text.strip()
+    return (
+        len(stripped) <= 3
+        or stripped.replace(",", "").replace(".", "").replace("+", "").replace("-", "").replace("%", "").replace(" ", "").isdigit()
+    )
+
+
+class _TextCollector:
+    """Accumulates get_text(strip=True) for one tag during the walk."""
+
+    __slots__ = ("parts", "on_close")
+
+    def __init__(self, on_close):
+        self.parts = []
+        self.on_close = on_close
+
+    def close(self):
+        self.on_close("".join(self.parts))
+
+
+class _Extractor(ABC):
     """
-    Parse HTML and extract SEO-relevant elements.
+    Fills a parse_html() result in a single pre-order walk of the document.
 
-    Args:
-        html: HTML content to parse
-        base_url: Base URL for resolving relative links
+    Text of the title, headings and links is collected as the walk passes
+    through their strings. Visible words are counted from the strings outside
+    script/style/nav/footer/header, so the tree is never modified. Output is
+    identical to running soup.find_all() per element type and decomposing
+    hidden tags before soup.get_text().
 
-    Returns:
-        Dictionary with extracted SEO data
+    Only the fields present in `result` are extracted: elements no selected
+    field reads are passed over, and words are counted only for word_count.
+    Subclasses drive _enter() and _finish() from one parser backend:
+    _SoupExtractor.run() walks a BeautifulSoup tree, _StreamExtractor is an
+    lxml parser target.
     """
-    soup = BeautifulSoup(html, _HTML_PARSER)
 
+    def __init__(self, result: dict, base_url: Optional[str], compact: bool = False):
+        self.result = result
+        self.base_url = base_url
+        self.base_domain = urlparse(base_url).netloc if base_url else None
+        self.title_seen = False
+        self.canonical_seen = False
+        self.count_words = "word_count" in result
+        # Retention caps (parse_html_stream); None means unlimited
+        self.max_links = None
+        self.max_images = None
+        self.omitted = {"links": 0, "images": 0}
+        self.tags = {tag for field in result for tag in _FIELD_TAGS[field]}
+        if not base_url:
+            self.tags.discard("a")
+        # Headings keep a slot per tag in document order; empty ones are
+        # dropped at the end, like the get_text() check did.
+        self.headings = {tag: [] for tag in _HEADING_TAGS if tag in result}
+        # Compact columns, and the index of each value in their tables
+        self.compact = compact
+        self.interned = {}      # (field, table) -> {key: index}
+        if compact:
+            if "links" in result:
+                result["links"] = _compact_links()
+            if "images" in result:
+                result["images"] = _compact_images()
+
+    @abstractmethod
+    def _script_text(self, node) -> Optional[str]:
+        """Body of the JSON-LD script element `node`, None if it has none."""
+
+    def _enter(self, name: str, tag, node):
+        """
+        Handle an element as the walk enters it; may return a text collector.
+
+        `tag` is the element's attribute mapping (class and rel as lists, as
+        BeautifulSoup gives them); `node` is the backend's element.
+        """
+        if name not in self.tags:
+            return None
+        result = self.result
+
+        if name == "meta":
+            meta_name = tag.get("name", "").lower()
+            property_attr = tag.get("property", "").lower()
+            content = tag.get("content", "")
+            if meta_name == "description":
+                if "meta_description" in result:
+                    result["meta_description"] = content
+            elif meta_name == "robots":
+                if "meta_robots" in result:
+                    result["meta_robots"] = content
+            if property_attr.startswith("og:") and "open_graph" in result:
+                result["open_graph"][property_attr] = content
+            if meta_name.startswith("twitter:") and "twitter_card" in result:
+                result["twitter_card"][meta_name] = content
+
+        elif name == "link":
+            if not self.canonical_seen and "canonical" in result and _rel_matches(tag, "canonical"):
+                self.canonical_seen = True
+                result["canonical"] = tag.get("href")
+            if "hreflang" in result and _rel_matches(tag, "alternate"):
+                hreflang = tag.get("hreflang")
+                if hreflang:
+                    result["hreflang"].append({"lang": hreflang, "href": tag.get("href")})
+
+        elif name in self.headings:
+            slot = [None]
+            self.headings[name].append(slot)
+            return _TextCollector(lambda text: slot.__setitem__(0, text))
+
+        elif name == "img":
+            if self.max_images is not None and self._kept("images") >= self.max_images:
+                self.omitted["images"] += 1
+                return None
+            src = tag.get("src", "")
+            if self.base_url and src:
+                src = urljoin(self.base_url, src)
+            if self.compact:
+                self._add_compact_image(src, tag)
+                return None
+            result["images"].append({
+                "src": src,
+                "alt": tag.get("alt"),
+                "width": tag.get("width"),
+                "height": tag.get("height"),
+                "loading": tag.get("loading"),
+                "lazy_method": _detect_lazy_method(tag),
+            })
+
+        elif name == "a":
+            if "href" in tag:
+                href = tag.get("href", "")
+                if not href or href.startswith("#") or href.startswith("javascript:"):
+                    return None
+                if self.max_links is not None and self._kept("links") >= self.max_links:
+                    self.omitted["links"] += 1
+                    return None
+                full_url = urljoin(self.base_url, href)
+                internal = urlsplit(full_url).netloc == self.base_domain
+                if self.compact:
+                    return self._add_compact_link(full_url, internal, tag.get("rel", []))
+                link_data = {"href": full_url, "text": None, "rel": tag.get("rel", [])}
+                result["links"]["internal" if internal else "external"].append(link_data)
+                return _TextCollector(lambda text: link_data.__setitem__("text", text[:100]))
+
+        elif name == "title":
+            if not self.title_seen:
+                self.title_seen = True
+                return _TextCollector(lambda text: result.__setitem__("title", text))
+
+        elif name == "script":
+            if tag.get("type") == "application/ld+json":
+                _append_schema(result["schema"], self._script_text(node))
+
+        return None
+
+    def _kept(self, field: str) -> int:
+        """Links or images stored so far."""
+        value = self.result[field]
+        if self.compact:
+            return len(value["path"])
+        if field == "links":
+            return len(value["internal"]) + len(value["external"])
+        return len(value)
+
+    def _intern(self, field: str, table: str, key, value) -> int:
+        """Index of `key` in result[field][table], appending `value` if new."""
+        seen = self.interned.setdefault((field, table), {})
+        index = seen.get(key)
+        if index is None:
+            index = seen[key] = len(seen)
+            self.result[field][table].append(value)
+        return index
+
+    def _add_compact_link(self, url: str, internal: bool, rel) -> _TextCollector:
+        links = self.result["links"]
+        origin, path = _split_origin(url)
+        links["origin"].append(self._intern("links", "origins", (origin, internal), [origin, internal]))
+        links["path"].append(path)
+        links["rel"].append(self._intern("links", "rels", tuple(rel), list(rel)))
+        texts = links["text"]
+        slot = len(texts)
+        texts.append(None)
+        return _TextCollector(lambda text: texts.__setitem__(slot, text[:100]))
+
+    def _add_compact_image(self, src: str, tag) -> None:
+        images = self.result["images"]
+        origin, path = _split_origin(src)
+        method = _detect_lazy_method(tag)
+        images["origin"].append(self._intern("images", "origins", origin, origin))
+        images["path"].append(path)
+        images["alt"].append(tag.get("alt"))
+        images["width"].append(tag.get("width"))
+        images["height"].append(tag.get("height"))
+        images["loading"].append(tag.get("loading"))
+        images["lazy_method"].append(self._intern("images", "lazy_methods", method, method))
+
+    def _finish(self, words: int) -> None:
+        if self.count_words:
+            self.result["word_count"] = words
+        for tag in self.headings:
+            texts = [slot[0] for slot in self.headings[tag] if slot[0]]
+            self.result[tag] = texts
+            suspicious = [text for text in texts if _is_suspicious_heading(text)]
+            if suspicious:
+                self.result[f"{tag}_suspicious"] = suspicious
+
+
+class _SoupExtractor(_Extractor):
+    """Walks a BeautifulSoup tree via soup.descendants."""
+
+    def run(self, soup) -> None:
+        from bs4.element import NavigableString, Tag
+
+        open_tags = []      # (tag, collector or None, hides) for the current path
+        collectors = []     # active collectors, outermost first
+        hidden = 0
+        words = 0
+        count_words = self.count_words
+        # Title, heading and link tags share the document's string types
+        interesting = soup.interesting_string_types
+        if isinstance(interesting, type):
+            interesting = (interesting,)
+        findall = _WORD_RE.findall
+
+        for node in soup.descendants:
+            parent = node.parent
+            while open_tags and open_tags[-1][0] is not parent:
+                _tag, collector, hides = open_tags.pop()
+                if collector is not None:
+                    collectors.remove(collector)
+                    collector.close()
+                if hides:
+                    hidden -= 1
+
+            if isinstance(node, Tag):
+                collector = self._enter(node.name, node.attrs, node)
+                hides = node.name in _HIDDEN_TAGS
+                if collector is not None:
+                    collectors.append(collector)
+                if hides:
+                    hidden += 1
+                open_tags.append((node, collector, hides))
+            elif isinstance(node, NavigableString):
+                kind = type(node)
+                if kind not in interesting:
+                    continue
+                if count_words and not hidden:
+                    words += len(findall(node))
+                if collectors:
+                    stripped = node.strip()
+                    if stripped:
+                        for collector in collectors:
+                            collector.parts.append(stripped)
+
+        while open_tags:
+            _tag, collector, _hides = open_tags.pop()
+            if collector is not None:
+                collector.close()
+
+        self._finish(words)
+
+    def _script_text(self, node) -> Optional[str]:
+        return node.string
+
+
+def _split_list_attributes(name: str, attrs: dict) -> dict:
+    for key in _LIST_ATTRIBUTES.get(name, ("class",)):
+        value = attrs.get(key)
+        if value is not None:
+            attrs[key] = _NONSPACE_RE.findall(value)
+    return attrs
+
+
+class _StreamExtractor(_Extractor):
+    """
+    lxml parser target: builds no tree, only reacts to start/end/data
+    events as libxml2 parses the document, whether it is fed whole (the
+    lxml backend) or in chunks (parse_html_stream). Text between two events
+    is buffered and handled as one string, as BeautifulSoup does, so words
+    split across chunk boundaries are counted once. Unlike a tree built by
+    libxml2, the events include content after </html>, which BeautifulSoup
+    keeps too.
+    """
+
+    def __init__(self, result: dict, base_url: Optional[str], compact: bool = False):
+        super().__init__(result, base_url, compact)
+        self.stack = []         # (name, collector, hides, mutes)
+        self.collectors = []
+        self.hidden = self.muted = self.words = 0
+        self.pending = []       # text since the last event
+        self.script_parts = None
+
+    def start(self, name, attrib):
+        self._flush()
+        collector = None
+        if name in self.tags:
+            attrs = _split_list_attributes(name, dict(attrib)) if name in _ATTRIBUTE_TAGS else {}
+            if name == "script":
+                # The body has not arrived yet; collect it until end()
+                if attrs.get("type") == "application/ld+json":
+                    self.script_parts = []
+            else:
+                collector = self._enter(name, attrs, None)
+        hides = name in _HIDDEN_TAGS
+        mutes = name in _STRING_CONTAINER_TAGS
+        if collector is not None:
+            self.collectors.append(collector)
+        self.hidden += hides
+        self.muted += mutes
+        self.stack.append((name, collector, hides, mutes))
+
+    def end(self, name):
+        self._flush()
+        if not self.stack:
+            return
+        name, collector, hides, mutes = self.stack.pop()
+        if collector is not None:
+            self.collectors.remove(collector)
+            collector.close()
+        self.hidden -= hides
+        self.muted -= mutes
+        if name == "script" and self.script_parts is not None:
+            _append_schema(self.result["schema"], self._script_text(None))
+            self.script_parts = None
+
+    def data(self, text):
+        if self.script_parts is not None:
+            self.script_parts.append(text)
+        if not self.muted and (self.collectors or (self.count_words and not self.hidden)):
+            self.pending.append(text)
+
+    def comment(self, text):
+        self._flush()
+
+    def pi(self, target, data=None):
+        self._flush()
+
+    def doctype(self, *args):
+        self._flush()
+
+    def _script_text(self, node) -> Optional[str]:
+        # The body arrives as data() events between start() and end()
+        return "".join(self.script_parts)
+
+    def close(self):
+        self._flush()
+        while self.stack:
+            self.end(self.stack[-1][0])
+        self._finish(self.words)
+        return self.result
+
+    def _flush(self):
+        if not self.pending:
+            return
+        value = "".join(self.pending)
+        self.pending = []
+        if self.count_words and not self.hidden:
+            self.words += len(_WORD_RE.findall(value))
+        if self.collectors:
+            stripped = value.strip()
+            if stripped:
+                for collector in self.collectors:
+                    collector.parts.append(stripped)
+
+
+def _run_soup(html: str, result: dict, base_url: Optional[str], compact: bool = False) -> None:
+    _SoupExtractor(result, base_url, compact).run(BeautifulSoup(html, _HTML_PARSER))
+
+
+def _run_lxml(html: str, result: dict, base_url: Optional[str], compact: bool = False) -> None:
+    """
+    Feed the document to libxml2 with _StreamExtractor as the target, like
+    BeautifulSoup's lxml builder: one feed() of the Unicode text (minus a
+    BOM), retried as UTF-8 bytes if lxml rejects it.
+    """
+    if html[:1] == "\N{BYTE ORDER MARK}":
+        html = html[1:]
+    empty = copy.deepcopy(result)
+    for markup, encoding in ((html, None), (html.encode("utf-8"), "utf-8")):
+        extractor = _StreamExtractor(result, base_url, compact)
+        try:
+            if not markup:
+                # lxml refuses to close a parser that was never fed
+                extractor.close()
+                return
+            parser = etree.HTMLParser(target=extractor, recover=True, encoding=encoding)
+            parser.feed(markup)
+            parser.close()
+            return
+        except (UnicodeDecodeError, LookupError, etree.ParserError):
+            _reset(result, empty)
+            continue
+        except etree.XMLSyntaxError:
+            _reset(result, empty)
+            break
+    # A document lxml cannot parse at all reads as one with no elements
+    _StreamExtractor(result, base_url, compact).close()
+
+
+def _reset(result: dict, empty: dict) -> None:
+    result.clear()
+    result.update(copy.deepcopy(empty))
+
+
+BACKENDS = {"bs4": _run_soup}
+if etree is not None:
+    BACKENDS["lxml"] = _run_lxml
+DEFAULT_BACKEND = "lxml" if "lxml" in BACKENDS else "bs4"
+
+
+def _append_schema(schema: list, raw) -> None:
+    """Parse one JSON-LD block, flattening @graph containers and lists."""
+    try:
+        schema_data = json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return
+    # Flatten @graph containers so each @type is a separate entry
+    if isinstance(schema_data, dict) and "@graph" in schema_data:
+        schema.extend(item for item in schema_data["@graph"] if isinstance(item, dict))
+    elif isinstance(schema_data, list):
+        schema.extend(item for item in schema_data if isinstance(item, dict))
+    else:
+        schema.append(schema_data)
+
+
+def _check_options(backend: Optional[str], fields) -> tuple:
+    """Validated (backend, fields) for parse_html(); fields becomes a set or None."""
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        hint = " (install lxml)" if backend == "lxml" else ""
+        raise ValueError(f"Unknown or unavailable parser backend: {backend}{hint}")
+    if fields is not None:
+        fields = set(fields)
+        unknown = fields.difference(FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+    return backend, fields
+
+
+def _cache_key(html: str, base_url: Optional[str], fields, compact: bool = False) -> str:
+    from parse_cache import cache_key
+
+    # The tree builder is part of the version: bs4 on html.parser gives
+    # different results on malformed markup than either lxml path
+    version = f"{PARSER_VERSION}/{_HTML_PARSER}"
+    if compact:
+        version += "/compact"
+    return cache_key(html, base_url, fields, version)
+
+
+def _empty_result(fields) -> dict:
     result = {
         "title": None,
         "meta_description": None,
@@ -100,128 +669,380 @@ def parse_html(html: str, base_url: Optional[str] = None) -> dict:
         "word_count": 0,
         "hreflang": [],
     }
+    if fields is not None:
+        result = {key: value for key, value in result.items() if key in fields}
+    return result
 
-    # Title
-    title_tag = soup.find("title")
-    if title_tag:
-        result["title"] = title_tag.get_text(strip=True)
-
-    # Meta tags
-    for meta in soup.find_all("meta"):
-        name = meta.get("name", "").lower()
-        property_attr = meta.get("property", "").lower()
-        content = meta.get("content", "")
-
-        if name == "description":
-            result["meta_description"] = content
-        elif name == "robots":
-            result["meta_robots"] = content
-
-        # Open Graph
-        if property_attr.startswith("og:"):
-            result["open_graph"][property_attr] = content
-
-        # Twitter Card
-        if name.startswith("twitter:"):
-            result["twitter_card"][name] = content
-
-    # Canonical
-    canonical = soup.find("link", rel="canonical")
-    if canonical:
-        result["canonical"] = canonical.get("href")
-
-    # Hreflang
-    for link in soup.find_all("link", rel="alternate"):
-        hreflang = link.get("hreflang")
-        if hreflang:
-            result["hreflang"].append({
-                "lang": hreflang,
-                "href": link.get("href"),
-            })
 
-    # Headings
-    for tag in ["h1", "h2", "h3"]:
-        for heading in soup.find_all(tag):
-            text = heading.get_text(strip=True)
-            if text:
-                result[tag].append(text)
-                # Flag suspiciously short or purely numeric headings (likely counters/stats)
-                stripped = text.strip()
-                is_suspicious = (
-                    len(stripped) <= 3
-                    or stripped.replace(",", "").replace(".", "").replace("+", "").replace("-", "").replace("%", "").replace(" ", "").isdigit()
-                )
-                if is_suspicious:
-                    key = f"{tag}_suspicious"
-                    if key not in result:
-                        result[key] = []
-                    result[key].append(text)
-
-    # Images
-    for img in soup.find_all("img"):
-        src = img.get("src", "")
-        if base_url and src:
-            src = urljoin(base_url, src)
-
-        result["images"].append({
-            "src": src,
-            "alt": img.get("alt"),
-            "width": img.get("width"),
-            "height": img.get("height"),
-            "loading": img.get("loading"),
-            "lazy_method": _detect_lazy_method(img),
-        })
-
-    # Links
-    if base_url:
-        base_domain = urlparse(base_url).netloc
-
-        for a in soup.find_all("a", href=True):
-            href = a.get("href", "")
-            if not href or href.startswith("#") or href.startswith("javascript:"):
-                continue
+def parse_html(
+    html: str,
+    base_url: Optional[str] = None,
+    backend: Optional[str] = None,
+    fields=None,
+    cache=None,
+    compact: bool = False,
+) -> dict:
+    """
+    Parse HTML and extract SEO-relevant elements.
+
+    Every field is filled in one walk over the parsed document (see
+    _Extractor); the tree is not modified.
+
+    Args:
+        html: HTML content to parse
+        base_url: Base URL for resolving relative links
+        backend: "lxml" or "bs4" (default: DEFAULT_BACKEND). Both give the
+            same result; "lxml" skips building BeautifulSoup objects.
+        fields: Names from FIELDS to extract (default: all). The result
+            holds only these keys (plus hN_suspicious for selected
+            headings), with the same values a full parse gives.
+        cache: Optional parse_cache.ParseCache. A result stored for the same
+            HTML, base URL and fields by this PARSER_VERSION is returned
+            instead of parsing again.
+        compact: Return links and images in the columnar form described at
+            COMPACT_FORMAT. Read them with iter_links(), or convert with
+            expand_result(), which gives back the default result exactly.
+
+    Returns:
+        Dictionary with extracted SEO data
+    """
+    backend, fields = _check_options(backend, fields)
+
+    key = None
+    if cache is not None:
+        key = _cache_key(html, base_url, fields, compact)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    result = _empty_result(fields)
+    BACKENDS[backend](html, result, base_url, compact)
+    if key is not None:
+        cache.put(key, result)
+    return result
+
+
+def _is_compact(value) -> bool:
+    return isinstance(value, dict) and value.get("format") == COMPACT_FORMAT
 
-            full_url = urljoin(base_url, href)
-            parsed = urlparse(full_url)
 
-            link_data = {
-                "href": full_url,
-                "text": a.get_text(strip=True)[:100],
-                "rel": a.get("rel", []),
+def iter_links(result: dict, bucket: Optional[str] = None) -> Iterator[Link]:
+    """
+    The links of a parse_html() result, compact or not, as Link tuples.
+
+    Args:
+        result: A parse_html() result (or any dict with its "links").
+        bucket: "internal" or "external" for one of them (default: both,
+            internal first). Within a bucket links are in document order.
+
+    Yields:
+        Link(href, text, rel, internal). In a compact result the rel list
+        is shared between links with the same rel; copy it before changing it.
+    """
+    links = result.get("links") or {}
+    buckets = (bucket,) if bucket else ("internal", "external")
+    if not _is_compact(links):
+        for name in buckets:
+            for link in links.get(name, []):
+                yield Link(link["href"], link["text"], link["rel"], name == "internal")
+        return
+
+    origins, rels = links["origins"], links["rels"]
+    for name in buckets:
+        want_internal = name == "internal"
+        for origin, path, text, rel in zip(links["origin"], links["path"], links["text"], links["rel"]):
+            prefix, internal = origins[origin]
+            if internal == want_internal:
+                yield Link(prefix + path, text, rels[rel], internal)
+
+
+def expand_result(result: dict) -> dict:
+    """
+    The default-shape equivalent of a compact parse_html() result.
+
+    Links become {"internal": [...], "external": [...]} of href/text/rel
+    dicts and images a list of dicts again, equal to what parse_html()
+    without compact returns. Other keys are shared with `result`; a result
+    that is not compact comes back as a shallow copy.
+    """
+    expanded = dict(result)
+    if _is_compact(result.get("links")):
+        expanded["links"] = {
+            bucket: [{"href": link.href, "text": link.text, "rel": list(link.rel)} for link in iter_links(result, bucket)]
+            for bucket in ("internal", "external")
+        }
+    images = result.get("images")
+    if _is_compact(images):
+        origins, methods = images["origins"], images["lazy_methods"]
+        expanded["images"] = [
+            {
+                "src": origins[origin] + path,
+                "alt": alt,
+                "width": width,
+                "height": height,
+                "loading": loading,
+                "lazy_method": methods[method],
             }
+            for origin, path, alt, width, height, loading, method in zip(
+                images["origin"], images["path"], images["alt"], images["width"],
+                images["height"], images["loading"], images["lazy_method"],
+            )
+        ]
+    return expanded
 
-            if parsed.netloc == base_domain:
-                result["links"]["internal"].append(link_data)
-            else:
-                result["links"]["external"].append(link_data)
 
-    # Schema (JSON-LD)
-    for script in soup.find_all("script", type="application/ld+json"):
+DEFAULT_MAX_LINKS = 10_000
+DEFAULT_MAX_IMAGES = 2_000
+STREAM_CHUNK_CHARS = 64 * 1024
+
+
+def parse_html_stream(
+    chunks,
+    base_url: Optional[str] = None,
+    fields=None,
+    max_links: Optional[int] = DEFAULT_MAX_LINKS,
+    max_images: Optional[int] = DEFAULT_MAX_IMAGES,
+    compact: bool = False,
+) -> dict:
+    """
+    Extract the parse_html() result from a document fed in chunks.
+
+    Needs lxml: the chunks go to its push parser with an event target
+    (_StreamExtractor), so neither the document nor a tree is held in
+    memory, only the extracted fields. Up to the caps, the result equals
+    parse_html(''.join(chunks), base_url, fields=fields). Without lxml the
+    chunks are joined and parsed with parse_html(), unbounded.
+
+    Args:
+        chunks: Iterable of str pieces of the document (e.g. file reads).
+        base_url, fields, compact: As for parse_html().
+        max_links: Links kept across internal and external (None: no cap).
+        max_images: Images kept (None: no cap).
+
+    Returns:
+        The parse_html() result dict, plus "omitted": {"links": n,
+        "images": n} when a cap dropped anything.
+    """
+    _backend, fields = _check_options(None, fields)
+    if etree is None:
+        return parse_html("".join(chunks), base_url, fields=fields, compact=compact)
+
+    extractor = _StreamExtractor(_empty_result(fields), base_url, compact)
+    extractor.max_links = max_links
+    extractor.max_images = max_images
+    parser = etree.HTMLParser(target=extractor, recover=True)
+    fed = False
+    for chunk in chunks:
+        if not fed and chunk[:1] == "\N{BYTE ORDER MARK}":
+            chunk = chunk[1:]
+        if chunk:
+            parser.feed(chunk)
+            fed = True
+    # lxml refuses to close a parser that was never fed
+    result = parser.close() if fed else extractor.close()
+    if any(extractor.omitted.values()):
+        result["omitted"] = extractor.omitted
+    return result
+
+
+def iter_file_chunks(path: str, size: int = STREAM_CHUNK_CHARS) -> Iterator[str]:
+    """Read a UTF-8 text file `size` characters at a time."""
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            chunk = f.read(size)
+            if not chunk:
+                return
+            yield chunk
+
+
+DEFAULT_CHUNKSIZE = 16
+
+
+def _parse_chunk(chunk: list, backend: str, fields, compact: bool = False) -> list:
+    """Worker side of parse_many(): [(index, html, base_url)] -> [(index, result)]."""
+    out = []
+    for index, html, base_url in chunk:
+        if not isinstance(html, str):
+            out.append((index, {"error": "No HTML to parse"}))
+            continue
         try:
-            schema_data = json.loads(script.string)
-            # Flatten @graph containers so each @type is a separate entry
-            if isinstance(schema_data, dict) and "@graph" in schema_data:
-                for item in schema_data["@graph"]:
-                    if isinstance(item, dict):
-                        result["schema"].append(item)
-            elif isinstance(schema_data, list):
-                for item in schema_data:
-                    if isinstance(item, dict):
-                        result["schema"].append(item)
+            out.append((index, parse_html(html, base_url, backend=backend, fields=fields, compact=compact)))
+        except Exception as e:  # one bad page must not end the batch
+            out.append((index, {"error": f"Parse failed: {e}"}))
+    return out
+
+
+def parse_many(
+    documents,
+    workers: Optional[int] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    ordered: bool = True,
+    backend: Optional[str] = None,
+    fields=None,
+    cache=None,
+    compact: bool = False,
+) -> Iterator[tuple]:
+    """
+    Parse many documents on a process pool, streaming the results.
+
+    Parsing is CPU-bound Python, so threads would serialize on the GIL;
+    this spreads it over `workers` processes instead. Documents are sent in
+    chunks of `chunksize` to amortize the inter-process round trip, and at
+    most two chunks per worker are in flight, so `documents` can be an
+    unbounded stream (e.g. NDJSON on stdin).
+
+    Args:
+        documents: Iterable of (html, base_url) pairs.
+        workers: Processes to use (default: os.cpu_count()). With 1, parsing
+            runs in this process.
+        chunksize: Documents per dispatch.
+        ordered: Yield in input order (True) or as chunks complete (False).
+        backend, fields, compact: As for parse_html(). Compact results
+            are also cheaper to send back from the workers.
+        cache: Optional parse_cache.ParseCache, consulted and filled in this
+            process; hits are never sent to a worker.
+
+    Yields:
+        (index, result) tuples, `index` being the document's position in
+        `documents`. A document that fails to parse yields {"error": ...}.
+    """
+    backend, fields = _check_options(backend, fields)
+    workers = max(1, workers or os.cpu_count() or 1)
+    chunksize = max(1, chunksize)
+
+    def _chunks():
+        chunk = []
+        for index, (html, base_url) in enumerate(documents):
+            chunk.append((index, html, base_url))
+            if len(chunk) == chunksize:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _split(chunk):
+        """(cached results, work for the pool, cache keys of that work)."""
+        if cache is None:
+            return [], chunk, {}
+        hits, misses, keys = [], [], {}
+        for index, html, base_url in chunk:
+            key = _cache_key(html, base_url, fields, compact) if isinstance(html, str) else None
+            cached = cache.get(key) if key else None
+            if cached is not None:
+                hits.append((index, cached))
             else:
-                result["schema"].append(schema_data)
-        except (json.JSONDecodeError, TypeError):
-            pass
+                misses.append((index, html, base_url))
+                keys[index] = key
+        return hits, misses, keys
 
-    # Word count (visible text only)
-    for element in soup(["script", "style", "nav", "footer", "header"]):
-        element.decompose()
+    def _store(results, keys):
+        for index, result in results:
+            if keys.get(index) and "error" not in result:
+                cache.put(keys[index], result)
+        return results
 
-    text = soup.get_text(separator=" ", strip=True)
-    words = re.findall(r"\b\w+\b", text)
-    result["word_count"] = len(words)
+    if workers == 1:
+        for chunk in _chunks():
+            hits, misses, keys = _split(chunk)
+            done = hits + _store(_parse_chunk(misses, backend, fields, compact), keys)
+            yield from sorted(done, key=lambda item: item[0]) if ordered else done
+        return
 
-    return result
+    pool = ProcessPoolExecutor(max_workers=workers)
+    pending = deque()       # (cache hits, work sent, cache keys, future or None)
+
+    def _ready() -> bool:
+        if ordered:
+            future = pending[0][3]
+            return future is None or future.done()
+        return any(entry[3].done() for entry in pending)
+
+    def _next_done():
+        if ordered:
+            return pending.popleft()
+        done, _ = wait([entry[3] for entry in pending], return_when=FIRST_COMPLETED)
+        for i, entry in enumerate(pending):
+            if entry[3] in done:
+                del pending[i]
+                return entry
+
+    def _collect(entry) -> list:
+        hits, misses, keys, future = entry
+        try:
+            results = future.result() if future is not None else []
+        except Exception as e:  # e.g. a worker died; fail this chunk only
+            results = [(index, {"error": f"Unexpected error: {e}"}) for index, _html, _base in misses]
+        done = hits + _store(results, keys)
+        return sorted(done, key=lambda item: item[0]) if ordered else done
+
+    try:
+        for chunk in _chunks():
+            hits, misses, keys = _split(chunk)
+            if not ordered:
+                yield from hits
+                hits = []
+            if not misses and not (ordered and pending):
+                yield from hits
+                continue
+            future = pool.submit(_parse_chunk, misses, backend, fields, compact) if misses else None
+            pending.append((hits, misses, keys, future))
+            while pending and (len(pending) >= workers * 2 or _ready()):
+                yield from _collect(_next_done())
+        while pending:
+            yield from _collect(_next_done())
+    finally:
+        # Runs when the caller stops iterating early, too
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _batch_main(args, fields, cache=None) -> None:
+    """
+    CLI path for --batch: NDJSON records in, NDJSON results out (in input
+    order unless --unordered), a tally on stderr.
+
+    Each input line needs "html" (or "content", as fetch_page.py --batch
+    writes it) and may give "base_url" (or "url").
+    """
+    stream = sys.stdin if args.batch == "-" else open(args.batch, "r", encoding="utf-8")
+    urls = {}
+
+    def _documents():
+        index = 0
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = {}
+            if not isinstance(record, dict):
+                record = {}
+            base_url = record.get("base_url") or record.get("url")
+            urls[index] = base_url
+            index += 1
+            yield record.get("html", record.get("content")), base_url
+
+    total = failed = 0
+    try:
+        for index, result in parse_many(
+            _documents(),
+            workers=args.workers,
+            chunksize=args.chunksize,
+            ordered=not args.unordered,
+            backend=args.backend,
+            fields=fields,
+            cache=cache,
+            compact=args.compact,
+        ):
+            error = result.get("error")
+            total += 1
+            failed += bool(error)
+            line = {"index": index, "url": urls.pop(index, None), "parsed": None if error else result, "error": error}
+            sys.stdout.write(json.dumps(line) + "\n")
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    print(f"Parsed {total - failed} of {total} document(s), {failed} failed", file=sys.stderr)
 
 
 def main():
@@ -229,34 +1050,154 @@ def main():
     parser.add_argument("file", nargs="?", help="HTML file to parse")
     parser.add_argument("--url", "-u", help="Base URL for resolving links")
     parser.add_argument("--json", "-j", action="store_true", help="Output as JSON")
+    parser.add_argument(
+        "--backend",
+        choices=sorted(BACKENDS),
+        default=DEFAULT_BACKEND,
+        help=f"Parser backend (default: {DEFAULT_BACKEND})",
+    )
+    parser.add_argument(
+        "--fields",
+        help=f"Comma-separated fields to extract (default: all). Choices: {', '.join(FIELDS)}",
+    )
+
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse results for identical HTML from the on-disk parse cache",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Parse NDJSON records ({html|content, base_url|url} per line) from FILE, or - for stdin",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Parser processes for --batch (default: CPU count)",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=DEFAULT_CHUNKSIZE,
+        help=f"Documents per worker dispatch for --batch (default: {DEFAULT_CHUNKSIZE})",
+    )
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="With --batch, write results as they complete instead of in input order",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Parse incrementally in bounded memory, for very large pages (needs lxml)",
+    )
+    parser.add_argument(
+        "--max-links",
+        type=int,
+        default=DEFAULT_MAX_LINKS,
+        help=f"With --stream, links to keep; 0 for no cap (default: {DEFAULT_MAX_LINKS})",
+    )
+    parser.add_argument(
+        "--max-images",
+        type=int,
+        default=DEFAULT_MAX_IMAGES,
+        help=f"With --stream, images to keep; 0 for no cap (default: {DEFAULT_MAX_IMAGES})",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Return links and images as columnar lists with interned origins and rel values",
+    )
 
     args = parser.parse_args()
+    fields = [f.strip() for f in args.fields.split(",") if f.strip()] if args.fields else None
+
+    if args.batch:
+        cache = None
+        if args.cache:
+            from parse_cache import DEFAULT_PATH, ParseCache
 
+            cache = ParseCache(path=DEFAULT_PATH)
+        try:
+            _batch_main(args, fields, cache)
+        except ValueError as e:
+            parser.error(str(e))
+        finally:
+            if cache is not None:
+                cache.close()
+        return
+
+    real_path = None
     if args.file:
         real_path = os.path.realpath(args.file)
         if not os.path.isfile(real_path):
             print(f"Error: File not found: {args.file}", file=sys.stderr)
             sys.exit(1)
-        with open(real_path, "r", encoding="utf-8") as f:
-            html = f.read()
+
+    if args.stream:
+        if args.cache:
+            parser.error("--cache cannot be combined with --stream")
+        if real_path:
+            chunks = iter_file_chunks(real_path)
+        else:
+            chunks = iter(lambda: sys.stdin.read(STREAM_CHUNK_CHARS), "")
+        try:
+            result = parse_html_stream(
+                chunks,
+                args.url,
+                fields=fields,
+                max_links=args.max_links or None,
+                max_images=args.max_images or None,
+                compact=args.compact,
+            )
+        except ValueError as e:
+            parser.error(str(e))
     else:
-        html = sys.stdin.read()
+        if real_path:
+            with open(real_path, "r", encoding="utf-8") as f:
+                html = f.read()
+        else:
+            html = sys.stdin.read()
 
-    result = parse_html(html, args.url)
+        cache = None
+        if args.cache:
+            from parse_cache import DEFAULT_PATH, ParseCache
+
+            cache = ParseCache(path=DEFAULT_PATH)
+        try:
+            result = parse_html(
+                html, args.url, backend=args.backend, fields=fields, cache=cache, compact=args.compact
+            )
+        except ValueError as e:
+            parser.error(str(e))
+        finally:
+            if cache is not None:
+                cache.close()
 
     if args.json:
         print(json.dumps(result, indent=2))
     else:
-        print(f"Title: {result['title']}")
-        print(f"Meta Description: {result['meta_description']}")
-        print(f"Canonical: {result['canonical']}")
-        print(f"H1 Tags: {len(result['h1'])}")
-        print(f"H2 Tags: {len(result['h2'])}")
-        print(f"Images: {len(result['images'])}")
-        print(f"Internal Links: {len(result['links']['internal'])}")
-        print(f"External Links: {len(result['links']['external'])}")
-        print(f"Schema Blocks: {len(result['schema'])}")
-        print(f"Word Count: {result['word_count']}")
+        result = expand_result(result)
+        summary = (
+            ("Title", "title", None),
+            ("Meta Description", "meta_description", None),
+            ("Canonical", "canonical", None),
+            ("H1 Tags", "h1", len),
+            ("H2 Tags", "h2", len),
+            ("Images", "images", len),
+            ("Internal Links", "links", lambda links: len(links["internal"])),
+            ("External Links", "links", lambda links: len(links["external"])),
+            ("Schema Blocks", "schema", len),
+            ("Word Count", "word_count", None),
+        )
+        for label, key, count in summary:
+            if key in result:
+                print(f"{label}: {count(result[key]) if count else result[key]}")
+        if result.get("omitted"):
+            omitted = result["omitted"]
+            print(f"Omitted (caps): {omitted['links']} links, {omitted['images']} images")
 
 
 if __name__ == "__main__":
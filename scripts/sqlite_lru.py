@@ -0,0 +1,127 @@
+"""
+Size-bounded, least-recently-used SQLite tables for the on-disk caches.
+
+http_cache.py and parse_cache.py store zlib-compressed bodies in one table
+each. The pieces they share live here so the two caches cannot drift
+apart:
+
+  - connect() opens the file in WAL mode and creates the table with the
+    bookkeeping columns (raw_size, stored_size, stored_at, last_access)
+    and an index on last_access.
+  - evict(), clear() and totals() bound, empty and measure the table.
+  - cache_main() is the `--stats/--evict/--clear/--max-size` command line
+    of both scripts.
+
+Callers hold their own lock around these calls; the functions only touch
+the connection they are given.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from typing import Callable
+
+# Eviction trims to this fraction of the bound so that the next few stores
+# do not each trigger another eviction pass.
+EVICT_TARGET = 0.9
+
+_MB = 1024 * 1024
+
+
+def connect(path: str, table: str, columns: str) -> sqlite3.Connection:
+    """
+    Open `path` (creating its directory) and ensure `table` exists with a
+    `key TEXT PRIMARY KEY`, the caller's `columns` and the LRU bookkeeping
+    columns. The connection may be used from any thread.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            key TEXT PRIMARY KEY,
+            {columns.strip().rstrip(",")},
+            raw_size INTEGER NOT NULL,
+            stored_size INTEGER NOT NULL,
+            stored_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        )
+    """)
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_last_access ON {table}(last_access)")
+    conn.commit()
+    return conn
+
+
+def evict(conn: sqlite3.Connection, table: str, max_bytes: int) -> int:
+    """
+    Delete least-recently-used rows until the stored size is at most
+    EVICT_TARGET of max_bytes. A no-op while under max_bytes. Returns the
+    number of rows deleted.
+    """
+    total = conn.execute(f"SELECT COALESCE(SUM(stored_size), 0) FROM {table}").fetchone()[0]
+    if total <= max_bytes:
+        return 0
+    target = max_bytes * EVICT_TARGET
+    victims = []
+    for key, size in conn.execute(f"SELECT key, stored_size FROM {table} ORDER BY last_access"):
+        if total <= target:
+            break
+        victims.append((key,))
+        total -= size
+    conn.executemany(f"DELETE FROM {table} WHERE key = ?", victims)
+    conn.commit()
+    return len(victims)
+
+
+def clear(conn: sqlite3.Connection, table: str) -> int:
+    """Delete every row and reclaim the file space. Returns the row count."""
+    removed = conn.execute(f"DELETE FROM {table}").rowcount
+    conn.commit()
+    conn.execute("VACUUM")
+    return removed
+
+
+def totals(conn: sqlite3.Connection, table: str) -> tuple:
+    """(entries, raw bytes, stored bytes) of the table."""
+    return conn.execute(
+        f"SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(stored_size), 0) FROM {table}"
+    ).fetchone()
+
+
+def cache_main(description: str, default_max_bytes: int, open_cache: Callable[[int], object]) -> None:
+    """
+    Command line shared by the cache scripts. `open_cache(max_bytes)`
+    returns a context manager with clear(), evict() and stats().
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--stats", action="store_true", help="Print entry count and sizes")
+    parser.add_argument("--evict", action="store_true", help="Evict LRU entries down to --max-size")
+    parser.add_argument("--clear", action="store_true", help="Delete every entry")
+    parser.add_argument(
+        "--max-size",
+        type=int,
+        default=default_max_bytes // _MB,
+        metavar="MB",
+        help=f"Size bound in MB (default: {default_max_bytes // _MB})",
+    )
+    args = parser.parse_args()
+
+    if not (args.stats or args.evict or args.clear):
+        parser.error("one of --stats, --evict or --clear is required")
+
+    try:
+        with open_cache(args.max_size * _MB) as cache:
+            result = {}
+            if args.clear:
+                result["cleared"] = cache.clear()
+            if args.evict:
+                result["evicted"] = cache.evict()
+            result.update(cache.stats())
+    except sqlite3.Error as e:
+        result = {"error": f"Database error: {e}"}
+
+    print(json.dumps(result, indent=2))
+    if result.get("error"):
+        sys.exit(1)
@@ -0,0 +1,135 @@
+"""
+Tests for scripts/cc_rank_index.py and its use by commoncrawl_graph.py.
+
+A small rankings file in Common Crawl's format is indexed with a tiny
+chunk size, so the external merge sort spills and merges several runs.
+"""
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# Make scripts/ importable without requiring it to be a package
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+import cc_rank_index  # noqa: E402
+
+HEADER = "#harmonicc_pos\t#harmonicc_val\t#pr_pos\t#pr_val\t#host_rev\t#n_hosts"
+
+
+def _rankings(count=500, seed=7):
+    rng = random.Random(seed)
+    domains = [f"site{i}.{rng.choice(['com', 'org', 'co.uk'])}" for i in range(count)]
+    lines = [
+        f"{i + 1}\t{1000.0 / (i + 1)}\t{count - i}\t{1.0 / (i + 1)}\t{cc_rank_index.reverse_host(d)}\t{i % 4 + 1}"
+        for i, d in enumerate(domains)
+    ]
+    rng.shuffle(lines)
+    return domains, [HEADER] + lines
+
+
+@pytest.mark.parametrize("chunk_rows", [7, 1_000_000])
+def test_build_and_lookup(tmp_path, chunk_rows):
+    domains, lines = _rankings()
+    path = str(tmp_path / "ranks.idx")
+    stats = cc_rank_index.build_index(lines, path, chunk_rows=chunk_rows)
+    assert stats["records"] == len(domains) and stats["skipped"] == 1
+    assert (stats["runs"] > 1) == (chunk_rows == 7)
+    assert [p.name for p in tmp_path.iterdir()] == ["ranks.idx"]  # runs cleaned up
+
+    with cc_rank_index.RankIndex(path) as index:
+        assert len(index) == len(domains)
+        for i, domain in enumerate(domains):
+            ranks = index.lookup(domain)
+            assert ranks["harmonic_centrality_rank"] == i + 1
+            assert ranks["pagerank"] == pytest.approx(1.0 / (i + 1))
+            assert ranks["n_hosts"] == i % 4 + 1
+        assert index.lookup("SITE3.com.") == index.lookup("site3.com")
+        for missing in ("", "com", "site1.com.au", "zzz.example", "aaa.aaa"):
+            assert index.lookup(missing) is None
+
+
+def test_missing_values_duplicates_and_bad_files(tmp_path):
+    path = str(tmp_path / "ranks.idx")
+    lines = [
+        "5\t-\t\tnan\tcom.example\t",
+        "6\t2.5\t7\t0.1\tcom.example",      # too few fields
+        "9\t1.0\t9\t0.2\torg.dup\t1",
+        "8\t1.0\t8\t0.3\torg.dup\t1",
+    ]
+    stats = cc_rank_index.build_index(lines, path)
+    assert stats["records"] == 2 and stats["duplicates"] == 1 and stats["skipped"] == 1
+    with cc_rank_index.RankIndex(path) as index:
+        assert index.lookup("example.com") == {
+            "harmonic_centrality_rank": 5,
+            "harmonic_centrality": None,
+            "pagerank_rank": None,
+            "pagerank": None,
+            "n_hosts": None,
+        }
+        assert index.lookup("dup.org")["pagerank_rank"] in (8, 9)
+
+    cc_rank_index.build_index([], path)
+    with cc_rank_index.RankIndex(path) as index:
+        assert len(index) == 0 and index.lookup("example.com") is None
+
+    bogus = tmp_path / "bogus.idx"
+    bogus.write_bytes(b"not an index at all, just some bytes")
+    with pytest.raises(ValueError):
+        cc_rank_index.RankIndex(str(bogus))
+
+
+def test_domain_metrics_come_from_local_index_without_network(tmp_path, monkeypatch):
+    import commoncrawl_graph
+
+    release = commoncrawl_graph.KNOWN_RELEASES[1]
+    domains, lines = _rankings(50)
+    ranks_file = tmp_path / "ranks.txt"
+    ranks_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    monkeypatch.setattr(commoncrawl_graph, "get_cache_dir", lambda: str(tmp_path))
+    monkeypatch.setattr(commoncrawl_graph, "_rank_indexes", {})
+
+    built = commoncrawl_graph.build_rank_index(release, ranks_file=str(ranks_file))
+    assert built["status"] == "success" and built["data"]["records"] == 50
+
+    def _no_network(*args, **kwargs):
+        raise AssertionError("network used")
+
+    monkeypatch.setattr(commoncrawl_graph.requests, "get", _no_network)
+    monkeypatch.setattr(commoncrawl_graph.requests, "head", _no_network)
+
+    found = commoncrawl_graph.get_domain_metrics(f"https://www.{domains[2]}/page")
+    assert found["metadata"]["release"] == release
+    assert found["data"]["pagerank_rank"] == 48 and found["data"]["in_rankings"]
+
+    missing = commoncrawl_graph.get_domain_metrics("not-crawled.example", release=release)
+    assert missing["status"] == "success"
+    assert not missing["data"]["in_crawl"] and missing["data"]["pagerank"] is None
+
+
+def test_rank_index_overrides_stale_per_domain_cache(tmp_path, monkeypatch):
+    import commoncrawl_graph
+
+    release = commoncrawl_graph.KNOWN_RELEASES[1]
+    monkeypatch.setattr(commoncrawl_graph, "get_cache_dir", lambda: str(tmp_path))
+    monkeypatch.setattr(commoncrawl_graph, "_rank_indexes", {})
+    # A negative answer left behind by the old partial streaming scan
+    commoncrawl_graph._save_cache("example.com", release, {
+        "status": "success",
+        "data": {"domain": "example.com", "in_crawl": False, "pagerank": None},
+        "error": None,
+        "metadata": {"source": "commoncrawl", "release": release, "from_cache": False},
+    })
+    assert commoncrawl_graph._is_cached("example.com", release)
+
+    ranks_file = tmp_path / "ranks.txt"
+    ranks_file.write_text(HEADER + "\n1\t10.0\t1\t0.5\tcom.example\t3\n", encoding="utf-8")
+    built = commoncrawl_graph.build_rank_index(release, ranks_file=str(ranks_file))
+    assert built["status"] == "success"
+
+    result = commoncrawl_graph.get_domain_metrics("example.com", release=release)
+    assert result["data"]["in_crawl"] and result["data"]["pagerank"] == pytest.approx(0.5)
+    assert result["metadata"]["from_cache"] is False
+    assert "rank_index" in result["metadata"]
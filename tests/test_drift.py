@@ -0,0 +1,741 @@
+"""
+Tests for the drift monitor scripts (drift_baseline / drift_compare).
+
+Network access is replaced by monkeypatching `fetch_page.fetch_page`, and the
+SQLite database is redirected to a per-test temporary directory.
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+import drift_baseline  # noqa: E402
+import drift_compare  # noqa: E402
+import drift_db  # noqa: E402
+import drift_report  # noqa: E402
+import fetch_page  # noqa: E402
+
+PAGE = """
+<html><head>
+  <title>Widgets for sale</title>
+  <meta name="description" content="Buy widgets online.">
+  <link rel="canonical" href="https://shop.example.com/widgets">
+  <meta property="og:title" content="Widgets">
+  <script type="application/ld+json">{"@type": "Product", "name": "Widget"}</script>
+</head><body>
+  <h1>Widgets</h1><h2>Blue</h2><h2>Red</h2>
+</body></html>
+"""
+
+
+def _response(url, content=PAGE, status_code=200, headers=None):
+    return {
+        "url": url,
+        "status_code": status_code,
+        "content": content,
+        "headers": headers or {"Content-Type": "text/html"},
+        "redirect_chain": [],
+        "redirect_details": [],
+        "error": None,
+    }
+
+
+@pytest.fixture
+def drift_home(tmp_path, monkeypatch):
+    """Point the drift database at a temporary directory."""
+    monkeypatch.setattr(drift_db, "DB_DIR", str(tmp_path))
+    monkeypatch.setattr(drift_db, "DB_PATH", str(tmp_path / "baselines.db"))
+    return tmp_path
+
+
+@pytest.fixture
+def fake_site(monkeypatch):
+    """Serve pages from a dict instead of the network. Returns the dict."""
+    pages = {}
+
+    def _fake_fetch(url, **kwargs):
+        response = pages.get(url) or _response(url)
+        if kwargs.get("raw") and isinstance(response["content"], str):
+            response = {**response, "content": response["content"].encode("utf-8")}
+        return response
+
+    monkeypatch.setattr(fetch_page, "fetch_page", _fake_fetch)
+    return pages
+
+
+def test_inprocess_fetch_returns_structured_status(fake_site):
+    url = "https://shop.example.com/widgets"
+    fake_site[url] = _response(url, status_code=410)
+    data = drift_baseline.fetch_page_data(url)
+    assert data["error"] is None
+    assert data["status_code"] == 410
+    assert data["parsed"]["title"] == "Widgets for sale"
+    assert data["html"] == PAGE
+
+
+def test_inprocess_fetch_surfaces_fetch_errors(fake_site):
+    url = "https://shop.example.com/down"
+    fake_site[url] = dict(_response(url), content=None, error="Request timed out after 60 seconds")
+    data = drift_baseline.fetch_page_data(url)
+    assert data["parsed"] is None
+    assert data["error"] == "Fetch failed: Request timed out after 60 seconds"
+
+
+def test_capture_baseline_rejects_private_urls(drift_home, fake_site):
+    result = drift_baseline.capture_baseline("http://127.0.0.1/admin", skip_cwv=True)
+    assert "SSRF" in result["error"]
+
+
+def test_baseline_then_compare_without_drift(drift_home, fake_site):
+    url = "https://shop.example.com/widgets"
+    baseline = drift_baseline.capture_baseline(url, skip_cwv=True)
+    assert baseline["status"] == "ok"
+    assert baseline["summary"]["h2_count"] == 2
+
+    result = drift_compare.run_comparison(url, skip_cwv=True)
+    assert result["status"] == "ok"
+    assert result["baseline_id"] == baseline["baseline_id"]
+    assert result["summary"]["triggered"] == 0
+
+
+def test_compare_detects_removed_title(drift_home, fake_site):
+    url = "https://shop.example.com/widgets"
+    drift_baseline.capture_baseline(url, skip_cwv=True)
+    fake_site[url] = _response(url, content=PAGE.replace("<title>Widgets for sale</title>", ""))
+
+    result = drift_compare.run_comparison(url, skip_cwv=True)
+    rules = {f["rule"] for f in result["triggered_findings"]}
+    assert "title_removed" in rules
+    assert result["summary"]["critical"] >= 1
+
+
+def test_bulk_capture_batches_and_caps_per_host(drift_home, monkeypatch):
+    import threading
+    import time
+
+    active = {}
+    peak = {}
+    lock = threading.Lock()
+
+    def _slow_fetch(url, **kwargs):
+        host = url.split("/")[2]
+        with lock:
+            active[host] = active.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), active[host])
+        time.sleep(0.02)
+        with lock:
+            active[host] -= 1
+        return _response(url)
+
+    monkeypatch.setattr(fetch_page, "fetch_page", _slow_fetch)
+    urls = [f"https://a.example.com/p{i}" for i in range(6)]
+    urls += [f"https://b.example.com/p{i}" for i in range(3)]
+    urls.append("https://a.example.com/p0/?utm_source=x")  # duplicate after normalization
+
+    result = drift_baseline.capture_baselines(
+        urls, skip_cwv=True, workers=6, per_host=2, batch_size=4
+    )
+    assert result["summary"]["total"] == 9
+    assert result["summary"]["captured"] == 9
+    assert max(peak.values()) <= 2
+    ids = [r["baseline_id"] for r in result["results"]]
+    assert None not in ids and len(set(ids)) == 9
+
+
+def test_read_sitemap_urls_follows_index(fake_site):
+    index = """<?xml version="1.0"?>
+    <sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+      <sitemap><loc>https://shop.example.com/sitemap-1.xml</loc></sitemap>
+      <sitemap><loc>https://shop.example.com/sitemap-2.xml</loc></sitemap>
+    </sitemapindex>"""
+    child = """<?xml version="1.0"?>
+    <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+      <url><loc>https://shop.example.com/{0}/a</loc></url>
+      <url><loc>https://shop.example.com/{0}/b</loc></url>
+    </urlset>"""
+    base = "https://shop.example.com/"
+    fake_site[base + "sitemap.xml"] = _response(base + "sitemap.xml", content=index)
+    fake_site[base + "sitemap-1.xml"] = _response(base + "sitemap-1.xml", content=child.format(1))
+    fake_site[base + "sitemap-2.xml"] = _response(base + "sitemap-2.xml", content=child.format(2))
+
+    urls = drift_baseline.read_sitemap_urls(base + "sitemap.xml", limit=3)
+    assert urls == [base + "1/a", base + "1/b", base + "2/a"]
+
+
+def test_read_sitemap_urls_honours_xml_encoding_and_gunzips_children(fake_site):
+    import gzip
+
+    base = "https://shop.example.com/"
+    index = f"""<?xml version="1.0" encoding="ISO-8859-1"?>
+    <sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+      <sitemap><loc>{base}caf\u00e9.xml</loc></sitemap>
+      <sitemap><loc>{base}sitemap-2.xml.gz</loc></sitemap>
+    </sitemapindex>"""
+    child = f"""<?xml version="1.0" encoding="UTF-8"?>
+    <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+      <url><loc>{base}gr\u00fc\u00dfe</loc></url>
+    </urlset>"""
+    gz_headers = {"Content-Type": "application/x-gzip"}
+    fake_site[base + "sitemap.xml"] = _response(base + "sitemap.xml", content=index.encode("iso-8859-1"))
+    fake_site[base + "caf\u00e9.xml"] = _response(base + "caf\u00e9.xml", content=child.replace("gr", "m"))
+    fake_site[base + "sitemap-2.xml.gz"] = _response(
+        base + "sitemap-2.xml.gz", content=gzip.compress(child.encode("utf-8")), headers=gz_headers
+    )
+
+    urls = drift_baseline.read_sitemap_urls(base + "sitemap.xml")
+    assert urls == [base + "m\u00fc\u00dfe", base + "gr\u00fc\u00dfe"]
+
+
+def test_fleet_comparison_rolls_up_severities(drift_home, fake_site):
+    urls = [f"https://shop.example.com/p{i}" for i in range(3)] + ["https://blog.example.com/post"]
+    drift_baseline.capture_baselines(urls, skip_cwv=True)
+    fake_site[urls[1]] = _response(urls[1], content=PAGE.replace("Widgets for sale", "Gadgets"))
+    fake_site[urls[2]] = _response(urls[2], status_code=500)
+
+    result = drift_compare.run_fleet_comparison(host="shop.example.com", skip_cwv=True, batch_size=2)
+    summary = result["summary"]
+    assert summary["urls"] == 3
+    assert summary["compared"] == 3
+    assert summary["with_drift"] == 2
+    assert summary["urls_with_critical"] == 1
+    assert summary["rules"]["status_code_error"] == 1
+    assert summary["rules"]["title_changed"] == 1
+    # Worst page first
+    assert result["results"][0]["url"] == urls[2]
+
+    conn = drift_db.init_db()
+    try:
+        stored = conn.execute("SELECT COUNT(*) FROM comparisons").fetchone()[0]
+    finally:
+        conn.close()
+    assert stored == 3
+
+
+def test_dashboard_streams_latest_comparisons_worst_first(drift_home, fake_site, tmp_path):
+    urls = [f"https://shop.example.com/p{i}" for i in range(3)]
+    drift_baseline.capture_baselines(urls, skip_cwv=True)
+    fake_site[urls[1]] = _response(urls[1], content=PAGE.replace("Widgets for sale", "Gadgets"))
+    fake_site[urls[2]] = _response(urls[2], status_code=500)
+    drift_compare.run_fleet_comparison(skip_cwv=True)
+
+    out = tmp_path / "dashboard.html"
+    with open(out, "w", encoding="utf-8") as f:
+        counts = drift_report.write_dashboard(drift_report.iter_latest_comparisons(host="shop.example.com"), f)
+    html = out.read_text(encoding="utf-8")
+    assert counts["urls"] == 3
+    assert html.count('<details class="url-section"') == 3
+    # Summary table lists the CRITICAL page first; its section is open
+    assert html.index(f">{urls[2]}</a>") < html.index(f">{urls[1]}</a>") < html.index(f">{urls[0]}</a>")
+    assert 'data-rank="3" open>' in html
+
+    with open(out, "w", encoding="utf-8") as f:
+        counts = drift_report.write_dashboard(
+            drift_report.iter_latest_comparisons(), f, min_severity="critical"
+        )
+    assert counts["urls"] == 1 and counts["skipped"] == 2
+
+
+def test_dashboard_cli_reports_database_errors_without_partial_output(drift_home, tmp_path, monkeypatch, capsys):
+    with open(drift_db.DB_PATH, "wb") as f:
+        f.write(b"not a sqlite database" * 100)
+    out = tmp_path / "dashboard.html"
+    monkeypatch.setattr(sys, "argv", ["drift_report.py", "--dashboard", "--db", "--output", str(out)])
+
+    with pytest.raises(SystemExit) as exc:
+        drift_report.main()
+    assert exc.value.code == 1
+    assert capsys.readouterr().err.startswith("Error: ")
+    assert not out.exists()
+
+
+def test_compare_short_circuits_on_304(drift_home, monkeypatch):
+    url = "https://shop.example.com/widgets"
+    seen = []
+
+    def _fetch(u, extra_headers=None, **kwargs):
+        seen.append(extra_headers or {})
+        if extra_headers and extra_headers.get("If-None-Match") == '"v1"':
+            return _response(u, content="", status_code=304, headers={"etag": '"v1"'})
+        return _response(u, headers={"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"})
+
+    monkeypatch.setattr(fetch_page, "fetch_page", _fetch)
+    drift_baseline.capture_baseline(url, skip_cwv=True)
+
+    result = drift_compare.run_comparison(url, skip_cwv=True)
+    assert seen[-1]["If-None-Match"] == '"v1"'
+    assert seen[-1]["If-Modified-Since"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+    assert result["unchanged"] == "not_modified"
+    assert result["summary"]["total_rules"] == 0
+    assert result["summary"]["rules_skipped"] == 17
+
+    full = drift_compare.run_comparison(url, skip_cwv=True, conditional=False)
+    assert "unchanged" not in full
+    assert full["summary"]["total_rules"] == 17
+
+
+def test_compare_short_circuits_on_identical_html_hash(drift_home, fake_site, monkeypatch):
+    import parse_html
+
+    url = "https://shop.example.com/widgets"
+    drift_baseline.capture_baseline(url, skip_cwv=True)
+
+    def _no_parse(*args, **kwargs):
+        raise AssertionError("unchanged page must not be parsed")
+
+    monkeypatch.setattr(parse_html, "parse_html", _no_parse)
+    result = drift_compare.run_comparison(url, skip_cwv=True)
+    assert result["unchanged"] == "html_hash"
+    assert result["summary"]["triggered"] == 0
+
+
+def test_init_db_adds_validator_columns_to_old_databases(drift_home):
+    import sqlite3
+
+    conn = sqlite3.connect(drift_db.DB_PATH)
+    conn.execute(
+        "CREATE TABLE baselines (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT NOT NULL, "
+        "url_hash TEXT NOT NULL, timestamp TEXT NOT NULL, title TEXT, meta_description TEXT, "
+        "canonical TEXT, robots TEXT, h1 TEXT, h2_json TEXT, h3_json TEXT, schema_json TEXT, "
+        "og_json TEXT, cwv_json TEXT, html_hash TEXT, schema_hash TEXT, status_code INTEGER)"
+    )
+    conn.commit()
+    conn.close()
+
+    conn = drift_db.init_db()
+    try:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(baselines)")}
+    finally:
+        conn.close()
+    assert {"etag", "last_modified"} <= columns
+
+
+def test_baselines_share_blobs_for_identical_json(drift_home, fake_site):
+    url = "https://shop.example.com/widgets"
+    drift_baseline.capture_baseline(url, skip_cwv=True)
+    drift_baseline.capture_baseline(url, skip_cwv=True)
+
+    conn = drift_db.init_db()
+    try:
+        inline = conn.execute(
+            "SELECT COUNT(*) FROM baselines WHERE schema_json IS NOT NULL OR h2_json IS NOT NULL"
+        ).fetchone()[0]
+        refs = conn.execute("SELECT DISTINCT schema_blob, h2_blob FROM baselines").fetchall()
+        blobs = conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
+        baseline = drift_compare.load_baseline(conn, drift_baseline.url_hash(url))
+    finally:
+        conn.close()
+
+    assert inline == 0
+    assert len(refs) == 1
+    # h2, h3, schema, og -- no CWV with --skip-cwv
+    assert blobs == 4
+    assert json.loads(baseline["h2_json"]) == ["Blue", "Red"]
+    assert json.loads(baseline["schema_json"])[0]["@type"] == "Product"
+
+
+def test_put_blob_holds_write_lock_against_concurrent_gc(drift_home):
+    import sqlite3
+
+    conn = drift_db.init_db()
+    key = drift_db.put_blob(conn, '["Blue", "Red"]')
+    conn.commit()
+    other = sqlite3.connect(drift_db.DB_PATH, timeout=0)
+    try:
+        # The blob already exists, but storing it again still takes the lock
+        assert drift_db.put_blob(conn, '["Blue", "Red"]') == key
+        with pytest.raises(sqlite3.OperationalError):
+            drift_db.gc_blobs(other)
+        conn.rollback()
+        assert drift_db.gc_blobs(other) == 1
+    finally:
+        other.close()
+        conn.close()
+
+
+def test_migrate_inline_json_moves_legacy_rows_to_blobs(drift_home):
+    conn = drift_db.init_db()
+    schema = json.dumps([{"@type": "Organization", "name": "x" * 200}])
+    with conn:
+        for _ in range(3):
+            conn.execute(
+                "INSERT INTO baselines (url, url_hash, timestamp, h2_json, h3_json, schema_json, og_json) "
+                "VALUES ('https://a.example/', 'abc', '2025-01-01', '[]', '[]', ?, '{}')",
+                (schema,),
+            )
+    try:
+        result = drift_db.migrate_inline_json(conn, batch_size=2)
+        assert result["rows_migrated"] == 3
+        assert drift_db.migrate_inline_json(conn)["rows_migrated"] == 0
+
+        stats = drift_db.storage_stats(conn)
+        assert stats["baselines_with_inline_json"] == 0
+        # "[]" and "{}" plus one compressed schema blob
+        assert stats["blobs"] == 3
+        assert stats["blob_codecs"].get("raw") == 2
+
+        baseline = drift_compare.load_baseline(conn, "abc")
+        assert baseline["schema_json"] == schema
+        assert baseline["og_json"] == "{}"
+    finally:
+        conn.close()
+
+
+def test_snapshot_store_dedupes_and_rebuilds_delta_chain(drift_home, monkeypatch):
+    monkeypatch.setattr(drift_db, "SNAPSHOT_KEYFRAME_INTERVAL", 3)
+    lines = [f"<p>paragraph {i}</p>\n" for i in range(200)]
+    versions = []
+    for v in range(5):
+        lines[v * 10] = f"<p>edited in version {v}</p>\n"
+        versions.append("".join(lines))
+
+    conn = drift_db.init_snapshot_db()
+    try:
+        ids = [drift_db.put_snapshot(conn, "abc", f"h{v}", html) for v, html in enumerate(versions)]
+        assert drift_db.put_snapshot(conn, "abc", "h2", versions[2]) == ids[2]
+        kinds = [row[0] for row in conn.execute("SELECT kind FROM snapshots ORDER BY id")]
+        # Keyframe every 3rd version, deltas in between
+        assert kinds == ["full", "delta", "delta", "full", "delta"]
+        for sid, html in zip(ids, versions):
+            assert drift_db.get_snapshot(conn, sid) == html
+        stats = drift_db.snapshot_stats(conn)
+        assert stats["versions"] == 5
+        assert stats["stored_bytes"] < stats["html_bytes"] / 5
+    finally:
+        conn.close()
+
+
+def test_snapshot_delta_is_fast_on_large_repetitive_pages(drift_home):
+    import random
+    import time
+
+    rng = random.Random(6)
+    block = ["<div class=\"row\">\n", "<div class=\"cell\">\n", "</div>\n", "</div>\n", "\n"]
+    lines = []
+    for i in range(6000):
+        lines.extend(block)
+        lines.insert(len(lines) - 3, f"<span>item {i}</span>\n")
+    old = "".join(lines)
+    for i in rng.sample(range(len(lines)), len(lines) // 50):
+        lines[i] = f"<b>changed {i}</b>\n"
+    new = "".join(lines)
+
+    conn = drift_db.init_snapshot_db()
+    try:
+        started = time.perf_counter()
+        drift_db.put_snapshot(conn, "abc", "h0", old)
+        sid = drift_db.put_snapshot(conn, "abc", "h1", new)
+        assert time.perf_counter() - started < 2
+        assert drift_db.get_snapshot(conn, sid) == new
+        unrelated = drift_db.put_snapshot(conn, "abc", "h2", "".join(f"<li>{i}</li>\n" for i in range(5000)))
+        kinds = [row[0] for row in conn.execute("SELECT kind FROM snapshots ORDER BY id")]
+        # A page sharing too little with the previous version gets a keyframe
+        assert kinds == ["full", "delta", "full"]
+        assert drift_db.get_snapshot(conn, unrelated).startswith("<li>0</li>")
+    finally:
+        conn.close()
+
+
+def test_replay_reruns_rules_over_archived_history(drift_home, fake_site):
+    import drift_replay
+
+    url = "https://shop.example.com/widgets"
+    drift_baseline.capture_baseline(url, skip_cwv=True, snapshot=True)
+    fake_site[url] = _response(url, content=PAGE.replace("<h1>Widgets</h1>", ""))
+    drift_baseline.capture_baseline(url, skip_cwv=True, snapshot=True)
+    fake_site[url] = _response(url, content=PAGE.replace("Blue", "Green"))
+    drift_baseline.capture_baseline(url, skip_cwv=True)  # not archived -> missing
+
+    result = drift_replay.run_replay([drift_baseline.url_hash(url)])
+    summary = result["summary"]
+    assert summary["captures"] == 3
+    assert summary["replayed"] == 1
+    assert summary["missing_snapshots"] == 1
+    assert summary["rules"]["h1_removed"] == 1
+
+    only_title = drift_replay.run_replay(
+        [drift_baseline.url_hash(url)], rules=drift_replay.select_rules("title_changed,17")
+    )
+    assert set(only_title["summary"]["rules"]) == {"content_hash_changed"}
+
+
+def test_init_db_migrates_unversioned_database_to_current_schema(drift_home):
+    import sqlite3
+
+    conn = sqlite3.connect(drift_db.DB_PATH)
+    conn.execute(
+        "CREATE TABLE baselines (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT NOT NULL, "
+        "url_hash TEXT NOT NULL, timestamp TEXT NOT NULL, status_code INTEGER)"
+    )
+    conn.execute("CREATE INDEX idx_url_hash ON baselines(url_hash)")
+    conn.commit()
+    conn.close()
+
+    conn = drift_db.init_db()
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == drift_db.SCHEMA_VERSION
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list(baselines)")}
+        assert "idx_baselines_url_id" in indexes and "idx_url_hash" not in indexes
+        assert drift_db.migrate(conn) == []
+    finally:
+        conn.close()
+
+
+def test_retention_keeps_last_n_and_thins_old_baselines(drift_home):
+    from datetime import datetime, timedelta, timezone
+
+    now = datetime.now(timezone.utc)
+    conn = drift_db.init_db()
+    try:
+        with conn:
+            # 60 daily captures for one URL, oldest first, all sharing one blob
+            for day in range(59, -1, -1):
+                ts = (now - timedelta(days=day)).isoformat()
+                row = drift_db.blob_row_values(conn, {"h2_json": json.dumps(["a"] * 40)})
+                cur = conn.execute(
+                    "INSERT INTO baselines (url, url_hash, timestamp, h2_blob) VALUES ('u', 'abc', ?, ?)",
+                    (ts, row["h2_blob"]),
+                )
+                conn.execute(
+                    "INSERT INTO comparisons (url, url_hash, baseline_id, timestamp, results_json) "
+                    "VALUES ('u', 'abc', ?, ?, '{}')",
+                    (cur.lastrowid, ts),
+                )
+
+        dry = drift_db.apply_retention(conn, thin_after_days=30, thin_every_days=7, dry_run=True)
+        assert 20 <= dry["would_delete_baselines"] <= 26
+
+        result = drift_db.apply_retention(conn, thin_after_days=30, thin_every_days=7)
+        remaining = conn.execute("SELECT COUNT(*) FROM baselines").fetchone()[0]
+        assert result["deleted"]["baselines"] == dry["would_delete_baselines"]
+        assert result["deleted"]["comparisons"] == result["deleted"]["baselines"]
+        assert remaining == 60 - result["deleted"]["baselines"]
+        assert result["deleted"]["blobs"] == 0  # still referenced
+
+        drift_db.apply_retention(conn, keep_last=5)
+        ids = [r[0] for r in conn.execute("SELECT id FROM baselines ORDER BY id")]
+        assert ids == list(range(56, 61))
+    finally:
+        conn.close()
+
+
+def _psi_result(score=0.9):
+    return {
+        "lighthouse_scores": {"performance": score},
+        "lab_metrics": {"lcp_ms": 1200},
+        "field_metrics": {},
+        "error": None,
+    }
+
+
+def test_page_and_psi_run_concurrently(drift_home, monkeypatch):
+    import time
+
+    import pagespeed_check
+
+    def _slow_fetch(url, **kwargs):
+        time.sleep(0.3)
+        return _response(url)
+
+    def _slow_psi(url, **kwargs):
+        time.sleep(0.3)
+        return _psi_result()
+
+    monkeypatch.setattr(fetch_page, "fetch_page", _slow_fetch)
+    monkeypatch.setattr(pagespeed_check, "run_pagespeed", _slow_psi)
+
+    started = time.monotonic()
+    result = drift_baseline.capture_baseline("https://shop.example.com/widgets")
+    elapsed = time.monotonic() - started
+
+    assert result["summary"]["cwv_captured"] is True
+    assert "cwv_error" not in result
+    assert elapsed < 0.5
+
+
+def test_psi_timeout_keeps_page_result(drift_home, fake_site, monkeypatch):
+    import time
+
+    import pagespeed_check
+
+    def _hung_psi(url, **kwargs):
+        time.sleep(1.0)
+        return _psi_result()
+
+    monkeypatch.setattr(pagespeed_check, "run_pagespeed", _hung_psi)
+    url = "https://shop.example.com/widgets"
+
+    started = time.monotonic()
+    result = drift_baseline.capture_baseline(url, psi_timeout=0.2)
+    assert time.monotonic() - started < 0.8
+    assert result["status"] == "ok"
+    assert result["summary"]["cwv_captured"] is False
+    assert "timed out" in result["cwv_error"]
+
+    compared = drift_compare.run_comparison(url, psi_timeout=0.2, conditional=False)
+    assert compared["status"] == "ok"
+    assert compared["cwv_compared"] is False
+    assert "timed out" in compared["cwv_error"]
+
+
+def test_psi_pool_follows_workers_and_budget_starts_when_call_runs(drift_home, fake_site, monkeypatch):
+    import threading
+    import time
+
+    import pagespeed_check
+
+    lock = threading.Lock()
+    calls = {"now": 0, "max": 0}
+
+    def _slow_psi(url, **kwargs):
+        with lock:
+            calls["now"] += 1
+            calls["max"] = max(calls["max"], calls["now"])
+        time.sleep(0.3)
+        with lock:
+            calls["now"] -= 1
+        return _psi_result()
+
+    monkeypatch.setattr(pagespeed_check, "run_pagespeed", _slow_psi)
+    monkeypatch.setattr(drift_baseline, "_psi_pool", None)
+    monkeypatch.setattr(drift_baseline, "_psi_pool_size", 0)
+
+    # Two pages share a one-thread PSI pool: the second call queues for 0.3 s
+    # and then needs 0.3 s of its 0.5 s budget
+    results = []
+    threads = [
+        threading.Thread(target=lambda u=u: results.append(
+            drift_baseline.fetch_page_and_cwv(u, psi_timeout=0.5, psi_workers=1)
+        ))
+        for u in ("https://a.example.com/", "https://b.example.com/")
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert [cwv["error"] for _page, cwv in results] == [None, None]
+
+    # A batch gets one PSI thread per page worker
+    urls = [f"https://site{i}.example.com/" for i in range(12)]
+    result = drift_baseline.capture_baselines(urls, workers=12, psi_timeout=5)
+    assert result["summary"]["cwv_captured"] == 12
+    assert calls["max"] == 12
+
+
+def test_monitor_interval_parsing_and_rate_limiter():
+    import drift_monitor
+
+    assert drift_monitor.parse_interval("90") == 90
+    assert drift_monitor.parse_interval("6h") == 21600
+    assert drift_monitor.parse_interval("1d") == 86400
+    with pytest.raises(ValueError):
+        drift_monitor.parse_interval("5s")
+
+    clock = [0.0]
+    limiter = drift_monitor.RateLimiter(2, clock=lambda: clock[0])
+    assert limiter._try() == 0 and limiter._try() == 0
+    assert limiter._try() == pytest.approx(60)
+    clock[0] = 60.0
+    assert limiter._try() == 0
+
+
+def test_monitor_claims_respect_leases_and_per_host_cap(drift_home):
+    import random
+
+    import drift_monitor
+
+    urls = [f"https://a.example.com/p{i}" for i in range(4)] + ["https://b.example.com/"]
+    conn = drift_db.init_db()
+    try:
+        added = drift_monitor.add_urls(conn, urls, interval=3600, now=0, rng=random.Random(1))
+        assert added["added"] == 5
+        due_at = max(r[0] for r in conn.execute("SELECT next_run_at FROM schedule"))
+        assert 0 <= due_at < 3600  # first runs spread over one interval
+
+        first = drift_monitor.claim_due(conn, "w1", limit=10, per_host=2, now=3600)
+        hosts = [drift_monitor._host(j["url"]) for j in first]
+        assert hosts.count("a.example.com") == 2 and hosts.count("b.example.com") == 1
+
+        # Leased URLs are invisible to another worker until the lease expires
+        second = drift_monitor.claim_due(conn, "w2", limit=10, per_host=10, now=3601)
+        assert {j["url"] for j in second}.isdisjoint({j["url"] for j in first})
+        assert len(second) == 2
+        expired = drift_monitor.claim_due(conn, "w3", limit=10, per_host=10, now=3600 + 10_000)
+        assert len(expired) == 5
+    finally:
+        conn.close()
+
+
+def test_monitor_claims_are_not_starved_by_one_hosts_backlog(drift_home):
+    import sqlite3
+
+    import drift_monitor
+
+    backlog = [f"https://big.example.com/p{i}" for i in range(500)]
+    others = ["https://b.example.com/", "https://c.example.com/", "https://d.example.com/"]
+    conn = drift_db.init_db()
+    try:
+        drift_monitor.add_urls(conn, backlog + others, interval=3600, now=0)
+        conn.execute("UPDATE schedule SET next_run_at = 0 WHERE host = 'big.example.com'")
+        conn.execute("UPDATE schedule SET next_run_at = 1 WHERE host != 'big.example.com'")
+        conn.commit()
+
+        first = drift_monitor.claim_due(conn, "w1", limit=10, per_host=2, now=3600)
+        hosts = sorted(drift_monitor._host(j["url"]) for j in first)
+        assert hosts == ["b.example.com", "big.example.com", "big.example.com", "c.example.com", "d.example.com"]
+        # The cap counts every scheduler's live leases, not just this one's
+        assert drift_monitor.claim_due(conn, "w2", limit=10, per_host=2, now=3601) == []
+        assert len(drift_monitor.claim_due(conn, "w2", limit=10, per_host=3, now=3601)) == 1
+    finally:
+        conn.close()
+
+    # Databases from before the host column get it filled in
+    conn = sqlite3.connect(drift_db.DB_PATH)
+    try:
+        conn.execute("UPDATE schedule SET host = ''")
+        conn.execute("PRAGMA user_version = 5")
+        conn.commit()
+        assert drift_db.migrate(conn) == [6]
+        assert conn.execute("SELECT COUNT(*) FROM schedule WHERE host = ''").fetchone()[0] == 0
+    finally:
+        conn.close()
+
+
+def test_monitor_run_once_baselines_then_compares(drift_home, fake_site):
+    import drift_monitor
+
+    urls = ["https://shop.example.com/a", "https://shop.example.com/b"]
+    conn = drift_db.init_db()
+    try:
+        drift_monitor.add_urls(conn, urls, interval=3600)
+        conn.execute("UPDATE schedule SET next_run_at = 0")
+        conn.commit()
+    finally:
+        conn.close()
+
+    first = drift_monitor.run_monitor(skip_cwv=True, once=True, poll_seconds=0.05)
+    assert first["summary"]["baselines"] == 2
+
+    fake_site[urls[0]] = _response(urls[0], content=PAGE.replace("<title>Widgets for sale</title>", ""))
+    conn = drift_db.init_db()
+    try:
+        conn.execute("UPDATE schedule SET next_run_at = 0")
+        conn.commit()
+    finally:
+        conn.close()
+
+    second = drift_monitor.run_monitor(skip_cwv=True, once=True, poll_seconds=0.05)
+    assert second["summary"]["comparisons"] == 2
+    assert second["summary"]["critical"] >= 1
+
+    conn = drift_db.init_db()
+    try:
+        rows = conn.execute("SELECT last_status, lease_owner, next_run_at FROM schedule").fetchall()
+    finally:
+        conn.close()
+    assert all(r[0] == "compare" and r[1] is None for r in rows)
+    import time
+    assert all(r[2] > time.time() + 3000 for r in rows)
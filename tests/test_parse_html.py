@@ -0,0 +1,299 @@
+"""
+Corpus parity tests for scripts/parse_html.py.
+
+tests/fixtures/parse_html/ holds HTML pages (edge cases, malformed markup,
+a large listing page, an empty document) next to the output parse_html()
+produced for them with the original find_all()-per-field implementation,
+once per parser. The single-pass extractor must reproduce it exactly,
+including key order, on the BeautifulSoup backend and on the lxml backend
+(against the BeautifulSoup-with-lxml output).
+"""
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Make scripts/ importable without requiring it to be a package
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+import parse_html  # noqa: E402
+
+CORPUS = REPO_ROOT / "tests" / "fixtures" / "parse_html"
+BASE_URL = "https://shop.example.com/widgets/blue"
+PAGES = sorted(p.stem for p in CORPUS.glob("*.html"))
+PARSERS = ["html.parser"]
+if "lxml" in parse_html.BACKENDS:
+    PARSERS.append("lxml")
+needs_lxml = pytest.mark.skipif("lxml" not in parse_html.BACKENDS, reason="lxml not installed")
+
+
+def _expected(page, parser):
+    return json.loads((CORPUS / f"{page}.{parser}.json").read_text(encoding="utf-8"))
+
+
+def _parse(html, backend, base_url=BASE_URL):
+    return json.loads(json.dumps(parse_html.parse_html(html, base_url, backend=backend)))
+
+
+@pytest.mark.parametrize("parser", PARSERS)
+@pytest.mark.parametrize("page", PAGES)
+def test_bs4_backend_matches_corpus(page, parser, monkeypatch):
+    monkeypatch.setattr(parse_html, "_HTML_PARSER", parser)
+    html = (CORPUS / f"{page}.html").read_text(encoding="utf-8")
+    expected = _expected(page, parser)
+
+    result = _parse(html, "bs4")
+    assert result == expected
+    assert list(result) == list(expected)
+
+
+@needs_lxml
+@pytest.mark.parametrize("page", PAGES)
+def test_lxml_backend_matches_corpus(page):
+    html = (CORPUS / f"{page}.html").read_text(encoding="utf-8")
+    expected = _expected(page, "lxml")
+
+    result = _parse(html, "lxml")
+    assert result == expected
+    assert list(result) == list(expected)
+
+
+@needs_lxml
+@pytest.mark.filterwarnings("ignore::UserWarning")  # bs4's XMLParsedAsHTMLWarning
+@pytest.mark.parametrize("html", [
+    "",
+    "   \n",
+    "<!-- only a comment -->",
+    "just text, no tags",
+    "\ufeff<title>BOM</title><h1>after bom</h1>",
+    '<?xml version="1.0" encoding="utf-8"?><h1>xml declaration</h1>',
+    "<h1>nul\x00byte</h1>",
+    "<a href='/x' rel=''>empty rel</a><a href='/y' rel=' nofollow  ugc '>spaced</a>",
+    "<table><h2>foster <template>parented</template></h2></table><rp>(</rp>tail",
+    "<title></title><title>second</title><h1><!--c-->x<?pi?>y</h1>",
+    '<html><body>x</body></html><script type="application/ld+json">{"@type":"Organization"}</script>'
+    '<img src="/px.gif"><a href="/after">after html</a> trailing words',
+    "<html><body><h1>in</h1></body></html><h2>after</h2></html><p>twice closed</p>",
+])
+def test_backends_agree_on_odd_documents(html):
+    assert _parse(html, "lxml") == _parse(html, "bs4")
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="backend"):
+        parse_html.parse_html("<p>x</p>", backend="selectolax")
+
+
+def test_parse_html_leaves_links_empty_without_base_url():
+    html = (CORPUS / "basic.html").read_text(encoding="utf-8")
+    result = parse_html.parse_html(html)
+    assert result == parse_html.parse_html(html, backend="bs4")
+    assert result["links"] == {"internal": [], "external": []}
+    assert result["images"][0]["src"] == "/img/blue.jpg"
+    assert result["word_count"] == 52
+
+
+FIELD_SETS = [[field] for field in parse_html.FIELDS] + [
+    ["links", "word_count"],
+    ["title", "meta_description", "meta_robots", "canonical", "h1", "h2", "h3", "schema", "open_graph"],
+    [],
+]
+
+
+@pytest.mark.parametrize("backend", sorted(parse_html.BACKENDS))
+@pytest.mark.parametrize("page", PAGES)
+def test_selected_fields_match_full_parse(page, backend):
+    html = (CORPUS / f"{page}.html").read_text(encoding="utf-8")
+    full = _parse(html, backend)
+    for fields in FIELD_SETS:
+        result = json.loads(json.dumps(parse_html.parse_html(html, BASE_URL, backend=backend, fields=fields)))
+        expected = {
+            key: value for key, value in full.items()
+            if key in fields or (key.endswith("_suspicious") and key[:2] in fields)
+        }
+        assert result == expected, fields
+        assert list(result) == list(expected)
+
+
+@pytest.mark.parametrize("backend", sorted(parse_html.BACKENDS))
+def test_unselected_fields_do_no_work(backend, monkeypatch):
+    def _fail(*args, **kwargs):
+        raise AssertionError("unselected field was extracted")
+
+    monkeypatch.setattr(parse_html, "_detect_lazy_method", _fail)
+    monkeypatch.setattr(parse_html, "urljoin", _fail)
+    monkeypatch.setattr(parse_html, "_append_schema", _fail)
+    html = (CORPUS / "catalogue.html").read_text(encoding="utf-8")
+    result = parse_html.parse_html(html, BASE_URL, backend=backend, fields=["title", "word_count"])
+    assert list(result) == ["title", "word_count"]
+
+    with pytest.raises(ValueError, match="bogus"):
+        parse_html.parse_html(html, fields=["title", "bogus"])
+
+
+def test_parse_cache_memoizes_by_content_and_options(tmp_path, monkeypatch):
+    from parse_cache import ParseCache
+
+    html = (CORPUS / "basic.html").read_text(encoding="utf-8")
+    expected = parse_html.parse_html(html, BASE_URL)
+    path = str(tmp_path / "parse.db")
+
+    with ParseCache(path=path) as cache:
+        assert parse_html.parse_html(html, BASE_URL, cache=cache) == expected
+        hit = parse_html.parse_html(html, BASE_URL, cache=cache)
+        assert hit == expected
+        hit["title"] = "mutated"  # hits are copies
+        assert parse_html.parse_html(html, BASE_URL, cache=cache)["title"] == expected["title"]
+        # A different base URL or field selection is a different entry
+        parse_html.parse_html(html, "https://other.example/", cache=cache)
+        parse_html.parse_html(html, BASE_URL, fields=["title"], cache=cache)
+        assert cache.counters["hits"] == 2 and cache.counters["misses"] == 3
+
+    # A new process answers from disk without parsing
+    with ParseCache(path=path) as cache:
+        assert parse_html.parse_html(html, BASE_URL, cache=cache) == expected
+        assert cache.counters["disk_hits"] == 1 and cache.counters["misses"] == 0
+        # A parser version bump retires old entries
+        monkeypatch.setattr(parse_html, "PARSER_VERSION", "test")
+        assert parse_html.parse_html(html, BASE_URL, cache=cache) == expected
+        assert cache.counters["disk_hits"] == 1 and cache.counters["misses"] == 1
+
+
+def test_parse_cache_evicts_least_recently_used(tmp_path):
+    from parse_cache import ParseCache
+
+    def _entry(i):
+        # Hex digests, so entries do not compress away on disk
+        return {"title": "".join(hashlib.sha256(f"{i}/{j}".encode()).hexdigest() for j in range(3))}
+
+    with ParseCache(path=str(tmp_path / "parse.db"), max_memory_bytes=1000, max_disk_bytes=1000) as cache:
+        for i in range(20):
+            cache.put(f"k{i}", _entry(i))
+            cache.get("k0")  # keep k0 recently used
+        stats = cache.stats()
+        assert stats["memory_bytes"] <= 1000 and stats["stored_bytes"] <= 1000
+        assert 0 < len(cache) < 20 and 0 < stats["disk_entries"] < 20
+        assert cache.get("k0") == _entry(0)
+        assert cache.get("k1") is None
+        assert stats["evicted"] > 0 and 0 < cache.stats()["hit_rate"] < 1
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parse_many_matches_parse_html_in_order(workers):
+    docs = [((CORPUS / f"{page}.html").read_text(encoding="utf-8"), BASE_URL) for page in PAGES] * 3
+    docs.insert(4, (None, BASE_URL))
+    expected = [parse_html.parse_html(html, base) if html is not None else {"error": "No HTML to parse"}
+                for html, base in docs]
+
+    ordered = list(parse_html.parse_many(iter(docs), workers=workers, chunksize=2))
+    assert [index for index, _ in ordered] == list(range(len(docs)))
+    assert [result for _, result in ordered] == expected
+
+    unordered = dict(parse_html.parse_many(docs, workers=workers, chunksize=3, ordered=False, fields=["title"]))
+    assert unordered == {i: {"title": r["title"]} for i, r in enumerate(expected) if "error" not in r} | {4: expected[4]}
+
+
+def test_parse_many_answers_repeats_from_cache():
+    from parse_cache import ParseCache
+
+    html = (CORPUS / "basic.html").read_text(encoding="utf-8")
+    docs = [(html, BASE_URL), (html + " ", BASE_URL), (html, "https://other.example/")]
+    with ParseCache() as cache:
+        first = list(parse_html.parse_many(docs, workers=2, chunksize=1, cache=cache))
+        second = list(parse_html.parse_many(docs, workers=2, chunksize=1, cache=cache))
+        assert first == second
+        assert cache.counters["stored"] == 3 and cache.counters["hits"] == 3
+
+
+@needs_lxml
+@pytest.mark.parametrize("size", [1, 7, 4096])
+@pytest.mark.parametrize("page", PAGES)
+def test_stream_matches_corpus_at_any_chunk_size(page, size):
+    html = (CORPUS / f"{page}.html").read_text(encoding="utf-8")
+    chunks = (html[i:i + size] for i in range(0, len(html), size))
+    result = json.loads(json.dumps(
+        parse_html.parse_html_stream(chunks, BASE_URL, max_links=None, max_images=None)
+    ))
+    expected = _expected(page, "lxml")
+    assert result == expected
+    assert list(result) == list(expected)
+
+
+@needs_lxml
+def test_stream_caps_links_and_images_in_bounded_memory():
+    import tracemalloc
+
+    item = '<li><a href="/p/{0}"><img src="/i/{0}.jpg" alt="p{0}"></a><p>Widget {0} in blue</p></li>'
+
+    def _page(items):
+        yield "<html><head><title>Huge</title></head><body><ul>"
+        for start in range(0, items, 100):
+            yield "".join(item.format(i) for i in range(start, start + 100))
+        yield "</ul></body></html>"
+
+    fields = ["title", "links", "images", "word_count"]
+    peaks = []
+    for items in (2_000, 16_000):
+        tracemalloc.start()
+        result = parse_html.parse_html_stream(_page(items), BASE_URL, fields=fields, max_links=50, max_images=20)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        assert result["title"] == "Huge" and result["word_count"] == 4 * items + 1
+        assert len(result["links"]["internal"]) == 50 and len(result["images"]) == 20
+        assert result["omitted"] == {"links": items - 50, "images": items - 20}
+    # 8x the document, not 8x the memory
+    assert peaks[1] < peaks[0] * 1.5
+
+
+@pytest.mark.parametrize("backend", sorted(parse_html.BACKENDS))
+@pytest.mark.parametrize("page", PAGES)
+def test_compact_result_expands_to_full_result(page, backend):
+    html = (CORPUS / f"{page}.html").read_text(encoding="utf-8")
+    full = _parse(html, backend)
+    compact = json.loads(json.dumps(parse_html.parse_html(html, BASE_URL, backend=backend, compact=True)))
+    expanded = parse_html.expand_result(compact)
+    assert expanded == full
+    assert list(expanded) == list(full)
+
+    links = list(parse_html.iter_links(compact))
+    assert links == list(parse_html.iter_links(full))
+    assert [link.href for link in links] == [link["href"] for link in full["links"]["internal"] + full["links"]["external"]]
+    assert all(len(column) == len(full["images"]) for column in
+               (compact["images"]["path"], compact["images"]["lazy_method"]))
+
+
+@needs_lxml
+def test_compact_stream_and_cache_round_trip():
+    from parse_cache import ParseCache
+
+    html = (CORPUS / "catalogue.html").read_text(encoding="utf-8")
+    full = parse_html.parse_html(html, BASE_URL)
+    chunks = (html[i:i + 64] for i in range(0, len(html), 64))
+    streamed = parse_html.parse_html_stream(chunks, BASE_URL, compact=True, max_links=None, max_images=None)
+    assert parse_html.expand_result(streamed) == full
+
+    with ParseCache() as cache:
+        parse_html.parse_html(html, BASE_URL, cache=cache)
+        compact = parse_html.parse_html(html, BASE_URL, cache=cache, compact=True)
+        assert cache.counters["misses"] == 2  # separate entries per shape
+        assert parse_html.parse_html(html, BASE_URL, cache=cache, compact=True) == compact
+
+
+def test_compact_links_intern_origins_and_rels():
+    anchors = "".join(
+        f'<a href="{"/c/" if i % 2 else "https://partner.example/p/"}{i}" rel="nofollow">Item {i}</a>'
+        for i in range(5000)
+    )
+    html = f"<html><body><nav>{anchors}</nav><a href='MAILTO:x@y.z'>mail</a></body></html>"
+    full = parse_html.parse_html(html, BASE_URL)
+    compact = parse_html.parse_html(html, BASE_URL, compact=True)
+
+    assert compact["links"]["origins"] == [
+        ["https://partner.example", False], ["https://shop.example.com", True], ["", False],
+    ]
+    assert compact["links"]["rels"] == [["nofollow"], []]
+    assert parse_html.expand_result(compact) == full
+    assert len(json.dumps(compact)) < len(json.dumps(full)) * 0.6